@@ -0,0 +1,134 @@
+import threading
+from time import monotonic
+from typing import Any, Dict, List, Optional
+from weakref import WeakKeyDictionary
+
+import numpy
+from onnxruntime import InferenceSession
+
+from facefusion import state_manager
+from facefusion.typing import ExecutionProvider
+
+BATCH_INFERENCE : WeakKeyDictionary[InferenceSession, Dict[str, Any]] = WeakKeyDictionary()
+BATCH_INFERENCE_LOCK : threading.Lock = threading.Lock()
+BATCH_INFERENCE_CONTEXTS : List[str] =\
+[
+	'facefusion.processors.',
+	'facefusion.face_masker.'
+]
+
+
+class BatchInferenceSession:
+	def __init__(self, inference_session : InferenceSession) -> None:
+		self.inference_session = inference_session
+
+	def run(self, output_names : Optional[List[str]], input_feed : Dict[str, numpy.ndarray]) -> List[numpy.ndarray]:
+		if output_names is None:
+			return forward_batch(self.inference_session, input_feed)
+		return self.inference_session.run(output_names, input_feed)
+
+	def __getattr__(self, name : str) -> Any:
+		return getattr(self.inference_session, name)
+
+
+def conditional_batch_session(model_context : str, execution_providers : List[ExecutionProvider], inference_session : InferenceSession) -> Any:
+	if is_context_batchable(model_context, execution_providers) and is_session_batchable(inference_session):
+		return BatchInferenceSession(inference_session)
+	return inference_session
+
+
+def is_context_batchable(model_context : str, execution_providers : List[ExecutionProvider]) -> bool:
+	return any(model_context.startswith(batch_context) for batch_context in BATCH_INFERENCE_CONTEXTS) and not any(execution_provider in [ 'directml', 'rocm' ] for execution_provider in execution_providers)
+
+
+def forward_batch(inference_session : InferenceSession, input_feed : Dict[str, numpy.ndarray]) -> List[numpy.ndarray]:
+	execution_batch_size = min(state_manager.get_item('execution_batch_size') or 1, state_manager.get_item('execution_thread_count') or 1)
+
+	if execution_batch_size <= 1:
+		return inference_session.run(None, input_feed)
+	batch_inference = get_batch_inference(inference_session)
+	batch_request : Dict[str, Any] =\
+	{
+		'input_feed': input_feed,
+		'outputs': None,
+		'exception': None,
+		'event': threading.Event()
+	}
+
+	with batch_inference.get('condition'):
+		batch_inference.get('requests').append(batch_request)
+		if len(batch_inference.get('requests')) == 1:
+			promote_batch_request(batch_request)
+		if len(batch_inference.get('requests')) >= execution_batch_size:
+			batch_inference.get('condition').notify()
+
+	while batch_request.get('event').wait():
+		if not batch_request.pop('is_leader', False):
+			break
+		batch_request.get('event').clear()
+		run_batch_requests(inference_session, collect_batch_requests(batch_inference, execution_batch_size))
+
+	if batch_request.get('exception'):
+		raise batch_request.get('exception')
+	return batch_request.get('outputs')
+
+
+def get_batch_inference(inference_session : InferenceSession) -> Dict[str, Any]:
+	with BATCH_INFERENCE_LOCK:
+		return BATCH_INFERENCE.setdefault(inference_session,
+		{
+			'condition': threading.Condition(),
+			'requests': []
+		})
+
+
+def collect_batch_requests(batch_inference : Dict[str, Any], execution_batch_size : int) -> List[Dict[str, Any]]:
+	batch_deadline = monotonic() + state_manager.get_item('execution_batch_deadline') / 1000
+
+	with batch_inference.get('condition'):
+		while len(batch_inference.get('requests')) < execution_batch_size and monotonic() < batch_deadline:
+			batch_inference.get('condition').wait(batch_deadline - monotonic())
+		batch_requests = batch_inference.get('requests')[:execution_batch_size]
+		batch_inference['requests'] = batch_inference.get('requests')[execution_batch_size:]
+		if batch_inference.get('requests'):
+			promote_batch_request(batch_inference.get('requests')[0])
+	return batch_requests
+
+
+def promote_batch_request(batch_request : Dict[str, Any]) -> None:
+	batch_request['is_leader'] = True
+	batch_request.get('event').set()
+
+
+def run_batch_requests(inference_session : InferenceSession, batch_requests : List[Dict[str, Any]]) -> None:
+	try:
+		batch_outputs = run_batch(inference_session, [ batch_request.get('input_feed') for batch_request in batch_requests ])
+		for batch_request, outputs in zip(batch_requests, batch_outputs):
+			batch_request['outputs'] = outputs
+	except Exception as exception:
+		for batch_request in batch_requests:
+			batch_request['exception'] = exception
+	for batch_request in batch_requests:
+		batch_request.get('event').set()
+
+
+def run_batch(inference_session : InferenceSession, input_feeds : List[Dict[str, numpy.ndarray]]) -> List[List[numpy.ndarray]]:
+	input_name = inference_session.get_inputs()[0].name
+	batch_sizes = [ input_feed.get(input_name).shape[0] for input_feed in input_feeds ]
+	batch_input_feed = { feed_name: numpy.concatenate([ input_feed.get(feed_name) for input_feed in input_feeds ]) for feed_name in input_feeds[0] }
+	batch_outputs = inference_session.run(None, batch_input_feed)
+
+	if not all(batch_output.shape[0] == sum(batch_sizes) for batch_output in batch_outputs):
+		return [ inference_session.run(None, input_feed) for input_feed in input_feeds ]
+	batch_indices = numpy.cumsum(batch_sizes)[:-1]
+	split_outputs = [ numpy.split(batch_output, batch_indices) for batch_output in batch_outputs ]
+	return [ [ split_output[index] for split_output in split_outputs ] for index in range(len(input_feeds)) ]
+
+
+def is_session_batchable(inference_session : InferenceSession) -> bool:
+	return all(session_input.shape and not isinstance(session_input.shape[0], int) for session_input in inference_session.get_inputs())
+
+
+def clear_batch_inference() -> None:
+	with BATCH_INFERENCE_LOCK:
+		BATCH_INFERENCE.clear()
@@ -0,0 +1,256 @@
+import json
+import os
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy
+
+import facefusion.choices
+from facefusion import logger, state_manager, wording
+from facefusion.common_helper import is_macos, is_windows
+from facefusion.ffmpeg import run_ffmpeg
+from facefusion.filesystem import is_file, is_video, remove_file
+from facefusion.inference_registry import clear_inference_registry
+from facefusion.raw_frame_store import read_raw_frame, write_raw_frame
+from facefusion.tracer import clear_tracer, get_spans, init_tracer
+from facefusion.typing import ErrorCode, VisionFrame
+from facefusion.vision import count_video_frame_total, read_image, read_video_frame, unpack_resolution, write_image
+
+BENCHMARK_VIDEO_FPS = 25
+
+
+def run(conditional_process : Callable[[], ErrorCode]) -> ErrorCode:
+	benchmark_report = {}
+	init_tracer(True)
+
+	for benchmark_resolution in state_manager.get_item('benchmark_resolutions'):
+		benchmark_targets = create_benchmark_targets(benchmark_resolution)
+
+		if not benchmark_targets:
+			logger.error(wording.get('benchmark_failed').format(benchmark_name = 'video-' + benchmark_resolution), __name__)
+			init_tracer(False)
+			return 1
+		for target_path in benchmark_targets:
+			reference_frame = None
+
+			for model_precision in state_manager.get_item('benchmark_model_precisions'):
+				benchmark_name = create_benchmark_name(target_path, model_precision)
+				state_manager.set_item('model_precision', model_precision)
+				clear_inference_registry()
+				benchmark_result = benchmark_target(conditional_process, target_path, benchmark_resolution)
+
+				if not benchmark_result:
+					logger.error(wording.get('benchmark_failed').format(benchmark_name = benchmark_name), __name__)
+					init_tracer(False)
+					return 1
+				output_frame = read_benchmark_output(state_manager.get_item('output_path'))
+				if reference_frame is None:
+					reference_frame = output_frame
+				elif output_frame is not None:
+					benchmark_result['output_psnr'] = calc_psnr(reference_frame, output_frame)
+				benchmark_report[benchmark_name] = benchmark_result
+				log_benchmark_result(benchmark_name, benchmark_result)
+		for benchmark_name, benchmark_result in benchmark_temp_frame_formats(benchmark_resolution).items():
+			benchmark_report[benchmark_name] = benchmark_result
+			log_benchmark_result(benchmark_name, benchmark_result)
+	init_tracer(False)
+
+	if write_benchmark_report(state_manager.get_item('benchmark_report_path'), benchmark_report):
+		logger.info(wording.get('benchmark_report_written').format(report_path = state_manager.get_item('benchmark_report_path')), __name__)
+	return compare_benchmark_report(benchmark_report)
+
+
+def create_benchmark_targets(benchmark_resolution : str) -> List[str]:
+	benchmark_path = get_benchmark_path()
+	image_path = os.path.join(benchmark_path, 'image-' + benchmark_resolution + '.png')
+	video_path = os.path.join(benchmark_path, 'video-' + benchmark_resolution + '.mp4')
+	os.makedirs(benchmark_path, exist_ok = True)
+
+	if not is_file(image_path):
+		write_image(image_path, create_benchmark_frame(benchmark_resolution))
+	if not is_file(video_path) and not create_benchmark_video(video_path, benchmark_resolution, state_manager.get_item('benchmark_frame_total')):
+		remove_file(video_path)
+		return []
+	return [ image_path, video_path ]
+
+
+def create_benchmark_name(target_path : str, model_precision : str) -> str:
+	benchmark_name = os.path.splitext(os.path.basename(target_path))[0]
+
+	if model_precision == 'fp32':
+		return benchmark_name
+	return benchmark_name + '-' + model_precision
+
+
+def create_benchmark_frame(benchmark_resolution : str) -> VisionFrame:
+	width, height = unpack_resolution(benchmark_resolution)
+	gradient_x = numpy.tile(numpy.linspace(0, 255, width, dtype = numpy.uint8), (height, 1))
+	gradient_y = numpy.tile(numpy.linspace(0, 255, height, dtype = numpy.uint8)[:, numpy.newaxis], (1, width))
+	noise = numpy.random.default_rng(0).integers(0, 64, (height, width), dtype = numpy.uint8)
+	return numpy.dstack([ gradient_x, gradient_y, noise ])
+
+
+def create_benchmark_video(video_path : str, benchmark_resolution : str, frame_total : int) -> bool:
+	duration = str(frame_total / BENCHMARK_VIDEO_FPS)
+	commands = [ '-f', 'lavfi', '-i', 'testsrc2=size=' + benchmark_resolution + ':rate=' + str(BENCHMARK_VIDEO_FPS), '-f', 'lavfi', '-i', 'sine=frequency=440:sample_rate=44100', '-t', duration ]
+	commands.extend([ '-c:v', 'libx264', '-pix_fmt', 'yuv420p', '-c:a', 'aac', '-y', video_path ])
+	process = run_ffmpeg(commands)
+	process.communicate()
+	return process.returncode == 0
+
+
+def benchmark_target(conditional_process : Callable[[], ErrorCode], target_path : str, benchmark_resolution : str) -> Optional[Dict[str, Any]]:
+	frame_total = count_video_frame_total(target_path) if is_video(target_path) else 1
+	benchmark_results = []
+
+	state_manager.set_item('target_path', target_path)
+	state_manager.set_item('output_path', os.path.join(get_benchmark_path(), 'output-' + state_manager.get_item('model_precision') + '-' + os.path.basename(target_path)))
+	state_manager.set_item('output_image_resolution', benchmark_resolution)
+	state_manager.set_item('output_video_resolution', benchmark_resolution)
+	state_manager.set_item('output_video_fps', BENCHMARK_VIDEO_FPS)
+
+	for _ in range(max(state_manager.get_item('benchmark_cycle_count'), 1)):
+		clear_tracer()
+		start_time = perf_counter()
+		if conditional_process() != 0:
+			return None
+		benchmark_results.append(collect_benchmark_result(perf_counter() - start_time, frame_total))
+	return min(benchmark_results, key = lambda benchmark_result: benchmark_result.get('total_time'))
+
+
+def benchmark_temp_frame_formats(benchmark_resolution : str) -> Dict[str, Dict[str, Any]]:
+	vision_frame = create_benchmark_frame(benchmark_resolution)
+	frame_total = max(state_manager.get_item('benchmark_frame_total'), 1)
+	benchmark_results = {}
+
+	for temp_frame_format in facefusion.choices.temp_frame_formats + [ 'raw' ]:
+		temp_frame_path = os.path.join(get_benchmark_path(), 'temp-frame.' + temp_frame_format)
+		start_time = perf_counter()
+
+		if temp_frame_format == 'raw':
+			raw_frames = numpy.memmap(temp_frame_path, dtype = numpy.uint8, mode = 'w+', shape = (frame_total,) + vision_frame.shape)
+			for frame_number in range(frame_total):
+				write_raw_frame(raw_frames, frame_number, vision_frame)
+			raw_frames.flush()
+			write_time = perf_counter() - start_time
+			start_time = perf_counter()
+			for frame_number in range(frame_total):
+				numpy.array(read_raw_frame(raw_frames, frame_number))
+			del raw_frames
+		else:
+			for _ in range(frame_total):
+				write_image(temp_frame_path, vision_frame)
+			write_time = perf_counter() - start_time
+			start_time = perf_counter()
+			for _ in range(frame_total):
+				read_image(temp_frame_path)
+		read_time = perf_counter() - start_time
+		os.remove(temp_frame_path)
+		benchmark_results['temp-frame-' + temp_frame_format + '-' + benchmark_resolution] =\
+		{
+			'total_time': round(write_time + read_time, 4),
+			'frame_total': frame_total,
+			'frames_per_second': round(frame_total / (write_time + read_time), 2),
+			'peak_memory': round(get_peak_memory(), 1),
+			'stage_times':
+			{
+				'write_frame': round(write_time, 4),
+				'read_frame': round(read_time, 4)
+			}
+		}
+	return benchmark_results
+
+
+def read_benchmark_output(output_path : str) -> Optional[VisionFrame]:
+	if is_video(output_path):
+		return read_video_frame(output_path)
+	return read_image(output_path)
+
+
+def calc_psnr(reference_frame : VisionFrame, vision_frame : VisionFrame) -> float:
+	if reference_frame.shape != vision_frame.shape:
+		return 0.0
+	mean_squared_error = numpy.mean((reference_frame.astype(numpy.float32) - vision_frame.astype(numpy.float32)) ** 2)
+
+	if mean_squared_error == 0:
+		return 100.0
+	return round(float(10 * numpy.log10(255 ** 2 / mean_squared_error)), 2)
+
+
+def collect_benchmark_result(total_time : float, frame_total : int) -> Dict[str, Any]:
+	stage_times : Dict[str, float] = {}
+
+	for span in get_spans('stage'):
+		stage_times[span.get('name')] = stage_times.get(span.get('name'), 0) + span.get('end') - span.get('start')
+	return\
+	{
+		'total_time': round(total_time, 4),
+		'frame_total': frame_total,
+		'frames_per_second': round(frame_total / total_time, 2),
+		'peak_memory': round(get_peak_memory(), 1),
+		'stage_times': { stage_name: round(stage_time, 4) for stage_name, stage_time in stage_times.items() }
+	}
+
+
+def get_peak_memory() -> float:
+	if is_windows():
+		return 0.0
+	import resource
+
+	peak_memory = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	if is_macos():
+		return peak_memory / 1024 / 1024
+	return peak_memory / 1024
+
+
+def log_benchmark_result(benchmark_name : str, benchmark_result : Dict[str, Any]) -> None:
+	logger.info(wording.get('benchmark_result').format(benchmark_name = benchmark_name, total_time = benchmark_result.get('total_time'), frames_per_second = benchmark_result.get('frames_per_second'), peak_memory = benchmark_result.get('peak_memory')), __name__)
+
+	if 'output_psnr' in benchmark_result:
+		logger.info(wording.get('benchmark_quality_result').format(benchmark_name = benchmark_name, output_psnr = benchmark_result.get('output_psnr')), __name__)
+	for stage_name, stage_time in benchmark_result.get('stage_times').items():
+		logger.debug(wording.get('benchmark_stage_result').format(stage_name = stage_name, stage_time = stage_time), __name__)
+
+
+def compare_benchmark_report(benchmark_report : Dict[str, Any]) -> ErrorCode:
+	benchmark_baseline_path = state_manager.get_item('benchmark_baseline_path')
+	is_regressed = False
+
+	if benchmark_baseline_path:
+		baseline_report = read_benchmark_report(benchmark_baseline_path)
+
+		if not baseline_report:
+			logger.error(wording.get('benchmark_baseline_not_found').format(baseline_path = benchmark_baseline_path), __name__)
+			return 1
+		for benchmark_name, benchmark_result in benchmark_report.items():
+			baseline_result = baseline_report.get(benchmark_name)
+
+			if baseline_result and baseline_result.get('total_time'):
+				regression = (benchmark_result.get('total_time') / baseline_result.get('total_time') - 1) * 100
+				if regression > state_manager.get_item('benchmark_threshold'):
+					logger.error(wording.get('benchmark_regressed').format(benchmark_name = benchmark_name, regression = '{:.1f}'.format(regression)), __name__)
+					is_regressed = True
+	return 1 if is_regressed else 0
+
+
+def read_benchmark_report(report_path : str) -> Optional[Dict[str, Any]]:
+	if is_file(report_path):
+		try:
+			with open(report_path) as report_file:
+				return json.load(report_file)
+		except ValueError:
+			return None
+	return None
+
+
+def write_benchmark_report(report_path : str, benchmark_report : Dict[str, Any]) -> bool:
+	if report_path:
+		os.makedirs(os.path.dirname(os.path.abspath(report_path)), exist_ok = True)
+		with open(report_path, 'w') as report_file:
+			json.dump(benchmark_report, report_file, indent = 4)
+		return True
+	return False
+
+
+def get_benchmark_path() -> str:
+	return os.path.join(state_manager.get_item('temp_path'), 'facefusion', 'benchmark')
@@ -0,0 +1,57 @@
+import threading
+from typing import Any, Callable, Dict, List
+
+from facefusion.content_analyser import RATE_LIMIT, analyse_frame
+from facefusion.typing import Fps, VisionFrame
+from facefusion.vision import read_image
+
+CONTENT_SCREENER : Dict[str, Any] =\
+{
+	'frame_total': 0,
+	'frame_rate': 1,
+	'counter': 0,
+	'is_rejected': False
+}
+CONTENT_SCREENER_LOCK : threading.Lock = threading.Lock()
+
+
+def init_content_screener(frame_total : int, video_fps : Fps) -> None:
+	with CONTENT_SCREENER_LOCK:
+		CONTENT_SCREENER['frame_total'] = max(frame_total, 1)
+		CONTENT_SCREENER['frame_rate'] = max(int(video_fps), 1)
+		CONTENT_SCREENER['counter'] = 0
+		CONTENT_SCREENER['is_rejected'] = False
+
+
+def reset_content_screener() -> None:
+	with CONTENT_SCREENER_LOCK:
+		CONTENT_SCREENER['counter'] = 0
+		CONTENT_SCREENER['is_rejected'] = False
+
+
+def screen_frame(frame_number : int, vision_frame : VisionFrame) -> bool:
+	frame_rate = CONTENT_SCREENER.get('frame_rate')
+
+	if frame_number % frame_rate == 0 and not CONTENT_SCREENER.get('is_rejected') and analyse_frame(vision_frame):
+		with CONTENT_SCREENER_LOCK:
+			CONTENT_SCREENER['counter'] += 1
+			rate = CONTENT_SCREENER.get('counter') * frame_rate / CONTENT_SCREENER.get('frame_total') * 100
+			CONTENT_SCREENER['is_rejected'] = rate > RATE_LIMIT
+	return CONTENT_SCREENER.get('is_rejected')
+
+
+def screen_temp_frames(temp_frame_paths : List[str], temp_video_fps : Fps) -> bool:
+	return screen_frames(len(temp_frame_paths), lambda frame_number: read_image(temp_frame_paths[frame_number]), temp_video_fps)
+
+
+def screen_frames(frame_total : int, read_frame : Callable[[int], VisionFrame], temp_video_fps : Fps) -> bool:
+	init_content_screener(frame_total, temp_video_fps)
+
+	for frame_number in range(0, frame_total, CONTENT_SCREENER.get('frame_rate')):
+		if screen_frame(frame_number, read_frame(frame_number)):
+			return True
+	return False
+
+
+def is_content_rejected() -> bool:
+	return CONTENT_SCREENER.get('is_rejected')
@@ -3,30 +3,19 @@ import shutil
 import signal
 import sys
 from time import time
+from types import ModuleType
+from typing import List
 
-import numpy
-
-from facefusion import content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, logger, process_manager, state_manager, voice_extractor, wording
+from facefusion import logger, process_manager, state_manager, wording
 from facefusion.args import apply_args, collect_job_args, reduce_job_args, reduce_step_args
-from facefusion.common_helper import get_first
-from facefusion.content_analyser import analyse_image, analyse_video
-from facefusion.download import conditional_download_hashes, conditional_download_sources
 from facefusion.exit_helper import conditional_exit, graceful_exit, hard_exit
-from facefusion.face_analyser import get_average_face, get_many_faces, get_one_face
-from facefusion.face_selector import sort_and_filter_faces
-from facefusion.face_store import append_reference_face, clear_reference_faces, get_reference_faces
-from facefusion.ffmpeg import copy_image, extract_frames, finalize_image, merge_video, replace_audio, restore_audio
-from facefusion.filesystem import filter_audio_paths, is_image, is_video, list_directory, resolve_file_pattern
-from facefusion.jobs import job_helper, job_manager, job_runner
-from facefusion.jobs.job_list import compose_job_list
+from facefusion.filesystem import is_file, is_image, is_video, list_directory, resolve_file_pattern
+from facefusion.job_backend import get_job_manager
+from facefusion.jobs import job_helper
 from facefusion.memory import limit_system_memory
-from facefusion.processors.core import get_processors_modules
 from facefusion.program import create_program
 from facefusion.program_helper import validate_args
-from facefusion.statistics import conditional_log_statistics
-from facefusion.temp_helper import clear_temp_directory, create_temp_directory, get_temp_file_path, get_temp_frame_paths, move_temp_file
 from facefusion.typing import Args, ErrorCode
-from facefusion.vision import get_video_frame, pack_resolution, read_image, read_static_images, restrict_image_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, unpack_resolution
 
 
 def cli() -> None:
@@ -47,9 +36,14 @@ def cli() -> None:
 
 
 def route(args : Args) -> None:
+	job_manager = get_job_manager()
 	system_memory_limit = state_manager.get_item('system_memory_limit')
 	if system_memory_limit and system_memory_limit > 0:
 		limit_system_memory(system_memory_limit)
+	if state_manager.get_item('trace_path') or state_manager.get_item('metrics_path'):
+		from facefusion.tracer import init_tracer
+
+		init_tracer(True)
 	if state_manager.get_item('command') == 'force-download':
 		error_code = force_download()
 		return conditional_exit(error_code)
@@ -81,6 +75,22 @@ def route(args : Args) -> None:
 			hard_exit(1)
 		error_core = process_batch(args)
 		hard_exit(error_core)
+	if state_manager.get_item('command') == 'benchmark':
+		from facefusion import benchmarker
+
+		if not common_pre_check() or not processors_pre_check():
+			return conditional_exit(2)
+		error_code = benchmarker.run(conditional_process)
+		hard_exit(error_code)
+	if state_manager.get_item('command') == 'serve':
+		from facefusion import job_server
+
+		if not job_manager.init_jobs(state_manager.get_item('jobs_path')):
+			hard_exit(1)
+		if not common_pre_check() or not processors_pre_check():
+			return conditional_exit(2)
+		error_code = job_server.serve(reduce_step_args(args), process_step)
+		hard_exit(error_code)
 	if state_manager.get_item('command') in [ 'job-run', 'job-run-all', 'job-retry', 'job-retry-all' ]:
 		if not job_manager.init_jobs(state_manager.get_item('jobs_path')):
 			hard_exit(1)
@@ -98,10 +108,16 @@ def pre_check() -> bool:
 	if not shutil.which('ffmpeg'):
 		logger.error(wording.get('ffmpeg_not_installed'), __name__)
 		return False
+	if not shutil.which('ffprobe'):
+		logger.error(wording.get('ffprobe_not_installed'), __name__)
+		return False
 	return True
 
 
 def common_pre_check() -> bool:
+	from facefusion import content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, voice_extractor
+	from facefusion.model_manifest import conditional_pre_check
+
 	common_modules =\
 	[
 		content_analyser,
@@ -113,17 +129,24 @@ def common_pre_check() -> bool:
 		voice_extractor
 	]
 
-	return all(module.pre_check() for module in common_modules)
+	return all(conditional_pre_check(module) for module in common_modules)
 
 
 def processors_pre_check() -> bool:
+	from facefusion.model_manifest import conditional_pre_check
+	from facefusion.processors.core import get_processors_modules
+
 	for processor_module in get_processors_modules(state_manager.get_item('processors')):
-		if not processor_module.pre_check():
+		if not conditional_pre_check(processor_module):
 			return False
 	return True
 
 
 def force_download() -> ErrorCode:
+	from facefusion import content_analyser, face_classifier, face_detector, face_landmarker, face_masker, face_recognizer, voice_extractor
+	from facefusion.download_pool import download_hashes_and_sources
+	from facefusion.processors.core import get_processors_modules
+
 	common_modules =\
 	[
 		content_analyser,
@@ -136,6 +159,8 @@ def force_download() -> ErrorCode:
 	]
 	available_processors = [ file.get('name') for file in list_directory('facefusion/processors/modules') ]
 	processor_modules = get_processors_modules(available_processors)
+	download_hash_sets = []
+	download_source_sets = []
 
 	for module in common_modules + processor_modules:
 		if hasattr(module, 'create_static_model_set'):
@@ -144,13 +169,19 @@ def force_download() -> ErrorCode:
 				model_sources = model.get('sources')
 
 				if model_hashes and model_sources:
-					if not conditional_download_hashes(model_hashes) or not conditional_download_sources(model_sources):
-						return 1
+					download_hash_sets.append(model_hashes)
+					download_source_sets.append(model_sources)
 
-	return 0
+	if download_hashes_and_sources(download_hash_sets, download_source_sets):
+		return 0
+	return 1
 
 
 def route_job_manager(args : Args) -> ErrorCode:
+	from facefusion.job_backend import compose_job_list
+
+	job_manager = get_job_manager()
+
 	if state_manager.get_item('command') == 'job-list':
 		job_headers, job_contents = compose_job_list(state_manager.get_item('job_status'))
 
@@ -222,30 +253,41 @@ def route_job_manager(args : Args) -> ErrorCode:
 
 
 def route_job_runner() -> ErrorCode:
+	from facefusion import job_scheduler
+
 	if state_manager.get_item('command') == 'job-run':
 		logger.info(wording.get('running_job').format(job_id = state_manager.get_item('job_id')), __name__)
-		if job_runner.run_job(state_manager.get_item('job_id'), process_step):
+		if job_scheduler.run_job(state_manager.get_item('job_id'), process_step):
 			logger.info(wording.get('processing_job_succeed').format(job_id = state_manager.get_item('job_id')), __name__)
 			return 0
 		logger.info(wording.get('processing_job_failed').format(job_id = state_manager.get_item('job_id')), __name__)
 		return 1
+	if state_manager.get_item('command') == 'job-run-all' and state_manager.get_item('worker'):
+		from facefusion import job_worker
+
+		logger.info(wording.get('running_jobs'), __name__)
+		if job_worker.run_worker(process_step):
+			logger.info(wording.get('processing_jobs_succeed'), __name__)
+			return 0
+		logger.info(wording.get('processing_jobs_failed'), __name__)
+		return 1
 	if state_manager.get_item('command') == 'job-run-all':
 		logger.info(wording.get('running_jobs'), __name__)
-		if job_runner.run_jobs(process_step):
+		if job_scheduler.run_jobs(process_step):
 			logger.info(wording.get('processing_jobs_succeed'), __name__)
 			return 0
 		logger.info(wording.get('processing_jobs_failed'), __name__)
 		return 1
 	if state_manager.get_item('command') == 'job-retry':
 		logger.info(wording.get('retrying_job').format(job_id = state_manager.get_item('job_id')), __name__)
-		if job_runner.retry_job(state_manager.get_item('job_id'), process_step):
+		if job_scheduler.retry_job(state_manager.get_item('job_id'), process_step):
 			logger.info(wording.get('processing_job_succeed').format(job_id = state_manager.get_item('job_id')), __name__)
 			return 0
 		logger.info(wording.get('processing_job_failed').format(job_id = state_manager.get_item('job_id')), __name__)
 		return 1
 	if state_manager.get_item('command') == 'job-retry-all':
 		logger.info(wording.get('retrying_jobs'), __name__)
-		if job_runner.retry_jobs(process_step):
+		if job_scheduler.retry_jobs(process_step):
 			logger.info(wording.get('processing_jobs_succeed'), __name__)
 			return 0
 		logger.info(wording.get('processing_jobs_failed'), __name__)
@@ -254,15 +296,21 @@ def route_job_runner() -> ErrorCode:
 
 
 def process_headless(args : Args) -> ErrorCode:
+	from facefusion import job_scheduler
+
+	job_manager = get_job_manager()
 	job_id = job_helper.suggest_job_id('headless')
 	step_args = reduce_step_args(args)
 
-	if job_manager.create_job(job_id) and job_manager.add_step(job_id, step_args) and job_manager.submit_job(job_id) and job_runner.run_job(job_id, process_step):
+	if job_manager.create_job(job_id) and job_manager.add_step(job_id, step_args) and job_manager.submit_job(job_id) and job_scheduler.run_sequential_job(job_id, process_step):
 		return 0
 	return 1
 
 
 def process_batch(args : Args) -> ErrorCode:
+	from facefusion import job_scheduler
+
+	job_manager = get_job_manager()
 	job_id = job_helper.suggest_job_id('batch')
 	step_args = reduce_step_args(args)
 	job_args = reduce_job_args(args)
@@ -277,7 +325,7 @@ def process_batch(args : Args) -> ErrorCode:
 				step_args['output_path'] = job_args.get('output_pattern').format(index = index)
 				if not job_manager.add_step(job_id, step_args):
 					return 1
-			if job_manager.submit_job(job_id) and job_runner.run_job(job_id, process_step):
+			if job_manager.submit_job(job_id) and job_scheduler.run_job(job_id, process_step):
 				return 0
 
 		if not source_paths and target_paths:
@@ -286,41 +334,70 @@ def process_batch(args : Args) -> ErrorCode:
 				step_args['output_path'] = job_args.get('output_pattern').format(index = index)
 				if not job_manager.add_step(job_id, step_args):
 					return 1
-			if job_manager.submit_job(job_id) and job_runner.run_job(job_id, process_step):
+			if job_manager.submit_job(job_id) and job_scheduler.run_job(job_id, process_step):
 				return 0
 	return 1
 
 
 def process_step(job_id : str, step_index : int, step_args : Args) -> bool:
+	from facefusion.face_store import clear_reference_faces, clear_static_faces
+	from facefusion.step_checkpoint import init_step_checkpoint, remove_step_checkpoint, write_step_checkpoint
+	from facefusion.target_cache import init_target_cache, release_target_cache
+
 	clear_reference_faces()
-	step_total = job_manager.count_step_total(job_id)
+	clear_static_faces()
+	step_total = get_job_manager().count_step_total(job_id)
+	step_key_args = dict(step_args)
 	step_args.update(collect_job_args())
 	apply_args(step_args, state_manager.set_item)
+	init_step_checkpoint(job_id, step_index, step_key_args)
+	init_target_cache(job_id, step_index, step_key_args)
 
 	logger.info(wording.get('processing_step').format(step_current = step_index + 1, step_total = step_total), __name__)
-	if common_pre_check() and processors_pre_check():
-		error_code = conditional_process()
-		return error_code == 0
+	try:
+		if common_pre_check() and processors_pre_check():
+			if conditional_process() == 0:
+				remove_step_checkpoint()
+				return True
+			write_step_checkpoint()
+	finally:
+		release_target_cache()
 	return False
 
 
 def conditional_process() -> ErrorCode:
+	from facefusion.processors.core import get_processors_modules
+	from facefusion.tracer import conditional_export_trace, trace_stage
+
 	start_time = time()
+	error_code = 0
 	for processor_module in get_processors_modules(state_manager.get_item('processors')):
 		if not processor_module.pre_process('output'):
 			return 2
 	conditional_append_reference_faces()
-	if is_image(state_manager.get_item('target_path')):
-		return process_image(start_time)
-	if is_video(state_manager.get_item('target_path')):
-		return process_video(start_time)
-	return 0
+	try:
+		if is_image(state_manager.get_item('target_path')):
+			error_code = process_image(start_time)
+		if is_video(state_manager.get_item('target_path')):
+			error_code = process_video(start_time)
+	finally:
+		trace_stage(None)
+	conditional_export_trace()
+	return error_code
 
 
 def conditional_append_reference_faces() -> None:
+	import numpy
+
+	from facefusion.face_analyser import get_average_face, get_many_faces, get_one_face
+	from facefusion.face_selector import sort_and_filter_faces
+	from facefusion.face_store import append_reference_face, get_reference_faces
+	from facefusion.processors.core import get_processors_modules
+	from facefusion.source_face_store import get_source_faces
+	from facefusion.vision import get_video_frame, read_image
+
 	if 'reference' in state_manager.get_item('face_selector_mode') and not get_reference_faces():
-		source_frames = read_static_images(state_manager.get_item('source_paths'))
-		source_faces = get_many_faces(source_frames)
+		source_faces = get_source_faces(state_manager.get_item('source_paths'))
 		source_face = get_average_face(source_faces)
 		if is_video(state_manager.get_item('target_path')):
 			reference_frame = get_video_frame(state_manager.get_item('target_path'), state_manager.get_item('reference_frame_number'))
@@ -340,6 +417,21 @@ def conditional_append_reference_faces() -> None:
 
 
 def process_image(start_time : float) -> ErrorCode:
+	from facefusion.content_analyser import analyse_image
+	from facefusion.face_store import conditional_log_face_store_statistics
+	from facefusion.ffmpeg import copy_image, finalize_image
+	from facefusion.frame_pipeline import process_temp_frame
+	from facefusion.inference_registry import conditional_log_inference_registry_statistics
+	from facefusion.processors.core import get_processors_modules
+	from facefusion.statistics import conditional_log_statistics
+	from facefusion.temp_helper import clear_temp_directory, create_temp_directory, get_temp_file_path
+	from facefusion.tracer import trace_stage
+	from facefusion.vision import pack_resolution, restrict_image_resolution, unpack_resolution
+
+	processor_modules = get_processors_modules(state_manager.get_item('processors'))
+	if is_image_stream_processing(processor_modules):
+		return stream_process_image(start_time, processor_modules)
+	trace_stage('analyse_image')
 	if analyse_image(state_manager.get_item('target_path')):
 		return 3
 	# clear temp
@@ -352,6 +444,7 @@ def process_image(start_time : float) -> ErrorCode:
 	process_manager.start()
 	temp_image_resolution = pack_resolution(restrict_image_resolution(state_manager.get_item('target_path'), unpack_resolution(state_manager.get_item('output_image_resolution'))))
 	logger.info(wording.get('copying_image').format(resolution = temp_image_resolution), __name__)
+	trace_stage('copy_image')
 	if copy_image(state_manager.get_item('target_path'), temp_image_resolution):
 		logger.debug(wording.get('copying_image_succeed'), __name__)
 	else:
@@ -360,19 +453,37 @@ def process_image(start_time : float) -> ErrorCode:
 		return 1
 	# process image
 	temp_file_path = get_temp_file_path(state_manager.get_item('target_path'))
-	for processor_module in get_processors_modules(state_manager.get_item('processors')):
-		logger.info(wording.get('processing'), processor_module.__name__)
-		processor_module.process_image(state_manager.get_item('source_paths'), temp_file_path, temp_file_path)
-		processor_module.post_process()
+	if is_fused_processing(processor_modules):
+		for processor_module in processor_modules:
+			logger.info(wording.get('processing'), processor_module.__name__)
+		trace_stage('process_frames', 1)
+		if process_temp_frame(processor_modules, state_manager.get_item('source_paths'), 0, temp_file_path):
+			for processor_module in processor_modules:
+				processor_module.post_process()
+		else:
+			if is_process_stopping():
+				process_manager.end()
+				return 4
+			logger.error(wording.get('processing_image_failed'), __name__)
+			process_manager.end()
+			return 1
+	else:
+		for processor_module in processor_modules:
+			logger.info(wording.get('processing'), processor_module.__name__)
+			trace_stage(processor_module.__name__, 1)
+			processor_module.process_image(state_manager.get_item('source_paths'), temp_file_path, temp_file_path)
+			processor_module.post_process()
 	if is_process_stopping():
 		process_manager.end()
 		return 4
 	# finalize image
 	logger.info(wording.get('finalizing_image').format(resolution = state_manager.get_item('output_image_resolution')), __name__)
+	trace_stage('finalize_image')
 	if finalize_image(state_manager.get_item('target_path'), state_manager.get_item('output_path'), state_manager.get_item('output_image_resolution')):
 		logger.debug(wording.get('finalizing_image_succeed'), __name__)
 	else:
 		logger.warn(wording.get('finalizing_image_skipped'), __name__)
+	trace_stage(None)
 	# clear temp
 	logger.debug(wording.get('clearing_temp'), __name__)
 	clear_temp_directory(state_manager.get_item('target_path'))
@@ -381,6 +492,8 @@ def process_image(start_time : float) -> ErrorCode:
 		seconds = '{:.2f}'.format((time() - start_time) % 60)
 		logger.info(wording.get('processing_image_succeed').format(seconds = seconds), __name__)
 		conditional_log_statistics()
+		conditional_log_face_store_statistics()
+		conditional_log_inference_registry_statistics()
 	else:
 		logger.error(wording.get('processing_image_failed'), __name__)
 		process_manager.end()
@@ -389,78 +502,284 @@ def process_image(start_time : float) -> ErrorCode:
 	return 0
 
 
-def process_video(start_time : float) -> ErrorCode:
-	trim_frame_start, trim_frame_end = restrict_trim_frame(state_manager.get_item('target_path'), state_manager.get_item('trim_frame_start'), state_manager.get_item('trim_frame_end'))
-	if analyse_video(state_manager.get_item('target_path'), trim_frame_start, trim_frame_end):
-		return 3
-	# clear temp
-	logger.debug(wording.get('clearing_temp'), __name__)
-	clear_temp_directory(state_manager.get_item('target_path'))
-	# create temp
-	logger.debug(wording.get('creating_temp'), __name__)
-	create_temp_directory(state_manager.get_item('target_path'))
-	# extract frames
+def stream_process_image(start_time : float, processor_modules : List[ModuleType]) -> ErrorCode:
+	from facefusion.content_analyser import analyse_frame
+	from facefusion.face_store import conditional_log_face_store_statistics
+	from facefusion.frame_pipeline import read_stream_image, stream_image
+	from facefusion.inference_registry import conditional_log_inference_registry_statistics
+	from facefusion.statistics import conditional_log_statistics
+	from facefusion.tracer import trace_stage
+	from facefusion.vision import pack_resolution, restrict_image_resolution, unpack_resolution
+
 	process_manager.start()
-	temp_video_resolution = pack_resolution(restrict_video_resolution(state_manager.get_item('target_path'), unpack_resolution(state_manager.get_item('output_video_resolution'))))
-	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
-	logger.info(wording.get('extracting_frames').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
-	if extract_frames(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end):
-		logger.debug(wording.get('extracting_frames_succeed'), __name__)
+	temp_image_resolution = pack_resolution(restrict_image_resolution(state_manager.get_item('target_path'), unpack_resolution(state_manager.get_item('output_image_resolution'))))
+	# read image
+	trace_stage('read_image')
+	vision_frame = read_stream_image(state_manager.get_item('target_path'), temp_image_resolution)
+	if vision_frame is None:
+		logger.error(wording.get('streaming_image_failed'), __name__)
+		process_manager.end()
+		return 1
+	trace_stage('analyse_image')
+	if analyse_frame(vision_frame):
+		process_manager.end()
+		return 3
+	# stream image
+	logger.info(wording.get('streaming_image').format(resolution = temp_image_resolution), __name__)
+	trace_stage('stream_image', 1)
+	if stream_image(processor_modules, state_manager.get_item('source_paths'), vision_frame, state_manager.get_item('output_path'), state_manager.get_item('output_image_resolution')):
+		for processor_module in processor_modules:
+			processor_module.post_process()
+		logger.debug(wording.get('streaming_image_succeed'), __name__)
 	else:
 		if is_process_stopping():
 			process_manager.end()
 			return 4
-		logger.error(wording.get('extracting_frames_failed'), __name__)
+		logger.error(wording.get('streaming_image_failed'), __name__)
 		process_manager.end()
 		return 1
-	# process frames
-	temp_frame_paths = get_temp_frame_paths(state_manager.get_item('target_path'))
-	if temp_frame_paths:
-		for processor_module in get_processors_modules(state_manager.get_item('processors')):
-			logger.info(wording.get('processing'), processor_module.__name__)
-			processor_module.process_video(state_manager.get_item('source_paths'), temp_frame_paths)
-			processor_module.post_process()
-		if is_process_stopping():
-			return 4
+	trace_stage(None)
+	# validate image
+	if is_image(state_manager.get_item('output_path')):
+		seconds = '{:.2f}'.format((time() - start_time) % 60)
+		logger.info(wording.get('processing_image_succeed').format(seconds = seconds), __name__)
+		conditional_log_statistics()
+		conditional_log_face_store_statistics()
+		conditional_log_inference_registry_statistics()
 	else:
-		logger.error(wording.get('temp_frames_not_found'), __name__)
+		logger.error(wording.get('processing_image_failed'), __name__)
 		process_manager.end()
 		return 1
-	# merge video
-	logger.info(wording.get('merging_video').format(resolution = state_manager.get_item('output_video_resolution'), fps = state_manager.get_item('output_video_fps')), __name__)
-	if merge_video(state_manager.get_item('target_path'), state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps')):
-		logger.debug(wording.get('merging_video_succeed'), __name__)
+	process_manager.end()
+	return 0
+
+
+def process_video(start_time : float) -> ErrorCode:
+	from facefusion.content_analyser import analyse_video
+	from facefusion.content_screener import is_content_rejected, reset_content_screener, screen_temp_frames
+	from facefusion.face_store import conditional_log_face_store_statistics
+	from facefusion.ffmpeg import extract_frames
+	from facefusion.ffmpeg_stream import create_audio_input_args, merge_temp_frames
+	from facefusion.frame_pipeline import has_frame_processors, process_raw_frames, process_temp_frames, screen_raw_frames, stream_video
+	from facefusion.inference_registry import conditional_log_inference_registry_statistics
+	from facefusion.processors.core import get_processors_modules
+	from facefusion.raw_frame_store import count_raw_frames, extract_raw_frames, get_raw_frames_path, merge_raw_frames
+	from facefusion.statistics import conditional_log_statistics
+	from facefusion.step_checkpoint import complete_stage, get_pristine_frame_paths, get_stage_frame_paths, is_frames_resumable, is_stage_completed, reset_step_checkpoint, restore_pristine_frames, set_frame_total, store_pristine_frames
+	from facefusion.target_cache import restore_target_frames, store_target_frames
+	from facefusion.temp_helper import clear_temp_directory, create_temp_directory, get_temp_file_path, get_temp_frame_paths, move_temp_file
+	from facefusion.tracer import trace_stage
+	from facefusion.video_segmenter import process_video_segments
+	from facefusion.vision import pack_resolution, restrict_trim_frame, restrict_video_fps, restrict_video_resolution, unpack_resolution
+
+	reset_content_screener()
+	trim_frame_start, trim_frame_end = restrict_trim_frame(state_manager.get_item('target_path'), state_manager.get_item('trim_frame_start'), state_manager.get_item('trim_frame_end'))
+	trace_stage('analyse_video')
+	if (not state_manager.get_item('inline_content_analysis') or state_manager.get_item('video_segment_count') > 1) and analyse_video(state_manager.get_item('target_path'), trim_frame_start, trim_frame_end):
+		return 3
+	if is_frames_resumable(state_manager.get_item('target_path')):
+		logger.info(wording.get('resuming_frames'), __name__)
 	else:
-		if is_process_stopping():
+		reset_step_checkpoint()
+		# clear temp
+		logger.debug(wording.get('clearing_temp'), __name__)
+		clear_temp_directory(state_manager.get_item('target_path'))
+		# create temp
+		logger.debug(wording.get('creating_temp'), __name__)
+		create_temp_directory(state_manager.get_item('target_path'))
+	process_manager.start()
+	temp_video_resolution = pack_resolution(restrict_video_resolution(state_manager.get_item('target_path'), unpack_resolution(state_manager.get_item('output_video_resolution'))))
+	temp_video_fps = restrict_video_fps(state_manager.get_item('target_path'), state_manager.get_item('output_video_fps'))
+	processor_modules = get_processors_modules(state_manager.get_item('processors'))
+	audio_input_args = create_audio_input_args(state_manager.get_item('source_paths'), state_manager.get_item('target_path'), trim_frame_start, trim_frame_end)
+	if is_segment_processing(processor_modules):
+		# process segments
+		logger.info(wording.get('processing_segments').format(segment_count = state_manager.get_item('video_segment_count'), resolution = temp_video_resolution, fps = temp_video_fps), __name__)
+		trace_stage('process_segments', trim_frame_end - trim_frame_start)
+		if process_video_segments(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end, audio_input_args):
+			for processor_module in processor_modules:
+				processor_module.post_process()
+			logger.debug(wording.get('processing_segments_succeed'), __name__)
+		else:
+			if is_process_stopping():
+				process_manager.end()
+				return 4
+			logger.error(wording.get('processing_segments_failed'), __name__)
 			process_manager.end()
-			return 4
-		logger.error(wording.get('merging_video_failed'), __name__)
-		process_manager.end()
-		return 1
-	# handle audio
-	if state_manager.get_item('skip_audio'):
-		logger.info(wording.get('skipping_audio'), __name__)
-		move_temp_file(state_manager.get_item('target_path'), state_manager.get_item('output_path'))
+			return 1
+	elif is_stream_processing(processor_modules):
+		# stream frames
+		logger.info(wording.get('streaming_frames').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
+		trace_stage('stream_frames', trim_frame_end - trim_frame_start)
+		if stream_video(processor_modules, state_manager.get_item('source_paths'), state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end, audio_input_args):
+			for processor_module in processor_modules:
+				processor_module.post_process()
+			logger.debug(wording.get('streaming_frames_succeed'), __name__)
+		else:
+			if is_content_rejected():
+				clear_temp_directory(state_manager.get_item('target_path'))
+				process_manager.end()
+				return 3
+			if is_process_stopping():
+				process_manager.end()
+				return 4
+			logger.error(wording.get('streaming_frames_failed'), __name__)
+			process_manager.end()
+			return 1
+	elif is_raw_processing(processor_modules):
+		# extract frames
+		logger.info(wording.get('extracting_frames').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
+		trace_stage('extract_frames')
+		if restore_target_frames(state_manager.get_item('target_path')):
+			logger.debug(wording.get('restoring_frames_succeed'), __name__)
+		elif extract_raw_frames(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end):
+			store_target_frames([ get_raw_frames_path(state_manager.get_item('target_path')) ])
+			logger.debug(wording.get('extracting_frames_succeed'), __name__)
+		else:
+			if is_process_stopping():
+				process_manager.end()
+				return 4
+			logger.error(wording.get('extracting_frames_failed'), __name__)
+			process_manager.end()
+			return 1
+		# process frames
+		if state_manager.get_item('inline_content_analysis') and screen_raw_frames(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps):
+			clear_temp_directory(state_manager.get_item('target_path'))
+			process_manager.end()
+			return 3
+		for processor_module in processor_modules:
+			logger.info(wording.get('processing'), processor_module.__name__)
+		trace_stage('process_frames', count_raw_frames(state_manager.get_item('target_path'), temp_video_resolution))
+		if process_raw_frames(processor_modules, state_manager.get_item('source_paths'), state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps):
+			for processor_module in processor_modules:
+				processor_module.post_process()
+		else:
+			if is_process_stopping():
+				process_manager.end()
+				return 4
+			logger.error(wording.get('processing_video_failed'), __name__)
+			process_manager.end()
+			return 1
+		# merge video
+		logger.info(wording.get('merging_video').format(resolution = state_manager.get_item('output_video_resolution'), fps = state_manager.get_item('output_video_fps')), __name__)
+		trace_stage('merge_video')
+		if merge_raw_frames(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), audio_input_args):
+			logger.debug(wording.get('merging_video_succeed'), __name__)
+		elif audio_input_args and not is_process_stopping() and merge_raw_frames(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), []):
+			audio_input_args = []
+			logger.debug(wording.get('merging_video_succeed'), __name__)
+		else:
+			if is_process_stopping():
+				process_manager.end()
+				return 4
+			logger.error(wording.get('merging_video_failed'), __name__)
+			process_manager.end()
+			return 1
 	else:
-		source_audio_path = get_first(filter_audio_paths(state_manager.get_item('source_paths')))
-		if source_audio_path:
-			if replace_audio(state_manager.get_item('target_path'), source_audio_path, state_manager.get_item('output_path')):
-				logger.debug(wording.get('replacing_audio_succeed'), __name__)
+		if state_manager.get_item('temp_frame_format') == 'raw':
+			state_manager.set_item('temp_frame_format', 'png')
+		if not is_stage_completed('extract_frames'):
+			# extract frames
+			logger.info(wording.get('extracting_frames').format(resolution = temp_video_resolution, fps = temp_video_fps), __name__)
+			trace_stage('extract_frames')
+			if restore_target_frames(state_manager.get_item('target_path')):
+				logger.debug(wording.get('restoring_frames_succeed'), __name__)
+			elif extract_frames(state_manager.get_item('target_path'), temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end):
+				store_target_frames(get_temp_frame_paths(state_manager.get_item('target_path')))
+				logger.debug(wording.get('extracting_frames_succeed'), __name__)
 			else:
 				if is_process_stopping():
 					process_manager.end()
 					return 4
-				logger.warn(wording.get('replacing_audio_skipped'), __name__)
-				move_temp_file(state_manager.get_item('target_path'), state_manager.get_item('output_path'))
-		else:
-			if restore_audio(state_manager.get_item('target_path'), state_manager.get_item('output_path'), state_manager.get_item('output_video_fps'), trim_frame_start, trim_frame_end):
-				logger.debug(wording.get('restoring_audio_succeed'), __name__)
-			else:
-				if is_process_stopping():
+				logger.error(wording.get('extracting_frames_failed'), __name__)
+				process_manager.end()
+				return 1
+			temp_frame_paths = get_temp_frame_paths(state_manager.get_item('target_path'))
+			if state_manager.get_item('inline_content_analysis') and screen_temp_frames(temp_frame_paths, temp_video_fps):
+				clear_temp_directory(state_manager.get_item('target_path'))
+				process_manager.end()
+				return 3
+			store_pristine_frames(state_manager.get_item('target_path'), temp_frame_paths)
+			set_frame_total(len(temp_frame_paths))
+			complete_stage('extract_frames')
+		# process frames
+		pristine_frame_paths = get_pristine_frame_paths(state_manager.get_item('target_path'))
+		if pristine_frame_paths:
+			if is_fused_processing(processor_modules):
+				for processor_module in processor_modules:
+					logger.info(wording.get('processing'), processor_module.__name__)
+				trace_stage('process_frames', len(pristine_frame_paths))
+				if process_temp_frames(processor_modules, state_manager.get_item('source_paths'), pristine_frame_paths, get_stage_frame_paths(state_manager.get_item('target_path'), pristine_frame_paths, 0), temp_video_fps, 'process_frames'):
+					for processor_module in processor_modules:
+						processor_module.post_process()
+				else:
+					if is_process_stopping():
+						process_manager.end()
+						return 4
+					logger.error(wording.get('processing_video_failed'), __name__)
 					process_manager.end()
-					return 4
-				logger.warn(wording.get('restoring_audio_skipped'), __name__)
-				move_temp_file(state_manager.get_item('target_path'), state_manager.get_item('output_path'))
+					return 1
+			elif has_frame_processors(processor_modules):
+				input_frame_paths = pristine_frame_paths
+				for processor_index, processor_module in enumerate(processor_modules):
+					output_frame_paths = get_stage_frame_paths(state_manager.get_item('target_path'), pristine_frame_paths, len(processor_modules) - processor_index - 1)
+					logger.info(wording.get('processing'), processor_module.__name__)
+					trace_stage(processor_module.__name__, len(pristine_frame_paths))
+					if is_stage_completed(processor_module.__name__) or process_temp_frames([ processor_module ], state_manager.get_item('source_paths'), input_frame_paths, output_frame_paths, temp_video_fps, processor_module.__name__):
+						complete_stage(processor_module.__name__)
+						processor_module.post_process()
+					else:
+						if is_process_stopping():
+							process_manager.end()
+							return 4
+						logger.error(wording.get('processing_video_failed'), __name__)
+						process_manager.end()
+						return 1
+					input_frame_paths = output_frame_paths
+			else:
+				temp_frame_paths = restore_pristine_frames(pristine_frame_paths, get_stage_frame_paths(state_manager.get_item('target_path'), pristine_frame_paths, 0))
+				for processor_module in processor_modules:
+					logger.info(wording.get('processing'), processor_module.__name__)
+					trace_stage(processor_module.__name__, len(temp_frame_paths))
+					processor_module.process_video(state_manager.get_item('source_paths'), temp_frame_paths)
+					processor_module.post_process()
+			if is_process_stopping():
+				return 4
+		else:
+			logger.error(wording.get('temp_frames_not_found'), __name__)
+			process_manager.end()
+			return 1
+		# merge video
+		logger.info(wording.get('merging_video').format(resolution = state_manager.get_item('output_video_resolution'), fps = state_manager.get_item('output_video_fps')), __name__)
+		trace_stage('merge_video')
+		if is_stage_completed('merge_video') and is_file(get_temp_file_path(state_manager.get_item('target_path'))):
+			logger.debug(wording.get('merging_video_succeed'), __name__)
+		elif merge_temp_frames(state_manager.get_item('target_path'), temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), audio_input_args):
+			complete_stage('merge_video')
+			logger.debug(wording.get('merging_video_succeed'), __name__)
+		elif audio_input_args and not is_process_stopping() and merge_temp_frames(state_manager.get_item('target_path'), temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), []):
+			audio_input_args = []
+			complete_stage('merge_video')
+			logger.debug(wording.get('merging_video_succeed'), __name__)
+		else:
+			if is_process_stopping():
+				process_manager.end()
+				return 4
+			logger.error(wording.get('merging_video_failed'), __name__)
+			process_manager.end()
+			return 1
+	# handle audio
+	trace_stage('handle_audio')
+	if state_manager.get_item('skip_audio'):
+		logger.info(wording.get('skipping_audio'), __name__)
+		move_temp_file(state_manager.get_item('target_path'), state_manager.get_item('output_path'))
+	elif audio_input_args:
+		logger.debug(wording.get('muxing_audio_succeed'), __name__)
+		move_temp_file(state_manager.get_item('target_path'), state_manager.get_item('output_path'))
+	else:
+		logger.warn(wording.get('restoring_audio_skipped'), __name__)
+		move_temp_file(state_manager.get_item('target_path'), state_manager.get_item('output_path'))
+	trace_stage(None)
 	# clear temp
 	logger.debug(wording.get('clearing_temp'), __name__)
 	clear_temp_directory(state_manager.get_item('target_path'))
@@ -469,6 +788,8 @@ def process_video(start_time : float) -> ErrorCode:
 		seconds = '{:.2f}'.format((time() - start_time))
 		logger.info(wording.get('processing_video_succeed').format(seconds = seconds), __name__)
 		conditional_log_statistics()
+		conditional_log_face_store_statistics()
+		conditional_log_inference_registry_statistics()
 	else:
 		logger.error(wording.get('processing_video_failed'), __name__)
 		process_manager.end()
@@ -477,6 +798,56 @@ def process_video(start_time : float) -> ErrorCode:
 	return 0
 
 
+def is_segment_processing(processor_modules : List[ModuleType]) -> bool:
+	from facefusion.frame_pipeline import has_frame_processors
+
+	if state_manager.get_item('video_segment_count') > 1:
+		if has_frame_processors(processor_modules):
+			return True
+		logger.warn(wording.get('processing_segments_not_supported'), __name__)
+	return False
+
+
+def is_image_stream_processing(processor_modules : List[ModuleType]) -> bool:
+	from facefusion.frame_pipeline import has_frame_processors
+
+	if state_manager.get_item('stream_image'):
+		if has_frame_processors(processor_modules):
+			return True
+		logger.warn(wording.get('streaming_image_not_supported'), __name__)
+	return False
+
+
+def is_stream_processing(processor_modules : List[ModuleType]) -> bool:
+	from facefusion.frame_pipeline import has_frame_processors
+
+	if state_manager.get_item('stream_video'):
+		if has_frame_processors(processor_modules):
+			return True
+		logger.warn(wording.get('streaming_frames_not_supported'), __name__)
+	return False
+
+
+def is_raw_processing(processor_modules : List[ModuleType]) -> bool:
+	from facefusion.frame_pipeline import has_frame_processors
+
+	if state_manager.get_item('temp_frame_format') == 'raw':
+		if has_frame_processors(processor_modules):
+			return True
+		logger.warn(wording.get('raw_frames_not_supported'), __name__)
+	return False
+
+
+def is_fused_processing(processor_modules : List[ModuleType]) -> bool:
+	from facefusion.frame_pipeline import has_frame_processors
+
+	if state_manager.get_item('fuse_processors'):
+		if has_frame_processors(processor_modules):
+			return True
+		logger.warn(wording.get('fusing_processors_not_supported'), __name__)
+	return False
+
+
 def is_process_stopping() -> bool:
 	if process_manager.is_stopping():
 		process_manager.end()
@@ -0,0 +1,115 @@
+import os
+import ssl
+import urllib.error
+import urllib.request
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from tqdm import tqdm
+
+from facefusion import logger, metadata, state_manager, wording
+from facefusion.filesystem import is_file
+from facefusion.typing import Download, DownloadSet
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def download_hashes_and_sources(download_hash_sets : List[DownloadSet], download_source_sets : List[DownloadSet]) -> bool:
+	hash_downloads : Dict[str, Download] = {}
+	source_downloads : Dict[str, Tuple[Download, str]] = {}
+
+	for download_hash_set in download_hash_sets:
+		for download_hash in download_hash_set.values():
+			hash_downloads.setdefault(download_hash.get('path'), download_hash)
+
+	for download_hash_set, download_source_set in zip(download_hash_sets, download_source_sets):
+		for download_name, download_source in download_source_set.items():
+			download_hash = download_hash_set.get(download_name)
+			hash_path = download_hash.get('path') if download_hash else get_hash_path(download_source.get('path'))
+			source_downloads.setdefault(download_source.get('path'), (download_source, hash_path))
+
+	with ThreadPoolExecutor(max_workers = max(state_manager.get_item('download_concurrency'), 1)) as executor:
+		with tqdm(total = len(hash_downloads) + len(source_downloads), desc = wording.get('downloading'), unit = 'file', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+			hash_results = executor.map(lambda download: conditional_download_hash(download.get('url'), download.get('path'), progress), hash_downloads.values())
+			if not all(list(hash_results)):
+				return False
+			source_results = executor.map(lambda downloads: conditional_download_source(downloads[0].get('url'), downloads[0].get('path'), downloads[1], progress), source_downloads.values())
+			return all(list(source_results))
+
+
+def conditional_download_hash(url : str, hash_path : str, progress : tqdm) -> bool:
+	if not is_file(hash_path) and download_file(url, hash_path) is None:
+		logger.error(wording.get('downloading_failed').format(url = url), __name__)
+		return False
+	progress.update()
+	return True
+
+
+def conditional_download_source(url : str, source_path : str, hash_path : str, progress : tqdm) -> bool:
+	hash_content = read_hash(hash_path)
+	source_hash = None
+
+	if hash_content:
+		if is_file(source_path):
+			source_crc32 = calc_file_crc32(source_path)
+			source_hash = format(source_crc32, '08x')
+			if source_hash != hash_content:
+				source_hash = download_file(url, source_path, source_crc32)
+		if source_hash != hash_content:
+			source_hash = download_file(url, source_path)
+		if source_hash == hash_content:
+			progress.update()
+			return True
+	if is_file(source_path):
+		os.remove(source_path)
+	logger.error(wording.get('validating_source_failed').format(source_path = source_path), __name__)
+	return False
+
+
+def download_file(url : str, download_path : str, download_crc32 : Optional[int] = None) -> Optional[str]:
+	download_size = os.path.getsize(download_path) if download_crc32 is not None and is_file(download_path) else 0
+	download_crc32 = download_crc32 if download_size else 0
+	request = urllib.request.Request(url, headers = { 'User-Agent': metadata.get('name') + '/' + metadata.get('version') })
+
+	if download_size:
+		request.add_header('Range', 'bytes=' + str(download_size) + '-')
+	os.makedirs(os.path.dirname(download_path) or '.', exist_ok = True)
+
+	try:
+		with urllib.request.urlopen(request, context = ssl.create_default_context()) as response:
+			if response.status != 206:
+				download_size = 0
+				download_crc32 = 0
+			with open(download_path, 'ab' if download_size else 'wb') as output_file:
+				for chunk in iter(lambda: response.read(DOWNLOAD_CHUNK_SIZE), b''):
+					output_file.write(chunk)
+					download_crc32 = zlib.crc32(chunk, download_crc32)
+	except urllib.error.HTTPError as exception:
+		if exception.code == 416 and download_size:
+			return download_file(url, download_path)
+		return None
+	except (urllib.error.URLError, OSError):
+		return None
+	return format(download_crc32, '08x')
+
+
+def calc_file_crc32(file_path : str) -> int:
+	file_crc32 = 0
+
+	with open(file_path, 'rb') as input_file:
+		for chunk in iter(lambda: input_file.read(DOWNLOAD_CHUNK_SIZE), b''):
+			file_crc32 = zlib.crc32(chunk, file_crc32)
+	return file_crc32
+
+
+def get_hash_path(source_path : str) -> str:
+	source_file_path, _ = os.path.splitext(source_path)
+	return source_file_path + '.hash'
+
+
+def read_hash(hash_path : str) -> Optional[str]:
+	if is_file(hash_path):
+		with open(hash_path) as input_file:
+			return input_file.read().strip()
+	return None
@@ -0,0 +1,147 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy
+
+from facefusion import logger, state_manager
+from facefusion.target_cache import get_target_faces, set_target_faces
+from facefusion.typing import Face, FaceSet, FaceStore, VisionFrame
+
+FACE_STORE : FaceStore =\
+{
+	'static_faces': OrderedDict(),
+	'reference_faces': {}
+}
+FACE_STORE_SIZES : Dict[str, int] = {}
+FACE_STORE_STATISTICS : Dict[str, int] =\
+{
+	'hits': 0,
+	'misses': 0,
+	'evictions': 0,
+	'memory_size': 0
+}
+FACE_STORE_LOCK : threading.Lock = threading.Lock()
+
+
+def get_face_store() -> FaceStore:
+	return FACE_STORE
+
+
+def get_static_faces(vision_frame : VisionFrame) -> Optional[List[Face]]:
+	frame_hash = create_frame_hash(vision_frame)
+
+	if frame_hash:
+		cache_key = create_cache_key(frame_hash)
+
+		with FACE_STORE_LOCK:
+			if cache_key in FACE_STORE.get('static_faces'):
+				FACE_STORE.get('static_faces').move_to_end(cache_key)
+				FACE_STORE_STATISTICS['hits'] += 1
+				return FACE_STORE.get('static_faces').get(cache_key)
+			FACE_STORE_STATISTICS['misses'] += 1
+		faces = get_target_faces(cache_key)
+
+		if faces:
+			store_static_faces(cache_key, faces)
+		return faces
+	return None
+
+
+def set_static_faces(vision_frame : VisionFrame, faces : List[Face]) -> None:
+	frame_hash = create_frame_hash(vision_frame)
+
+	if frame_hash:
+		cache_key = create_cache_key(frame_hash)
+		set_target_faces(cache_key, faces)
+		store_static_faces(cache_key, faces)
+
+
+def prime_static_faces(vision_frame : VisionFrame, faces : List[Face]) -> None:
+	frame_hash = create_frame_hash(vision_frame)
+
+	if frame_hash:
+		store_static_faces(create_cache_key(frame_hash), faces)
+
+
+def store_static_faces(cache_key : str, faces : List[Face]) -> None:
+	face_cache_memory_limit = state_manager.get_item('face_cache_memory_limit') * 1024 * 1024
+	faces_size = len(cache_key) + sum(calc_face_size(face) for face in faces)
+
+	with FACE_STORE_LOCK:
+		if cache_key not in FACE_STORE.get('static_faces') and faces_size <= face_cache_memory_limit:
+			FACE_STORE.get('static_faces')[cache_key] = faces
+			FACE_STORE_SIZES[cache_key] = faces_size
+			FACE_STORE_STATISTICS['memory_size'] += faces_size
+
+		while FACE_STORE_STATISTICS.get('memory_size') > face_cache_memory_limit and FACE_STORE.get('static_faces'):
+			evict_static_faces()
+
+
+def evict_static_faces() -> None:
+	cache_key, _ = FACE_STORE.get('static_faces').popitem(last = False)
+	FACE_STORE_STATISTICS['memory_size'] -= FACE_STORE_SIZES.pop(cache_key)
+	FACE_STORE_STATISTICS['evictions'] += 1
+
+
+def clear_static_faces() -> None:
+	with FACE_STORE_LOCK:
+		FACE_STORE.get('static_faces').clear()
+		FACE_STORE_SIZES.clear()
+		FACE_STORE_STATISTICS['memory_size'] = 0
+
+
+def create_frame_hash(vision_frame : VisionFrame) -> Optional[str]:
+	return hashlib.sha1(vision_frame.tobytes()).hexdigest() if numpy.any(vision_frame) else None
+
+
+def create_cache_key(frame_hash : str) -> str:
+	face_analyser_keys =\
+	[
+		state_manager.get_item('face_detector_model'),
+		state_manager.get_item('face_detector_size'),
+		'-'.join(map(str, state_manager.get_item('face_detector_angles'))),
+		state_manager.get_item('face_detector_score'),
+		state_manager.get_item('face_landmarker_model'),
+		state_manager.get_item('face_landmarker_score')
+	]
+	return frame_hash + '.' + '.'.join(map(str, face_analyser_keys))
+
+
+def calc_face_size(face : Face) -> int:
+	return sum(calc_value_size(value) for value in face)
+
+
+def calc_value_size(value : Any) -> int:
+	if isinstance(value, numpy.ndarray):
+		return value.nbytes
+	if isinstance(value, dict):
+		return sum(calc_value_size(dict_value) for dict_value in value.values())
+	return 8
+
+
+def get_face_store_statistics() -> Dict[str, int]:
+	with FACE_STORE_LOCK:
+		return FACE_STORE_STATISTICS.copy()
+
+
+def conditional_log_face_store_statistics() -> None:
+	if state_manager.get_item('log_level') == 'debug':
+		logger.debug(str(get_face_store_statistics()), __name__)
+
+
+def get_reference_faces() -> Optional[FaceSet]:
+	if FACE_STORE.get('reference_faces'):
+		return FACE_STORE.get('reference_faces')
+	return None
+
+
+def append_reference_face(name : str, face : Face) -> None:
+	if name not in FACE_STORE.get('reference_faces'):
+		FACE_STORE.get('reference_faces')[name] = []
+	FACE_STORE.get('reference_faces').get(name).append(face)
+
+
+def clear_reference_faces() -> None:
+	FACE_STORE['reference_faces'] = {}
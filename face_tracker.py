@@ -0,0 +1,99 @@
+from typing import Any, Dict, List, Optional
+
+import cv2
+import numpy
+
+from facefusion import state_manager
+from facefusion.face_analyser import get_many_faces
+from facefusion.face_store import prime_static_faces
+from facefusion.typing import Face, Matrix, Points, VisionFrame
+
+FACE_TRACKER : Dict[str, Any] =\
+{
+	'gray_frame': None,
+	'faces': [],
+	'frame_number': -1,
+	'keyframe_number': -1
+}
+SCENE_CUT_THRESHOLD = 40.0
+
+
+def track_faces(frame_number : int, vision_frame : VisionFrame) -> List[Face]:
+	gray_frame = cv2.cvtColor(vision_frame, cv2.COLOR_BGR2GRAY)
+	faces = None
+
+	if is_tracking_frame(frame_number, gray_frame):
+		faces = propagate_faces(FACE_TRACKER.get('gray_frame'), gray_frame, FACE_TRACKER.get('faces'))
+	if faces is None:
+		faces = get_many_faces([ vision_frame ])
+		FACE_TRACKER['keyframe_number'] = frame_number
+	else:
+		prime_static_faces(vision_frame, faces)
+	FACE_TRACKER['gray_frame'] = gray_frame
+	FACE_TRACKER['faces'] = faces
+	FACE_TRACKER['frame_number'] = frame_number
+	return faces
+
+
+def is_tracking_frame(frame_number : int, gray_frame : VisionFrame) -> bool:
+	previous_gray_frame = FACE_TRACKER.get('gray_frame')
+
+	if previous_gray_frame is None or not FACE_TRACKER.get('faces'):
+		return False
+	if frame_number != FACE_TRACKER.get('frame_number') + 1:
+		return False
+	if frame_number - FACE_TRACKER.get('keyframe_number') >= state_manager.get_item('face_tracker_interval'):
+		return False
+	return not is_scene_cut(previous_gray_frame, gray_frame)
+
+
+def is_scene_cut(previous_gray_frame : VisionFrame, gray_frame : VisionFrame) -> bool:
+	previous_thumbnail = cv2.resize(previous_gray_frame, (64, 64), interpolation = cv2.INTER_AREA).astype(numpy.float32)
+	thumbnail = cv2.resize(gray_frame, (64, 64), interpolation = cv2.INTER_AREA).astype(numpy.float32)
+	return numpy.mean(numpy.abs(previous_thumbnail - thumbnail)) > SCENE_CUT_THRESHOLD
+
+
+def propagate_faces(previous_gray_frame : VisionFrame, gray_frame : VisionFrame, faces : List[Face]) -> Optional[List[Face]]:
+	propagated_faces = []
+
+	for face in faces:
+		propagated_face = propagate_face(previous_gray_frame, gray_frame, face)
+		if propagated_face is None:
+			return None
+		propagated_faces.append(propagated_face)
+	return propagated_faces
+
+
+def propagate_face(previous_gray_frame : VisionFrame, gray_frame : VisionFrame, face : Face) -> Optional[Face]:
+	face_landmark_points = face.landmark_set.get('68').reshape(-1, 1, 2).astype(numpy.float32)
+	tracked_points, tracked_status, _ = cv2.calcOpticalFlowPyrLK(previous_gray_frame, gray_frame, face_landmark_points, None, winSize = (21, 21), maxLevel = 3)
+	tracked_mask = tracked_status.ravel() == 1
+	tracked_score = face.score_set.get('detector') * numpy.mean(tracked_mask)
+
+	if tracked_score < state_manager.get_item('face_detector_score') or numpy.sum(tracked_mask) < 3:
+		return None
+	affine_matrix, _ = cv2.estimateAffinePartial2D(face_landmark_points[tracked_mask], tracked_points[tracked_mask])
+
+	if affine_matrix is None:
+		return None
+	bounding_box = face.bounding_box
+	bounding_box_points = numpy.array([ [ bounding_box[0], bounding_box[1] ], [ bounding_box[2], bounding_box[1] ], [ bounding_box[0], bounding_box[3] ], [ bounding_box[2], bounding_box[3] ] ])
+	bounding_box_points = transform_points(bounding_box_points, affine_matrix)
+	landmark_set = { landmark_name: transform_points(face_landmark, affine_matrix) for landmark_name, face_landmark in face.landmark_set.items() }
+	return face._replace(bounding_box = numpy.concatenate([ bounding_box_points.min(axis = 0), bounding_box_points.max(axis = 0) ]).astype(bounding_box.dtype), landmark_set = landmark_set)
+
+
+def transform_points(points : Points, affine_matrix : Matrix) -> Points:
+	return cv2.transform(points.reshape(-1, 1, 2).astype(numpy.float32), affine_matrix).reshape(-1, 2).astype(points.dtype)
+
+
+def conditional_track_faces(frame_number : int, vision_frame : VisionFrame) -> None:
+	if state_manager.get_item('face_tracker_interval') > 1:
+		track_faces(frame_number, vision_frame)
+
+
+def clear_face_tracker() -> None:
+	FACE_TRACKER['gray_frame'] = None
+	FACE_TRACKER['faces'] = []
+	FACE_TRACKER['frame_number'] = -1
+	FACE_TRACKER['keyframe_number'] = -1
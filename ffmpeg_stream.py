@@ -0,0 +1,139 @@
+import shutil
+import subprocess
+from typing import List, Optional
+
+import numpy
+
+from facefusion import state_manager
+from facefusion.common_helper import get_first
+from facefusion.ffmpeg import map_amf_preset, map_nvenc_preset, map_qsv_preset, run_ffmpeg
+from facefusion.filesystem import filter_audio_paths
+from facefusion.temp_helper import get_temp_file_path, get_temp_frames_pattern
+from facefusion.typing import Fps, Resolution, VisionFrame
+from facefusion.vision import detect_video_fps, unpack_resolution
+
+
+def open_ffmpeg_pipe(args : List[str]) -> subprocess.Popen[bytes]:
+	commands = [ shutil.which('ffmpeg'), '-loglevel', 'error' ]
+	commands.extend(args)
+	return subprocess.Popen(commands, stdin = subprocess.PIPE, stdout = subprocess.PIPE)
+
+
+def open_decoder(target_path : str, temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> subprocess.Popen[bytes]:
+	temp_video_width, temp_video_height = unpack_resolution(temp_video_resolution)
+	commands = [ '-i', target_path, '-vf', 'trim=start_frame=' + str(trim_frame_start) + ':end_frame=' + str(trim_frame_end) + ',scale=' + str(temp_video_width) + ':' + str(temp_video_height) + ',fps=' + str(temp_video_fps) ]
+	commands.extend([ '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-vsync', '0', '-' ])
+	return open_ffmpeg_pipe(commands)
+
+
+def open_segment_decoder(target_path : str, temp_video_resolution : str, temp_video_fps : Fps, target_video_fps : Fps, segment_frame_start : int, segment_frame_end : int) -> subprocess.Popen[bytes]:
+	temp_video_width, temp_video_height = unpack_resolution(temp_video_resolution)
+	seek_time = max(segment_frame_start - 0.5, 0) / target_video_fps
+	commands = [ '-ss', str(seek_time), '-i', target_path, '-vf', 'trim=end_frame=' + str(segment_frame_end - segment_frame_start) + ',scale=' + str(temp_video_width) + ':' + str(temp_video_height) + ',fps=' + str(temp_video_fps) ]
+	commands.extend([ '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-vsync', '0', '-' ])
+	return open_ffmpeg_pipe(commands)
+
+
+def open_encoder(output_path : str, temp_video_resolution : str, temp_video_fps : Fps, output_video_resolution : str, output_video_fps : Fps, audio_input_args : List[str]) -> subprocess.Popen[bytes]:
+	output_video_width, output_video_height = unpack_resolution(output_video_resolution)
+	commands = [ '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', temp_video_resolution, '-r', str(temp_video_fps), '-i', '-' ]
+	commands.extend(audio_input_args)
+	commands.extend(create_encoder_args(state_manager.get_item('output_video_encoder'), state_manager.get_item('output_video_preset'), state_manager.get_item('output_video_quality')))
+	commands.extend(create_audio_output_args(audio_input_args))
+	commands.extend([ '-vf', 'scale=' + str(output_video_width) + ':' + str(output_video_height) + ',framerate=fps=' + str(output_video_fps), '-pix_fmt', 'yuv420p', '-colorspace', 'bt709', '-y', output_path ])
+	return open_ffmpeg_pipe(commands)
+
+
+def merge_temp_frames(target_path : str, temp_video_fps : Fps, output_video_resolution : str, output_video_fps : Fps, audio_input_args : List[str]) -> bool:
+	output_video_width, output_video_height = unpack_resolution(output_video_resolution)
+	commands = [ '-r', str(temp_video_fps), '-i', get_temp_frames_pattern(target_path, '%08d') ]
+	commands.extend(audio_input_args)
+	commands.extend(create_encoder_args(state_manager.get_item('output_video_encoder'), state_manager.get_item('output_video_preset'), state_manager.get_item('output_video_quality')))
+	commands.extend(create_audio_output_args(audio_input_args))
+	commands.extend([ '-vf', 'scale=' + str(output_video_width) + ':' + str(output_video_height) + ',framerate=fps=' + str(output_video_fps), '-pix_fmt', 'yuv420p', '-colorspace', 'bt709', '-y', get_temp_file_path(target_path) ])
+	process = run_ffmpeg(commands)
+	process.communicate()
+	return process.returncode == 0
+
+
+def create_audio_input_args(source_paths : List[str], target_path : str, trim_frame_start : int, trim_frame_end : int) -> List[str]:
+	source_audio_path = get_first(filter_audio_paths(source_paths))
+
+	if state_manager.get_item('skip_audio'):
+		return []
+	if source_audio_path:
+		return [ '-i', source_audio_path ]
+	if has_audio_stream(target_path):
+		target_video_fps = detect_video_fps(target_path)
+		return [ '-ss', str(trim_frame_start / target_video_fps), '-to', str(trim_frame_end / target_video_fps), '-i', target_path ]
+	return []
+
+
+def create_audio_output_args(audio_input_args : List[str]) -> List[str]:
+	if audio_input_args:
+		return [ '-map', '0:v:0', '-map', '1:a:0', '-c:a', state_manager.get_item('output_audio_encoder'), '-shortest' ]
+	return []
+
+
+def has_audio_stream(target_path : str) -> bool:
+	commands = [ shutil.which('ffprobe'), '-loglevel', 'error', '-select_streams', 'a:0', '-show_entries', 'stream=index', '-of', 'csv=p=0', target_path ]
+	return bool(subprocess.run(commands, stdout = subprocess.PIPE).stdout.strip())
+
+
+def create_encoder_args(output_video_encoder : str, output_video_preset : str, output_video_quality : int) -> List[str]:
+	output_video_compression = round(51 - (output_video_quality * 0.51))
+	commands = [ '-c:v', output_video_encoder ]
+
+	if output_video_encoder in [ 'libx264', 'libx265' ]:
+		commands.extend([ '-crf', str(output_video_compression), '-preset', output_video_preset ])
+	if output_video_encoder in [ 'libvpx-vp9' ]:
+		output_video_compression = round(63 - (output_video_quality * 0.63))
+		commands.extend([ '-crf', str(output_video_compression) ])
+	if output_video_encoder in [ 'h264_nvenc', 'hevc_nvenc' ]:
+		commands.extend([ '-cq', str(output_video_compression), '-preset', map_nvenc_preset(output_video_preset) ])
+	if output_video_encoder in [ 'h264_amf', 'hevc_amf' ]:
+		commands.extend([ '-qp_i', str(output_video_compression), '-qp_p', str(output_video_compression), '-quality', map_amf_preset(output_video_preset) ])
+	if output_video_encoder in [ 'h264_qsv', 'hevc_qsv' ]:
+		commands.extend([ '-qp', str(output_video_compression), '-preset', map_qsv_preset(output_video_preset) ])
+	if output_video_encoder in [ 'h264_videotoolbox', 'hevc_videotoolbox' ]:
+		commands.extend([ '-q:v', str(output_video_quality) ])
+	return commands
+
+
+def read_pipe_frame(process : subprocess.Popen[bytes], resolution : Resolution) -> Optional[VisionFrame]:
+	width, height = resolution
+	frame_buffer = bytearray(width * height * 3)
+	frame_view = memoryview(frame_buffer)
+	frame_position = 0
+
+	while frame_position < len(frame_buffer):
+		read_size = process.stdout.readinto(frame_view[frame_position:])
+		if not read_size:
+			return None
+		frame_position += read_size
+	return numpy.frombuffer(frame_buffer, dtype = numpy.uint8).reshape(height, width, 3)
+
+
+def write_pipe_frame(process : subprocess.Popen[bytes], vision_frame : VisionFrame) -> bool:
+	try:
+		process.stdin.write(numpy.ascontiguousarray(vision_frame).tobytes())
+		return True
+	except (BrokenPipeError, ValueError):
+		return False
+
+
+def close_pipe(process : subprocess.Popen[bytes]) -> bool:
+	if process.stdin:
+		try:
+			process.stdin.close()
+		except BrokenPipeError:
+			pass
+	if process.stdout:
+		process.stdout.close()
+	return process.wait() == 0
+
+
+def terminate_pipe(process : subprocess.Popen[bytes]) -> None:
+	if process.poll() is None:
+		process.terminate()
+	close_pipe(process)
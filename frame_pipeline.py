@@ -0,0 +1,279 @@
+import os
+import subprocess
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from queue import Empty, Queue
+from types import ModuleType
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+import cv2
+import numpy
+from tqdm import tqdm
+
+from facefusion import process_manager, state_manager, wording
+from facefusion.audio import create_empty_audio_frame, get_voice_frame
+from facefusion.common_helper import get_first
+from facefusion.content_screener import init_content_screener, is_content_rejected, screen_frame, screen_frames
+from facefusion.face_analyser import get_average_face
+from facefusion.face_store import get_reference_faces
+from facefusion.face_tracker import clear_face_tracker, conditional_track_faces
+from facefusion.ffmpeg_stream import close_pipe, open_decoder, open_encoder, read_pipe_frame, terminate_pipe, write_pipe_frame
+from facefusion.filesystem import filter_audio_paths
+from facefusion.raw_frame_store import open_raw_frames, read_raw_frame, write_raw_frame
+from facefusion.source_face_store import get_source_faces
+from facefusion.step_checkpoint import is_frame_processed, mark_frame_processed
+from facefusion.temp_helper import get_temp_file_path
+from facefusion.tracer import close_span, open_span
+from facefusion.typing import AudioFrame, Fps, VisionFrame
+from facefusion.vision import detect_video_fps, read_image, unpack_resolution, write_image
+
+
+def has_frame_processors(processor_modules : List[ModuleType]) -> bool:
+	return all(hasattr(processor_module, 'process_frame') for processor_module in processor_modules)
+
+
+def create_frame_inputs(source_paths : List[str], temp_video_fps : Optional[Fps]) -> Dict[str, Any]:
+	return\
+	{
+		'reference_faces': get_reference_faces() if 'reference' in state_manager.get_item('face_selector_mode') else None,
+		'source_face': get_average_face(get_source_faces(source_paths)),
+		'source_audio_path': get_first(filter_audio_paths(source_paths)),
+		'temp_video_fps': temp_video_fps
+	}
+
+
+def get_source_audio_frame(frame_inputs : Dict[str, Any], frame_number : int) -> AudioFrame:
+	source_audio_path = frame_inputs.get('source_audio_path')
+	temp_video_fps = frame_inputs.get('temp_video_fps')
+
+	if source_audio_path and temp_video_fps:
+		source_audio_frame = get_voice_frame(source_audio_path, temp_video_fps, frame_number)
+		if numpy.any(source_audio_frame):
+			return source_audio_frame
+	return create_empty_audio_frame()
+
+
+def process_vision_frame(processor_modules : List[ModuleType], frame_inputs : Dict[str, Any], frame_number : int, vision_frame : VisionFrame) -> VisionFrame:
+	source_audio_frame = get_source_audio_frame(frame_inputs, frame_number)
+	source_vision_frame = vision_frame.copy()
+
+	for processor_module in processor_modules:
+		frame_span = open_span(processor_module.__name__, 'frame', 1)
+		vision_frame = processor_module.process_frame(
+		{
+			'reference_faces': frame_inputs.get('reference_faces'),
+			'source_face': frame_inputs.get('source_face'),
+			'source_audio_frame': source_audio_frame,
+			'source_vision_frame': source_vision_frame,
+			'target_vision_frame': vision_frame
+		})
+		close_span(frame_span)
+	return vision_frame
+
+
+def read_stream_image(target_path : str, temp_image_resolution : str) -> Optional[VisionFrame]:
+	vision_frame = read_image(target_path)
+
+	if vision_frame is not None:
+		return resize_vision_frame(vision_frame, temp_image_resolution)
+	return None
+
+
+def stream_image(processor_modules : List[ModuleType], source_paths : List[str], vision_frame : VisionFrame, output_path : str, output_image_resolution : str) -> bool:
+	if process_manager.is_stopping():
+		return False
+	vision_frame = process_vision_frame(processor_modules, create_frame_inputs(source_paths, None), 0, vision_frame)
+	if process_manager.is_stopping():
+		return False
+	vision_frame = resize_vision_frame(vision_frame, output_image_resolution)
+	return write_output_image(output_path, vision_frame, state_manager.get_item('output_image_quality'))
+
+
+def resize_vision_frame(vision_frame : VisionFrame, resolution : str) -> VisionFrame:
+	width, height = unpack_resolution(resolution)
+	frame_height, frame_width = vision_frame.shape[:2]
+
+	if (frame_width, frame_height) != (width, height):
+		interpolation = cv2.INTER_AREA if width < frame_width else cv2.INTER_CUBIC
+		return cv2.resize(vision_frame, (width, height), interpolation = interpolation)
+	return vision_frame
+
+
+def write_output_image(output_path : str, vision_frame : VisionFrame, output_image_quality : int) -> bool:
+	_, output_extension = os.path.splitext(output_path)
+	is_encoded, output_buffer = cv2.imencode(output_extension, vision_frame, create_image_encode_params(output_extension, output_image_quality))
+
+	if is_encoded:
+		output_buffer.tofile(output_path)
+	return is_encoded
+
+
+def create_image_encode_params(output_extension : str, output_image_quality : int) -> List[int]:
+	if output_extension.lower() in [ '.jpg', '.jpeg' ]:
+		return [ cv2.IMWRITE_JPEG_QUALITY, output_image_quality ]
+	if output_extension.lower() == '.webp':
+		return [ cv2.IMWRITE_WEBP_QUALITY, max(output_image_quality, 1) ]
+	if output_extension.lower() == '.png':
+		return [ cv2.IMWRITE_PNG_COMPRESSION, round(9 - output_image_quality * 0.09) ]
+	return []
+
+
+def process_temp_frame(processor_modules : List[ModuleType], source_paths : List[str], frame_number : int, temp_frame_path : str) -> bool:
+	vision_frame = read_image(temp_frame_path)
+	return write_processed_frame(processor_modules, create_frame_inputs(source_paths, None), frame_number, vision_frame, lambda _, output_vision_frame: write_image(temp_frame_path, output_vision_frame))
+
+
+def write_processed_frame(processor_modules : List[ModuleType], frame_inputs : Dict[str, Any], frame_number : int, vision_frame : VisionFrame, write_frame : Callable[[int, VisionFrame], bool]) -> bool:
+	if process_manager.is_stopping():
+		return False
+	vision_frame = process_vision_frame(processor_modules, frame_inputs, frame_number, vision_frame)
+	frame_span = open_span('write_frame', 'frame', 1)
+	is_written = write_frame(frame_number, vision_frame)
+	close_span(frame_span)
+	return is_written
+
+
+def process_temp_frames(processor_modules : List[ModuleType], source_paths : List[str], input_frame_paths : List[str], output_frame_paths : List[str], temp_video_fps : Fps, stage : str) -> bool:
+	return process_frames(processor_modules, create_frame_inputs(source_paths, temp_video_fps), stage, len(input_frame_paths), lambda frame_number: read_image(input_frame_paths[frame_number]), lambda frame_number, vision_frame: write_image(output_frame_paths[frame_number], vision_frame))
+
+
+def process_raw_frames(processor_modules : List[ModuleType], source_paths : List[str], target_path : str, temp_video_resolution : str, temp_video_fps : Fps) -> bool:
+	raw_frames = open_raw_frames(target_path, temp_video_resolution)
+
+	if raw_frames is None:
+		return False
+	is_processed = process_frames(processor_modules, create_frame_inputs(source_paths, temp_video_fps), 'process_frames', len(raw_frames), lambda frame_number: read_raw_frame(raw_frames, frame_number), lambda frame_number, vision_frame: write_raw_frame(raw_frames, frame_number, vision_frame))
+	raw_frames.flush()
+	return is_processed
+
+
+def screen_raw_frames(target_path : str, temp_video_resolution : str, temp_video_fps : Fps) -> bool:
+	raw_frames = open_raw_frames(target_path, temp_video_resolution)
+
+	if raw_frames is None:
+		return False
+	return screen_frames(len(raw_frames), lambda frame_number: read_raw_frame(raw_frames, frame_number), temp_video_fps)
+
+
+def process_frames(processor_modules : List[ModuleType], frame_inputs : Dict[str, Any], stage : str, frame_total : int, read_frame : Callable[[int], VisionFrame], write_frame : Callable[[int, VisionFrame], bool]) -> bool:
+	execution_thread_count = state_manager.get_item('execution_thread_count')
+	future_queue : Deque[Tuple[int, Future[bool]]] = deque()
+	is_processed = True
+	clear_face_tracker()
+
+	with tqdm(total = frame_total, desc = wording.get('processing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+		with ThreadPoolExecutor(max_workers = execution_thread_count) as executor:
+			for frame_number in range(frame_total):
+				if process_manager.is_stopping():
+					is_processed = False
+					break
+				if is_frame_processed(stage, frame_number):
+					progress.update()
+					continue
+				frame_span = open_span('read_frame', 'frame', 1)
+				vision_frame = read_frame(frame_number)
+				close_span(frame_span)
+				conditional_track_faces(frame_number, vision_frame)
+				future_queue.append((frame_number, executor.submit(write_processed_frame, processor_modules, frame_inputs, frame_number, vision_frame, write_frame)))
+				if len(future_queue) >= execution_thread_count * 2:
+					is_processed = resolve_processed_frame(stage, future_queue.popleft()) and is_processed
+					progress.update()
+			while future_queue:
+				is_processed = resolve_processed_frame(stage, future_queue.popleft()) and is_processed
+				progress.update()
+	return is_processed
+
+
+def resolve_processed_frame(stage : str, frame_future : Tuple[int, Future[bool]]) -> bool:
+	frame_number, future = frame_future
+
+	if future.result():
+		mark_frame_processed(stage, frame_number)
+		return True
+	return False
+
+
+def read_stream_frames(decoder : subprocess.Popen[bytes], temp_video_resolution : str, frame_number : int, frame_queue : Queue[Optional[VisionFrame]]) -> None:
+	resolution = unpack_resolution(temp_video_resolution)
+
+	while not process_manager.is_stopping():
+		frame_span = open_span('decode_frame', 'frame', 1)
+		vision_frame = read_pipe_frame(decoder, resolution)
+		close_span(frame_span)
+		if vision_frame is None:
+			break
+		if state_manager.get_item('inline_content_analysis') and screen_frame(frame_number, vision_frame):
+			break
+		conditional_track_faces(frame_number, vision_frame)
+		frame_queue.put(vision_frame)
+		frame_number += 1
+	frame_queue.put(None)
+
+
+def stream_video(processor_modules : List[ModuleType], source_paths : List[str], target_path : str, temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int, audio_input_args : List[str]) -> bool:
+	decoder = open_decoder(target_path, temp_video_resolution, temp_video_fps, trim_frame_start, trim_frame_end)
+	encoder = open_encoder(get_temp_file_path(target_path), temp_video_resolution, temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), audio_input_args)
+	frame_total = round((trim_frame_end - trim_frame_start) * temp_video_fps / detect_video_fps(target_path))
+	if state_manager.get_item('inline_content_analysis'):
+		init_content_screener(frame_total, temp_video_fps)
+
+	with tqdm(total = frame_total, desc = wording.get('processing'), unit = 'frame', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+		return stream_frames(processor_modules, create_frame_inputs(source_paths, temp_video_fps), decoder, encoder, temp_video_resolution, 0, progress)
+
+
+def stream_frames(processor_modules : List[ModuleType], frame_inputs : Dict[str, Any], decoder : subprocess.Popen[bytes], encoder : subprocess.Popen[bytes], temp_video_resolution : str, frame_number : int, progress : tqdm) -> bool:
+	stream_queue_depth = max(state_manager.get_item('stream_queue_depth'), 1)
+	frame_queue : Queue[Optional[VisionFrame]] = Queue(maxsize = stream_queue_depth)
+	future_queue : Deque[Future[VisionFrame]] = deque()
+	reader = threading.Thread(target = read_stream_frames, args = (decoder, temp_video_resolution, frame_number, frame_queue), daemon = True)
+	frame_start = frame_number
+	is_written = True
+	is_streamed = False
+	clear_face_tracker()
+	reader.start()
+
+	try:
+		with ThreadPoolExecutor(max_workers = state_manager.get_item('execution_thread_count')) as executor:
+			while is_written:
+				vision_frame = frame_queue.get()
+				if vision_frame is None:
+					break
+				future_queue.append(executor.submit(process_vision_frame, processor_modules, frame_inputs, frame_number, vision_frame))
+				frame_number += 1
+				if len(future_queue) >= stream_queue_depth:
+					is_written = encode_stream_frame(encoder, future_queue.popleft())
+					progress.update()
+			while future_queue and is_written:
+				is_written = encode_stream_frame(encoder, future_queue.popleft())
+				progress.update()
+		is_streamed = not process_manager.is_stopping() and not is_content_rejected() and is_written
+	finally:
+		if not is_streamed and decoder.poll() is None:
+			decoder.terminate()
+		drain_stream_frames(reader, frame_queue)
+		if is_streamed:
+			is_decoded = close_pipe(decoder)
+			is_encoded = close_pipe(encoder)
+			is_streamed = is_decoded and is_encoded and frame_number > frame_start
+		else:
+			terminate_pipe(decoder)
+			terminate_pipe(encoder)
+	return is_streamed
+
+
+def drain_stream_frames(reader : threading.Thread, frame_queue : Queue[Optional[VisionFrame]]) -> None:
+	while reader.is_alive():
+		try:
+			frame_queue.get(timeout = 0.1)
+		except Empty:
+			continue
+	reader.join()
+
+
+def encode_stream_frame(encoder : subprocess.Popen[bytes], future : Future[VisionFrame]) -> bool:
+	vision_frame = future.result()
+	frame_span = open_span('encode_frame', 'frame', 1)
+	is_written = write_pipe_frame(encoder, vision_frame)
+	close_span(frame_span)
+	return is_written
@@ -0,0 +1,67 @@
+from time import sleep
+from typing import Dict, List
+
+from onnxruntime import InferenceSession
+
+from facefusion import process_manager, state_manager
+from facefusion.batch_inference import conditional_batch_session
+from facefusion.execution import create_inference_execution_providers
+from facefusion.inference_registry import create_session_key, get_inference_session, refresh_inference_sessions
+from facefusion.model_variant import resolve_model_path
+from facefusion.preview_cache import PreviewInferenceSession, is_preview_context
+from facefusion.typing import DownloadSet, ExecutionProvider, InferencePool
+
+INFERENCE_POOLS : Dict[str, InferencePool] = {}
+INFERENCE_SESSIONS : Dict[str, Dict[str, InferenceSession]] = {}
+
+
+def get_inference_pool(model_context : str, model_sources : DownloadSet) -> InferencePool:
+	while process_manager.is_checking():
+		sleep(0.5)
+	execution_device_id = state_manager.get_item('execution_device_id')
+	execution_providers = state_manager.get_item('execution_providers')
+	pool_context = get_pool_context(model_context, execution_device_id, is_preview_context())
+	inference_sessions = INFERENCE_SESSIONS.get(pool_context)
+
+	if pool_context in INFERENCE_POOLS and inference_sessions and refresh_inference_sessions(inference_sessions):
+		return INFERENCE_POOLS.get(pool_context)
+	inference_pool : InferencePool = {}
+	inference_sessions = {}
+
+	for model_name, model_source in model_sources.items():
+		model_path = model_source.get('path')
+		session_key = create_session_key(model_path, state_manager.get_item('model_precision'), execution_device_id, execution_providers)
+		inference_session = get_inference_session(session_key, model_path, lambda: create_inference_session(model_path, execution_device_id, execution_providers))
+
+		if is_preview_context():
+			inference_pool[model_name] = PreviewInferenceSession(inference_session)
+		else:
+			inference_pool[model_name] = conditional_batch_session(model_context, execution_providers, inference_session)
+		inference_sessions[session_key] = inference_session
+	INFERENCE_POOLS[pool_context] = inference_pool
+	INFERENCE_SESSIONS[pool_context] = inference_sessions
+	return inference_pool
+
+
+def clear_inference_pool(model_context : str) -> None:
+	inference_context = get_inference_context(model_context)
+
+	for pool_context in list(INFERENCE_POOLS.keys()):
+		if pool_context.startswith(inference_context + '.'):
+			INFERENCE_POOLS.pop(pool_context, None)
+			INFERENCE_SESSIONS.pop(pool_context, None)
+
+
+def create_inference_session(model_path : str, execution_device_id : str, execution_providers : List[ExecutionProvider]) -> InferenceSession:
+	model_path = resolve_model_path(model_path, execution_providers)
+	inference_execution_providers = create_inference_execution_providers(execution_device_id, execution_providers)
+	return InferenceSession(model_path, providers = inference_execution_providers)
+
+
+def get_inference_context(model_context : str) -> str:
+	execution_providers = state_manager.get_item('execution_providers')
+	return model_context + '.' + '_'.join(execution_providers)
+
+
+def get_pool_context(model_context : str, execution_device_id : str, is_previewing : bool) -> str:
+	return get_inference_context(model_context) + '.' + str(state_manager.get_item('model_precision')) + '.' + str(execution_device_id) + '.' + str(is_previewing)
@@ -0,0 +1,108 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+from onnxruntime import InferenceSession
+
+from facefusion import logger, state_manager
+from facefusion.typing import ExecutionProvider
+
+INFERENCE_REGISTRY : OrderedDict[str, InferenceSession] = OrderedDict()
+INFERENCE_REGISTRY_SIZES : Dict[str, int] = {}
+INFERENCE_REGISTRY_STATISTICS : Dict[str, int] =\
+{
+	'loads': 0,
+	'hits': 0,
+	'evictions': 0,
+	'memory_size': 0
+}
+INFERENCE_REGISTRY_LOCK : threading.Lock = threading.Lock()
+INFERENCE_REGISTRY_LOAD_LOCKS : Dict[str, threading.Lock] = {}
+
+
+def get_inference_session(session_key : str, model_path : str, create_inference_session : Callable[[], InferenceSession]) -> InferenceSession:
+	inference_session = find_inference_session(session_key)
+
+	if inference_session is None:
+		with get_load_lock(session_key):
+			inference_session = find_inference_session(session_key)
+
+			if inference_session is None:
+				resident_size = get_resident_size()
+				inference_session = create_inference_session()
+				register_inference_session(session_key, inference_session, max(get_resident_size() - resident_size, os.path.getsize(model_path)))
+	return inference_session
+
+
+def find_inference_session(session_key : str) -> Optional[InferenceSession]:
+	with INFERENCE_REGISTRY_LOCK:
+		if session_key in INFERENCE_REGISTRY:
+			INFERENCE_REGISTRY.move_to_end(session_key)
+			INFERENCE_REGISTRY_STATISTICS['hits'] += 1
+			return INFERENCE_REGISTRY.get(session_key)
+	return None
+
+
+def register_inference_session(session_key : str, inference_session : InferenceSession, session_size : int) -> None:
+	with INFERENCE_REGISTRY_LOCK:
+		INFERENCE_REGISTRY[session_key] = inference_session
+		INFERENCE_REGISTRY_SIZES[session_key] = session_size
+		INFERENCE_REGISTRY_STATISTICS['loads'] += 1
+		INFERENCE_REGISTRY_STATISTICS['memory_size'] += session_size
+
+		while INFERENCE_REGISTRY_STATISTICS.get('memory_size') > get_inference_memory_budget() and len(INFERENCE_REGISTRY) > 1:
+			evict_inference_session()
+
+
+def get_load_lock(session_key : str) -> threading.Lock:
+	with INFERENCE_REGISTRY_LOCK:
+		return INFERENCE_REGISTRY_LOAD_LOCKS.setdefault(session_key, threading.Lock())
+
+
+def create_session_key(model_path : str, model_precision : Optional[str], execution_device_id : str, execution_providers : List[ExecutionProvider]) -> str:
+	return model_path + '.' + str(model_precision) + '.' + str(execution_device_id) + '.' + '-'.join(execution_providers)
+
+
+def evict_inference_session() -> None:
+	session_key, _ = INFERENCE_REGISTRY.popitem(last = False)
+	INFERENCE_REGISTRY_STATISTICS['memory_size'] -= INFERENCE_REGISTRY_SIZES.pop(session_key)
+	INFERENCE_REGISTRY_STATISTICS['evictions'] += 1
+
+
+def refresh_inference_sessions(inference_sessions : Dict[str, InferenceSession]) -> bool:
+	with INFERENCE_REGISTRY_LOCK:
+		for session_key, inference_session in inference_sessions.items():
+			if INFERENCE_REGISTRY.get(session_key) is not inference_session:
+				return False
+			INFERENCE_REGISTRY.move_to_end(session_key)
+	return True
+
+
+def get_inference_memory_budget() -> int:
+	return state_manager.get_item('inference_memory_budget') * 1024 * 1024
+
+
+def get_resident_size() -> int:
+	try:
+		with open('/proc/self/statm') as statm_file:
+			return int(statm_file.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+	except (OSError, ValueError, IndexError):
+		return 0
+
+
+def get_inference_registry_statistics() -> Dict[str, int]:
+	with INFERENCE_REGISTRY_LOCK:
+		return INFERENCE_REGISTRY_STATISTICS.copy()
+
+
+def conditional_log_inference_registry_statistics() -> None:
+	if state_manager.get_item('log_level') == 'debug':
+		logger.debug(str(get_inference_registry_statistics()), __name__)
+
+
+def clear_inference_registry() -> None:
+	with INFERENCE_REGISTRY_LOCK:
+		INFERENCE_REGISTRY.clear()
+		INFERENCE_REGISTRY_SIZES.clear()
+		INFERENCE_REGISTRY_STATISTICS['memory_size'] = 0
@@ -0,0 +1,25 @@
+from types import ModuleType
+from typing import Tuple
+
+from facefusion import state_manager
+from facefusion.typing import JobStatus, TableContents, TableHeaders
+
+
+def get_job_manager() -> ModuleType:
+	if state_manager.get_item('job_backend') == 'sqlite':
+		from facefusion import job_database
+
+		return job_database
+	from facefusion.jobs import job_manager
+
+	return job_manager
+
+
+def compose_job_list(job_status : JobStatus) -> Tuple[TableHeaders, TableContents]:
+	if state_manager.get_item('job_backend') == 'sqlite':
+		from facefusion import job_database
+
+		return job_database.compose_job_list(job_status)
+	from facefusion.jobs import job_list
+
+	return job_list.compose_job_list(job_status)
@@ -0,0 +1,291 @@
+import glob
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from facefusion import state_manager
+from facefusion.date_helper import describe_time_ago, get_current_date_time
+from facefusion.filesystem import is_file, remove_file
+from facefusion.jobs import job_helper
+from facefusion.typing import Args, Job, JobStatus, JobStep, JobStepStatus, TableContents, TableHeaders
+
+JOB_DATABASE : Dict[str, Any] =\
+{
+	'database_path': None,
+	'connection': None
+}
+JOB_DATABASE_LOCK : threading.RLock = threading.RLock()
+JOB_STATUSES : List[JobStatus] = [ 'drafted', 'queued', 'completed', 'failed' ]
+
+
+def init_jobs(jobs_path : str) -> bool:
+	database_path = os.path.join(jobs_path, 'jobs.sqlite')
+
+	os.makedirs(jobs_path, exist_ok = True)
+	with JOB_DATABASE_LOCK:
+		if JOB_DATABASE.get('database_path') != database_path:
+			close_connection()
+			JOB_DATABASE['database_path'] = database_path
+		connection = get_connection()
+		with connection:
+			connection.execute('CREATE TABLE IF NOT EXISTS jobs (job_id TEXT PRIMARY KEY, version TEXT NOT NULL, job_status TEXT NOT NULL, date_created TEXT NOT NULL, date_updated TEXT)')
+			connection.execute('CREATE TABLE IF NOT EXISTS steps (job_id TEXT NOT NULL REFERENCES jobs (job_id) ON DELETE CASCADE, step_index INTEGER NOT NULL, step_status TEXT NOT NULL, step_args TEXT NOT NULL, PRIMARY KEY (job_id, step_index))')
+			connection.execute('CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (job_status, date_created)')
+			connection.execute('CREATE INDEX IF NOT EXISTS jobs_updated ON jobs (date_updated)')
+			connection.execute('CREATE INDEX IF NOT EXISTS steps_status ON steps (job_id, step_status)')
+		if connection.execute('PRAGMA user_version').fetchone()[0] == 0:
+			migrate_jobs(jobs_path)
+	return True
+
+
+def get_connection() -> sqlite3.Connection:
+	with JOB_DATABASE_LOCK:
+		if JOB_DATABASE.get('connection') is None:
+			if JOB_DATABASE.get('database_path') is None:
+				JOB_DATABASE['database_path'] = os.path.join(state_manager.get_item('jobs_path'), 'jobs.sqlite')
+			connection = sqlite3.connect(JOB_DATABASE.get('database_path'), timeout = 30, check_same_thread = False, isolation_level = None)
+			connection.execute('PRAGMA journal_mode = WAL')
+			connection.execute('PRAGMA synchronous = NORMAL')
+			connection.execute('PRAGMA foreign_keys = ON')
+			JOB_DATABASE['connection'] = connection
+		return JOB_DATABASE.get('connection')
+
+
+def close_connection() -> None:
+	with JOB_DATABASE_LOCK:
+		if JOB_DATABASE.get('connection'):
+			JOB_DATABASE.get('connection').close()
+		JOB_DATABASE['connection'] = None
+
+
+def execute_transaction(statements : List[Tuple[str, Tuple[Any, ...]]]) -> bool:
+	with JOB_DATABASE_LOCK:
+		connection = get_connection()
+		try:
+			connection.execute('BEGIN IMMEDIATE')
+			for statement, parameters in statements:
+				connection.execute(statement, parameters)
+			connection.execute('COMMIT')
+			return True
+		except sqlite3.Error:
+			if connection.in_transaction:
+				connection.execute('ROLLBACK')
+			return False
+
+
+def migrate_jobs(jobs_path : str) -> bool:
+	statements : List[Tuple[str, Tuple[Any, ...]]] = []
+
+	for job_status in JOB_STATUSES:
+		for job_path in sorted(glob.glob(os.path.join(jobs_path, job_status, '*.json')), key = os.path.getmtime):
+			job_id, _ = os.path.splitext(os.path.basename(job_path))
+			try:
+				with open(job_path) as job_file:
+					job = json.load(job_file)
+			except (OSError, ValueError):
+				continue
+			statements.append(('INSERT OR IGNORE INTO jobs (job_id, version, job_status, date_created, date_updated) VALUES (?, ?, ?, ?, ?)', (job_id, job.get('version'), job_status, job.get('date_created'), job.get('date_updated'))))
+			for step_index, step in enumerate(job.get('steps')):
+				statements.append(('INSERT OR IGNORE INTO steps (job_id, step_index, step_status, step_args) VALUES (?, ?, ?, ?)', (job_id, step_index, step.get('status'), json.dumps(step.get('args')))))
+	statements.append(('PRAGMA user_version = 1', ()))
+	return execute_transaction(statements)
+
+
+def clear_jobs(jobs_path : str) -> bool:
+	database_path = os.path.join(jobs_path, 'jobs.sqlite')
+
+	close_connection()
+	JOB_DATABASE['database_path'] = None
+	for file_path in [ database_path, database_path + '-wal', database_path + '-shm' ]:
+		if is_file(file_path):
+			remove_file(file_path)
+	return True
+
+
+def create_job(job_id : str) -> bool:
+	if find_job_status(job_id) is None:
+		return execute_transaction([ ('INSERT INTO jobs (job_id, version, job_status, date_created, date_updated) VALUES (?, ?, ?, ?, NULL)', (job_id, '1', 'drafted', get_current_date_time().isoformat())) ])
+	return False
+
+
+def submit_job(job_id : str) -> bool:
+	if find_job_status(job_id) == 'drafted' and count_step_total(job_id) > 0:
+		return move_job_file(job_id, 'queued')
+	return False
+
+
+def submit_jobs() -> bool:
+	drafted_job_ids = find_job_ids('drafted')
+
+	if drafted_job_ids:
+		for job_id in drafted_job_ids:
+			if not submit_job(job_id):
+				return False
+		return True
+	return False
+
+
+def delete_job(job_id : str) -> bool:
+	if find_job_status(job_id):
+		return execute_transaction([ ('DELETE FROM jobs WHERE job_id = ?', (job_id,)) ])
+	return False
+
+
+def delete_jobs() -> bool:
+	job_ids = find_job_ids('drafted') + find_job_ids('queued') + find_job_ids('failed') + find_job_ids('completed')
+
+	if job_ids:
+		for job_id in job_ids:
+			if not delete_job(job_id):
+				return False
+		return True
+	return False
+
+
+def find_job_status(job_id : str) -> Optional[JobStatus]:
+	with JOB_DATABASE_LOCK:
+		job_row = get_connection().execute('SELECT job_status FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+	if job_row:
+		return job_row[0]
+	return None
+
+
+def find_jobs(job_status : JobStatus) -> Dict[str, Job]:
+	jobs = {}
+
+	with JOB_DATABASE_LOCK:
+		job_rows = get_connection().execute('SELECT job_id, version, date_created, date_updated FROM jobs WHERE job_status = ? ORDER BY date_created, job_id', (job_status,)).fetchall()
+	for job_id, version, date_created, date_updated in job_rows:
+		jobs[job_id] =\
+		{
+			'version': version,
+			'date_created': date_created,
+			'date_updated': date_updated,
+			'steps': get_steps(job_id)
+		}
+	return jobs
+
+
+def find_job_ids(job_status : JobStatus) -> List[str]:
+	with JOB_DATABASE_LOCK:
+		job_rows = get_connection().execute('SELECT job_id FROM jobs WHERE job_status = ? ORDER BY date_created, job_id', (job_status,)).fetchall()
+	return [ job_row[0] for job_row in job_rows ]
+
+
+def validate_job(job_id : str) -> bool:
+	return find_job_status(job_id) is not None
+
+
+def compose_job_list(job_status : JobStatus) -> Tuple[TableHeaders, TableContents]:
+	job_headers : TableHeaders = [ 'job id', 'steps', 'date created', 'date updated', 'job status' ]
+	job_contents : TableContents = []
+
+	with JOB_DATABASE_LOCK:
+		job_rows = get_connection().execute('SELECT jobs.job_id, COUNT(steps.step_index), jobs.date_created, jobs.date_updated FROM jobs LEFT JOIN steps ON steps.job_id = jobs.job_id WHERE jobs.job_status = ? GROUP BY jobs.job_id ORDER BY jobs.date_created, jobs.job_id', (job_status,)).fetchall()
+	for job_id, step_total, date_created, date_updated in job_rows:
+		job_contents.append([ job_id, step_total, describe_job_date(date_created), describe_job_date(date_updated), job_status ])
+	return job_headers, job_contents
+
+
+def describe_job_date(job_date : Optional[str]) -> Optional[str]:
+	if job_date:
+		return describe_time_ago(datetime.fromisoformat(job_date))
+	return None
+
+
+def get_steps(job_id : str) -> List[JobStep]:
+	with JOB_DATABASE_LOCK:
+		step_rows = get_connection().execute('SELECT step_status, step_args FROM steps WHERE job_id = ? ORDER BY step_index', (job_id,)).fetchall()
+	return [ { 'args': json.loads(step_args), 'status': step_status } for step_status, step_args in step_rows ]
+
+
+def count_step_total(job_id : str) -> int:
+	with JOB_DATABASE_LOCK:
+		return get_connection().execute('SELECT COUNT(*) FROM steps WHERE job_id = ?', (job_id,)).fetchone()[0]
+
+
+def has_step(job_id : str, step_index : int) -> bool:
+	return step_index in range(count_step_total(job_id))
+
+
+def add_step(job_id : str, step_args : Args) -> bool:
+	if find_job_status(job_id):
+		return execute_transaction(
+		[
+			('INSERT INTO steps (job_id, step_index, step_status, step_args) SELECT ?, COUNT(*), ?, ? FROM steps WHERE job_id = ?', (job_id, 'drafted', json.dumps(step_args), job_id)),
+			('UPDATE jobs SET date_updated = ? WHERE job_id = ?', (get_current_date_time().isoformat(), job_id))
+		])
+	return False
+
+
+def remix_step(job_id : str, step_index : int, step_args : Args) -> bool:
+	steps = get_steps(job_id)
+	step_args = dict(step_args)
+
+	if step_index and step_index < 0:
+		step_index = count_step_total(job_id) - 1
+	if has_step(job_id, step_index):
+		output_path = steps[step_index].get('args').get('output_path')
+		step_args['target_path'] = job_helper.get_step_output_path(job_id, step_index, output_path)
+		return add_step(job_id, step_args)
+	return False
+
+
+def insert_step(job_id : str, step_index : int, step_args : Args) -> bool:
+	steps = get_steps(job_id)
+
+	if step_index and step_index < 0:
+		step_index = count_step_total(job_id) - 1
+	if has_step(job_id, step_index):
+		steps.insert(step_index, { 'args': step_args, 'status': 'drafted' })
+		return replace_steps(job_id, steps)
+	return False
+
+
+def remove_step(job_id : str, step_index : int) -> bool:
+	steps = get_steps(job_id)
+
+	if step_index and step_index < 0:
+		step_index = count_step_total(job_id) - 1
+	if has_step(job_id, step_index):
+		steps.pop(step_index)
+		return replace_steps(job_id, steps)
+	return False
+
+
+def replace_steps(job_id : str, steps : List[JobStep]) -> bool:
+	statements : List[Tuple[str, Tuple[Any, ...]]] = [ ('DELETE FROM steps WHERE job_id = ?', (job_id,)) ]
+
+	for step_index, step in enumerate(steps):
+		statements.append(('INSERT INTO steps (job_id, step_index, step_status, step_args) VALUES (?, ?, ?, ?)', (job_id, step_index, step.get('status'), json.dumps(step.get('args')))))
+	statements.append(('UPDATE jobs SET date_updated = ? WHERE job_id = ?', (get_current_date_time().isoformat(), job_id)))
+	return execute_transaction(statements)
+
+
+def set_step_status(job_id : str, step_index : int, step_status : JobStepStatus) -> bool:
+	if has_step(job_id, step_index):
+		return execute_transaction(
+		[
+			('UPDATE steps SET step_status = ? WHERE job_id = ? AND step_index = ?', (step_status, job_id, step_index)),
+			('UPDATE jobs SET date_updated = ? WHERE job_id = ?', (get_current_date_time().isoformat(), job_id))
+		])
+	return False
+
+
+def set_steps_status(job_id : str, step_status : JobStepStatus) -> bool:
+	if find_job_status(job_id):
+		return execute_transaction(
+		[
+			('UPDATE steps SET step_status = ? WHERE job_id = ?', (step_status, job_id)),
+			('UPDATE jobs SET date_updated = ? WHERE job_id = ?', (get_current_date_time().isoformat(), job_id))
+		])
+	return False
+
+
+def move_job_file(job_id : str, job_status : JobStatus) -> bool:
+	if find_job_status(job_id):
+		return execute_transaction([ ('UPDATE jobs SET job_status = ?, date_updated = ? WHERE job_id = ?', (job_status, get_current_date_time().isoformat(), job_id)) ])
+	return False
@@ -0,0 +1,236 @@
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+from facefusion import logger, state_manager
+from facefusion.ffmpeg import concat_video
+from facefusion.filesystem import are_images, are_videos, move_file, remove_file
+from facefusion.job_backend import get_job_manager
+from facefusion.jobs import job_helper, job_runner
+from facefusion.typing import Args, JobOutputSet, JobStep, ProcessStep
+
+
+def create_step_pool() -> ProcessPoolExecutor:
+	return ProcessPoolExecutor(max_workers = get_job_worker_count(), mp_context = multiprocessing.get_context('spawn'), initializer = init_step_worker, initargs = (dict(state_manager.get_state()),))
+
+
+def init_step_worker(state : Args) -> None:
+	for key, value in state.items():
+		state_manager.init_item(key, value)
+	logger.init(state_manager.get_item('log_level'))
+	get_job_manager().init_jobs(state_manager.get_item('jobs_path'))
+
+
+def get_job_worker_count() -> int:
+	return state_manager.get_item('job_worker_count') or 1
+
+
+def run_job(job_id : str, process_step : ProcessStep, is_job_leased : Optional[Callable[[], bool]] = None) -> bool:
+	if get_job_worker_count() > 1:
+		with create_step_pool() as step_pool:
+			return run_pooled_job(step_pool, job_id, process_step, is_job_leased)
+	return run_sequential_job(job_id, process_step, is_job_leased)
+
+
+def run_jobs(process_step : ProcessStep) -> bool:
+	queued_job_ids = get_job_manager().find_job_ids('queued')
+
+	if queued_job_ids:
+		if get_job_worker_count() > 1:
+			with create_step_pool() as step_pool:
+				return all(run_pooled_job(step_pool, job_id, process_step) for job_id in queued_job_ids)
+		return all(run_sequential_job(job_id, process_step) for job_id in queued_job_ids)
+	return False
+
+
+def retry_job(job_id : str, process_step : ProcessStep) -> bool:
+	job_manager = get_job_manager()
+	failed_job_ids = job_manager.find_job_ids('failed')
+
+	if job_id in failed_job_ids:
+		return job_manager.set_steps_status(job_id, 'queued') and job_manager.move_job_file(job_id, 'queued') and run_job(job_id, process_step)
+	return False
+
+
+def retry_jobs(process_step : ProcessStep) -> bool:
+	failed_job_ids = get_job_manager().find_job_ids('failed')
+
+	if failed_job_ids:
+		return all(retry_job(job_id, process_step) for job_id in failed_job_ids)
+	return False
+
+
+def run_sequential_job(job_id : str, process_step : ProcessStep, is_job_leased : Optional[Callable[[], bool]] = None) -> bool:
+	job_manager = get_job_manager()
+
+	if not is_job_database() and not is_job_leased:
+		return job_runner.run_job(job_id, process_step)
+	queued_job_ids = job_manager.find_job_ids('queued')
+
+	if job_id in queued_job_ids:
+		is_completed = run_sequential_steps(job_id, process_step, is_job_leased) and finalize_steps(job_id)
+
+		if is_job_lost(is_job_leased):
+			return False
+		clean_steps(job_id)
+		if is_completed:
+			return job_manager.move_job_file(job_id, 'completed')
+		job_manager.move_job_file(job_id, 'failed')
+	return False
+
+
+def run_sequential_steps(job_id : str, process_step : ProcessStep, is_job_leased : Optional[Callable[[], bool]]) -> bool:
+	job_manager = get_job_manager()
+	steps = job_manager.get_steps(job_id)
+
+	if steps:
+		for step_index, step in enumerate(steps):
+			if step.get('status') == 'completed':
+				continue
+			if is_job_lost(is_job_leased) or not job_manager.set_step_status(job_id, step_index, 'started'):
+				return False
+			is_step_completed = run_step(job_id, step_index, step, process_step)
+
+			if is_job_lost(is_job_leased):
+				return False
+			if not is_step_completed:
+				job_manager.set_step_status(job_id, step_index, 'failed')
+				return False
+			job_manager.set_step_status(job_id, step_index, 'completed')
+		return True
+	return False
+
+
+def run_pooled_job(step_pool : ProcessPoolExecutor, job_id : str, process_step : ProcessStep, is_job_leased : Optional[Callable[[], bool]] = None) -> bool:
+	job_manager = get_job_manager()
+	queued_job_ids = job_manager.find_job_ids('queued')
+	steps = job_manager.get_steps(job_id)
+
+	if job_id in queued_job_ids and steps:
+		if has_step_dependencies(job_id, steps):
+			return run_sequential_job(job_id, process_step, is_job_leased)
+		is_completed = run_pooled_steps(step_pool, job_id, steps, process_step, is_job_leased) and finalize_steps(job_id)
+
+		if is_job_lost(is_job_leased):
+			return False
+		clean_steps(job_id)
+		if is_completed:
+			return job_manager.move_job_file(job_id, 'completed')
+		job_manager.move_job_file(job_id, 'failed')
+	return False
+
+
+def run_pooled_steps(step_pool : ProcessPoolExecutor, job_id : str, steps : List[JobStep], process_step : ProcessStep, is_job_leased : Optional[Callable[[], bool]]) -> bool:
+	job_manager = get_job_manager()
+	step_futures : Dict[Future[bool], int] = {}
+	step_indices = [ step_index for step_index, step in enumerate(steps) if step.get('status') != 'completed' ]
+	is_completed = True
+
+	try:
+		for step_index in step_indices:
+			if job_manager.set_step_status(job_id, step_index, 'started'):
+				step_futures[step_pool.submit(run_pooled_step, job_id, step_index, steps[step_index], process_step, get_step_temp_path(job_id, step_index))] = step_index
+
+		for step_future in as_completed(step_futures):
+			step_index = step_futures.get(step_future)
+
+			if is_job_lost(is_job_leased):
+				for pending_future in step_futures:
+					pending_future.cancel()
+				return False
+			if not step_future.cancelled() and not step_future.exception() and step_future.result():
+				job_manager.set_step_status(job_id, step_index, 'completed')
+			else:
+				job_manager.set_step_status(job_id, step_index, 'failed')
+				is_completed = False
+				for pending_future in step_futures:
+					pending_future.cancel()
+	finally:
+		clear_step_temp_paths(job_id)
+	return is_completed and len(step_futures) == len(step_indices)
+
+
+def run_pooled_step(job_id : str, step_index : int, step : JobStep, process_step : ProcessStep, step_temp_path : str) -> bool:
+	state_manager.set_item('temp_path', step_temp_path)
+	return run_step(job_id, step_index, step, process_step)
+
+
+def get_step_temp_path(job_id : str, step_index : int) -> str:
+	return os.path.join(state_manager.get_item('temp_path'), job_id, 'step-' + str(step_index))
+
+
+def clear_step_temp_paths(job_id : str) -> None:
+	shutil.rmtree(os.path.join(state_manager.get_item('temp_path'), job_id), ignore_errors = True)
+
+
+def run_step(job_id : str, step_index : int, step : JobStep, process_step : ProcessStep) -> bool:
+	step_args = step.get('args')
+
+	if process_step(job_id, step_index, step_args):
+		output_path = step_args.get('output_path')
+		step_output_path = job_helper.get_step_output_path(job_id, step_index, output_path)
+		return move_file(output_path, step_output_path)
+	return False
+
+
+def finalize_steps(job_id : str) -> bool:
+	if not is_job_database():
+		return job_runner.finalize_steps(job_id)
+	output_set = collect_output_set(job_id)
+
+	for output_path, temp_output_paths in output_set.items():
+		if are_videos(temp_output_paths):
+			if not concat_video(output_path, temp_output_paths):
+				return False
+		if are_images(temp_output_paths):
+			for temp_output_path in temp_output_paths:
+				if not move_file(temp_output_path, output_path):
+					return False
+	return True
+
+
+def clean_steps(job_id : str) -> bool:
+	if not is_job_database():
+		return job_runner.clean_steps(job_id)
+	output_set = collect_output_set(job_id)
+
+	for temp_output_paths in output_set.values():
+		for temp_output_path in temp_output_paths:
+			if not remove_file(temp_output_path):
+				return False
+	return True
+
+
+def collect_output_set(job_id : str) -> JobOutputSet:
+	output_set : JobOutputSet = {}
+
+	for step_index, step in enumerate(get_job_manager().get_steps(job_id)):
+		output_path = step.get('args').get('output_path')
+
+		if output_path:
+			step_output_path = job_helper.get_step_output_path(job_id, step_index, output_path)
+			output_set.setdefault(output_path, []).append(step_output_path)
+	return output_set
+
+
+def is_job_lost(is_job_leased : Optional[Callable[[], bool]]) -> bool:
+	return bool(is_job_leased) and not is_job_leased()
+
+
+def is_job_database() -> bool:
+	return state_manager.get_item('job_backend') == 'sqlite'
+
+
+def has_step_dependencies(job_id : str, steps : List[JobStep]) -> bool:
+	output_paths = [ step.get('args').get('output_path') for step in steps ]
+	step_output_paths = [ job_helper.get_step_output_path(job_id, step_index, step.get('args').get('output_path')) for step_index, step in enumerate(steps) ]
+
+	for step in steps:
+		source_paths = step.get('args').get('source_paths') or []
+		target_path = step.get('args').get('target_path')
+
+		if any(path in output_paths + step_output_paths for path in source_paths + [ target_path ]):
+			return True
+	return len(set(output_paths)) < len(output_paths)
@@ -0,0 +1,66 @@
+import json
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Any, Dict, Type
+
+from facefusion import logger, state_manager, wording
+from facefusion.job_backend import get_job_manager
+from facefusion.job_scheduler import run_sequential_job
+from facefusion.jobs import job_helper
+from facefusion.typing import Args, ErrorCode, ProcessStep
+
+
+def serve(step_args : Args, process_step : ProcessStep) -> ErrorCode:
+	serve_port = state_manager.get_item('serve_port')
+	job_server = HTTPServer(('127.0.0.1', serve_port), create_request_handler(step_args, process_step))
+	logger.info(wording.get('serving_jobs').format(port = serve_port), __name__)
+
+	try:
+		job_server.serve_forever()
+	except KeyboardInterrupt:
+		return 0
+	finally:
+		job_server.server_close()
+	return 0
+
+
+def create_request_handler(step_args : Args, process_step : ProcessStep) -> Type[BaseHTTPRequestHandler]:
+	class JobRequestHandler(BaseHTTPRequestHandler):
+		def do_GET(self) -> None:
+			if self.path == '/health':
+				return self.send_json(200, { 'status': 'ready' })
+			return self.send_json(404, { 'error_code': 1 })
+
+		def do_POST(self) -> None:
+			if self.path == '/steps':
+				try:
+					content_length = int(self.headers.get('Content-Length', 0))
+					request_args = json.loads(self.rfile.read(content_length))
+				except ValueError:
+					return self.send_json(400, { 'error_code': 2 })
+				if isinstance(request_args, dict):
+					error_code = run_step_args(dict(step_args, **request_args), process_step)
+					return self.send_json(200, { 'error_code': error_code })
+				return self.send_json(400, { 'error_code': 2 })
+			return self.send_json(404, { 'error_code': 1 })
+
+		def send_json(self, status_code : int, payload : Dict[str, Any]) -> None:
+			content = json.dumps(payload).encode()
+			self.send_response(status_code)
+			self.send_header('Content-Type', 'application/json')
+			self.send_header('Content-Length', str(len(content)))
+			self.end_headers()
+			self.wfile.write(content)
+
+		def log_message(self, format : str, *args : Any) -> None:
+			logger.debug(format % args, __name__)
+
+	return JobRequestHandler
+
+
+def run_step_args(step_args : Args, process_step : ProcessStep) -> ErrorCode:
+	job_manager = get_job_manager()
+	job_id = job_helper.suggest_job_id('serve')
+
+	if job_manager.create_job(job_id) and job_manager.add_step(job_id, step_args) and job_manager.submit_job(job_id) and run_sequential_job(job_id, process_step):
+		return 0
+	return 1
@@ -0,0 +1,187 @@
+import json
+import os
+import socket
+import threading
+from time import sleep, time
+from typing import Any, Dict, Optional
+
+from facefusion import logger, process_manager, state_manager, wording
+from facefusion.job_backend import get_job_manager
+from facefusion.typing import ProcessStep
+
+JOB_WORKER : Dict[str, Any] =\
+{
+	'worker_id': None,
+	'lease_path': None,
+	'is_lease_lost': False,
+	'heartbeat_event': None,
+	'heartbeat_thread': None
+}
+
+
+def run_worker(process_step : ProcessStep) -> bool:
+	from facefusion import job_scheduler
+
+	job_manager = get_job_manager()
+	JOB_WORKER['worker_id'] = socket.gethostname() + '-' + str(os.getpid())
+	worker_results = []
+
+	while True:
+		queued_job_ids = job_manager.find_job_ids('queued')
+
+		if not queued_job_ids:
+			break
+		claimed_job_id = next((job_id for job_id in queued_job_ids if claim_job_lease(job_id)), None)
+
+		if claimed_job_id:
+			logger.info(wording.get('running_job').format(job_id = claimed_job_id), __name__)
+			start_heartbeat()
+			try:
+				worker_results.append(job_scheduler.run_job(claimed_job_id, process_step, is_job_leased))
+			finally:
+				stop_heartbeat()
+				release_job_lease()
+		else:
+			sleep(get_heartbeat_interval())
+	return bool(worker_results) and all(worker_results)
+
+
+def claim_job_lease(job_id : str) -> bool:
+	lease_path = get_lease_path(job_id)
+
+	if is_lease_expired(lease_path) and reclaim_job_lease(job_id, lease_path):
+		logger.warn(wording.get('job_lease_expired').format(job_id = job_id), __name__)
+	try:
+		lease_descriptor = os.open(lease_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+	except FileExistsError:
+		return False
+	with os.fdopen(lease_descriptor, 'w') as lease_file:
+		json.dump(
+		{
+			'job_id': job_id,
+			'worker_id': JOB_WORKER.get('worker_id'),
+			'expires_at': time() + state_manager.get_item('job_lease_duration')
+		}, lease_file)
+	if job_id in get_job_manager().find_job_ids('queued'):
+		JOB_WORKER['lease_path'] = lease_path
+		JOB_WORKER['is_lease_lost'] = False
+		return True
+	os.remove(lease_path)
+	return False
+
+
+def reclaim_job_lease(job_id : str, lease_path : str) -> bool:
+	lease = read_job_lease(lease_path)
+
+	if not lease:
+		return False
+	takeover_path = lease_path + '.' + str(lease.get('expires_at'))
+
+	try:
+		os.close(os.open(takeover_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+	except FileExistsError:
+		return False
+	try:
+		if read_job_lease(lease_path) != lease:
+			return False
+		os.remove(lease_path)
+	finally:
+		os.remove(takeover_path)
+	return requeue_job_steps(job_id)
+
+
+def requeue_job_steps(job_id : str) -> bool:
+	job_manager = get_job_manager()
+
+	for step_index, step in enumerate(job_manager.get_steps(job_id)):
+		if step.get('status') != 'completed' and not job_manager.set_step_status(job_id, step_index, 'queued'):
+			return False
+	return True
+
+
+def renew_job_lease(lease_path : str) -> None:
+	lease = read_job_lease(lease_path)
+	lease_temp_path = lease_path + '.' + JOB_WORKER.get('worker_id')
+
+	if lease:
+		lease['expires_at'] = time() + state_manager.get_item('job_lease_duration')
+		with open(lease_temp_path, 'w') as lease_file:
+			json.dump(lease, lease_file)
+		os.replace(lease_temp_path, lease_path)
+
+
+def read_job_lease(lease_path : Optional[str]) -> Optional[Dict[str, Any]]:
+	if lease_path:
+		try:
+			with open(lease_path) as lease_file:
+				return json.load(lease_file)
+		except (OSError, ValueError):
+			return None
+	return None
+
+
+def release_job_lease() -> None:
+	lease_path = JOB_WORKER.get('lease_path')
+
+	if is_lease_owned(lease_path):
+		os.remove(lease_path)
+	JOB_WORKER['lease_path'] = None
+
+
+def is_lease_expired(lease_path : str) -> bool:
+	lease = read_job_lease(lease_path)
+
+	if lease:
+		return time() > lease.get('expires_at', 0)
+	return False
+
+
+def is_job_leased() -> bool:
+	return not JOB_WORKER.get('is_lease_lost')
+
+
+def is_lease_owned(lease_path : Optional[str]) -> bool:
+	lease = read_job_lease(lease_path)
+
+	if lease:
+		return lease.get('worker_id') == JOB_WORKER.get('worker_id')
+	return False
+
+
+def start_heartbeat() -> None:
+	heartbeat_event = threading.Event()
+	heartbeat_thread = threading.Thread(target = beat_heartbeat, args = (JOB_WORKER.get('lease_path'), heartbeat_event), daemon = True)
+	JOB_WORKER['heartbeat_event'] = heartbeat_event
+	JOB_WORKER['heartbeat_thread'] = heartbeat_thread
+	heartbeat_thread.start()
+
+
+def beat_heartbeat(lease_path : str, heartbeat_event : threading.Event) -> None:
+	while not heartbeat_event.wait(get_heartbeat_interval()):
+		if not is_lease_owned(lease_path):
+			logger.warn(wording.get('job_lease_lost').format(lease_path = lease_path), __name__)
+			JOB_WORKER['is_lease_lost'] = True
+			process_manager.stop()
+			return
+		renew_job_lease(lease_path)
+
+
+def stop_heartbeat() -> None:
+	heartbeat_event = JOB_WORKER.get('heartbeat_event')
+	heartbeat_thread = JOB_WORKER.get('heartbeat_thread')
+
+	if heartbeat_event and heartbeat_thread:
+		heartbeat_event.set()
+		heartbeat_thread.join()
+	JOB_WORKER['heartbeat_event'] = None
+	JOB_WORKER['heartbeat_thread'] = None
+
+
+def get_heartbeat_interval() -> float:
+	return max(state_manager.get_item('job_lease_duration') / 4, 1)
+
+
+def get_lease_path(job_id : str) -> str:
+	leases_path = os.path.join(state_manager.get_item('jobs_path'), 'leases')
+	os.makedirs(leases_path, exist_ok = True)
+	return os.path.join(leases_path, job_id + '.lease')
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+from types import ModuleType
+from typing import Any, Dict, List, Optional
+
+from facefusion import state_manager
+from facefusion.filesystem import is_file, resolve_relative_path
+
+MODEL_MANIFEST : Optional[Dict[str, Any]] = None
+VERIFIED_MODULE_NAMES : List[str] = []
+
+
+def conditional_pre_check(module : ModuleType) -> bool:
+	if is_module_verified(module):
+		return True
+	if module.pre_check():
+		register_module(module)
+		return True
+	return False
+
+
+def is_module_verified(module : ModuleType) -> bool:
+	if state_manager.get_item('verify_models') and module.__name__ not in VERIFIED_MODULE_NAMES:
+		return False
+	module_manifest = get_model_manifest().get(module.__name__)
+
+	if module_manifest and module_manifest.get('module_key') == create_module_key():
+		return all(is_model_file_valid(model_path, model_file) for model_path, model_file in module_manifest.get('model_files').items())
+	return False
+
+
+def register_module(module : ModuleType) -> None:
+	model_files = {}
+
+	for model_path, hash_path in collect_model_paths(module).items():
+		if is_file(model_path):
+			model_stat = os.stat(model_path)
+			model_files[model_path] =\
+			{
+				'size': model_stat.st_size,
+				'mtime': model_stat.st_mtime_ns,
+				'hash': read_model_hash(hash_path)
+			}
+	get_model_manifest()[module.__name__] =\
+	{
+		'module_key': create_module_key(),
+		'model_files': model_files
+	}
+	VERIFIED_MODULE_NAMES.append(module.__name__)
+	write_model_manifest()
+
+
+def collect_model_paths(module : ModuleType) -> Dict[str, Optional[str]]:
+	model_paths = {}
+
+	if hasattr(module, 'create_static_model_set'):
+		for model in module.create_static_model_set(state_manager.get_item('download_scope') or 'full').values():
+			model_hashes = model.get('hashes') or {}
+			model_sources = model.get('sources') or {}
+
+			for model_name, model_source in model_sources.items():
+				model_hash = model_hashes.get(model_name) or {}
+				model_paths[model_source.get('path')] = model_hash.get('path')
+			for model_hash in model_hashes.values():
+				model_paths.setdefault(model_hash.get('path'), None)
+	return model_paths
+
+
+def create_module_key() -> str:
+	model_keys = [ key + '=' + str(value) for key, value in sorted(state_manager.get_state().items()) if key.endswith('_model') or key.endswith('_models') ]
+	return hashlib.sha1('.'.join(model_keys).encode()).hexdigest()
+
+
+def is_model_file_valid(model_path : str, model_file : Dict[str, Any]) -> bool:
+	try:
+		model_stat = os.stat(model_path)
+	except OSError:
+		return False
+	return model_stat.st_size == model_file.get('size') and model_stat.st_mtime_ns == model_file.get('mtime')
+
+
+def read_model_hash(hash_path : Optional[str]) -> Optional[str]:
+	if hash_path and is_file(hash_path):
+		with open(hash_path) as hash_file:
+			return hash_file.read().strip()
+	return None
+
+
+def get_model_manifest_path() -> str:
+	return resolve_relative_path('../.assets/models/manifest.json')
+
+
+def get_model_manifest() -> Dict[str, Any]:
+	global MODEL_MANIFEST
+
+	if MODEL_MANIFEST is None:
+		MODEL_MANIFEST = {}
+		if is_file(get_model_manifest_path()):
+			try:
+				with open(get_model_manifest_path()) as model_manifest_file:
+					MODEL_MANIFEST = json.load(model_manifest_file)
+			except ValueError:
+				MODEL_MANIFEST = {}
+	return MODEL_MANIFEST
+
+
+def write_model_manifest() -> bool:
+	model_manifest_path = get_model_manifest_path()
+	model_manifest_temp_path = model_manifest_path + '.' + str(os.getpid())
+
+	os.makedirs(os.path.dirname(model_manifest_path), exist_ok = True)
+	with open(model_manifest_temp_path, 'w') as model_manifest_file:
+		json.dump(get_model_manifest(), model_manifest_file, indent = 4)
+	os.replace(model_manifest_temp_path, model_manifest_path)
+	return True
@@ -0,0 +1,81 @@
+import hashlib
+import os
+import threading
+from typing import Dict, List
+
+import onnxruntime
+
+from facefusion import logger, state_manager, wording
+from facefusion.download_pool import calc_file_crc32
+from facefusion.filesystem import is_file, remove_file
+from facefusion.model_manifest import read_model_hash
+from facefusion.typing import ExecutionProvider
+
+MODEL_VARIANTS : Dict[str, str] = {}
+MODEL_VARIANT_LOCK : threading.Lock = threading.Lock()
+
+
+def resolve_model_path(model_path : str, execution_providers : List[ExecutionProvider]) -> str:
+	model_precision = state_manager.get_item('model_precision')
+
+	if model_precision in [ None, 'fp32' ] or execution_providers != [ 'cpu' ]:
+		return model_path
+	variant_key = model_path + '.' + model_precision
+
+	with MODEL_VARIANT_LOCK:
+		if variant_key not in MODEL_VARIANTS:
+			MODEL_VARIANTS[variant_key] = conditional_create_model_variant(model_path, model_precision)
+	return MODEL_VARIANTS.get(variant_key)
+
+
+def conditional_create_model_variant(model_path : str, model_precision : str) -> str:
+	variant_path = get_model_variant_path(model_path, model_precision)
+
+	if is_file(variant_path):
+		return variant_path
+	logger.info(wording.get('creating_model_variant').format(model_path = model_path, model_precision = model_precision), __name__)
+	os.makedirs(os.path.dirname(variant_path), exist_ok = True)
+	variant_temp_path = variant_path + '.' + str(os.getpid())
+
+	if create_model_variant(model_path, variant_temp_path, model_precision):
+		os.replace(variant_temp_path, variant_path)
+		return variant_path
+	remove_file(variant_temp_path)
+	logger.warn(wording.get('creating_model_variant_skipped').format(model_path = model_path, model_precision = model_precision), __name__)
+	return model_path
+
+
+def create_model_variant(model_path : str, variant_path : str, model_precision : str) -> bool:
+	try:
+		if model_precision == 'optimized':
+			optimize_model(model_path, variant_path)
+		if model_precision == 'int8':
+			quantize_model(model_path, variant_path)
+	except (ImportError, OSError, RuntimeError, ValueError) as exception:
+		logger.error(wording.get('creating_model_variant_failed').format(model_path = model_path, model_precision = model_precision, exception = exception), __name__)
+		return False
+	return is_file(variant_path)
+
+
+def optimize_model(model_path : str, variant_path : str) -> None:
+	session_options = onnxruntime.SessionOptions()
+	session_options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_EXTENDED
+	session_options.optimized_model_filepath = variant_path
+	onnxruntime.InferenceSession(model_path, sess_options = session_options, providers = [ 'CPUExecutionProvider' ])
+
+
+def quantize_model(model_path : str, variant_path : str) -> None:
+	from onnxruntime.quantization import QuantType, quantize_dynamic
+
+	quantize_dynamic(model_input = model_path, model_output = variant_path, weight_type = QuantType.QInt8)
+
+
+def create_variant_key(model_path : str) -> str:
+	model_hash = read_model_hash(os.path.splitext(model_path)[0] + '.hash') or format(calc_file_crc32(model_path), '08x')
+	return hashlib.sha1((model_hash + '.' + onnxruntime.__version__).encode()).hexdigest()[:8]
+
+
+def get_model_variant_path(model_path : str, model_precision : str) -> str:
+	model_name, model_extension = os.path.splitext(os.path.basename(model_path))
+	variants_path = os.path.join(os.path.dirname(model_path), 'variants')
+	return os.path.join(variants_path, model_name + '.' + model_precision + '-' + create_variant_key(model_path) + model_extension)
@@ -0,0 +1,180 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from weakref import WeakKeyDictionary
+
+import cv2
+import numpy
+from onnxruntime import InferenceSession
+
+from facefusion import logger, state_manager
+from facefusion.face_store import create_frame_hash
+from facefusion.typing import AudioFrame, Face, FaceSet, VisionFrame
+
+PREVIEW_CACHE : OrderedDict[str, VisionFrame] = OrderedDict()
+PREVIEW_CACHE_LIMIT = 64
+PREVIEW_CACHE_LOCK : threading.Lock = threading.Lock()
+PREVIEW_FORWARDS : WeakKeyDictionary[InferenceSession, OrderedDict[str, List[numpy.ndarray]]] = WeakKeyDictionary()
+PREVIEW_FORWARD_LIMIT = 16
+PREVIEW_CONTEXT : threading.local = threading.local()
+PREVIEW_FACE_PREFIXES : List[str] =\
+[
+	'face_detector_',
+	'face_landmarker_',
+	'face_selector_',
+	'face_mask_',
+	'reference_',
+	'source_'
+]
+PREVIEW_FRAME_PROCESSORS : List[str] =\
+[
+	'frame_colorizer',
+	'frame_enhancer'
+]
+
+
+class PreviewInferenceSession:
+	def __init__(self, inference_session : InferenceSession) -> None:
+		self.inference_session = inference_session
+
+	def run(self, output_names : Optional[List[str]], input_feed : Dict[str, numpy.ndarray]) -> List[numpy.ndarray]:
+		return forward_preview(self.inference_session, output_names, input_feed)
+
+	def __getattr__(self, name : str) -> Any:
+		return getattr(self.inference_session, name)
+
+
+def process_preview_frames(reference_faces : FaceSet, source_face : Face, source_audio_frame : AudioFrame, target_vision_frame : VisionFrame) -> Iterator[VisionFrame]:
+	from facefusion.content_analyser import analyse_frame
+	from facefusion.processors.core import get_processors_modules
+	from facefusion.vision import restrict_frame
+
+	target_vision_frame = restrict_frame(target_vision_frame, (1024, 1024))
+	source_vision_frame = target_vision_frame.copy()
+
+	if analyse_frame(target_vision_frame):
+		yield cv2.GaussianBlur(target_vision_frame, (99, 99), 0)
+		return
+	processor_modules = [ processor_module for processor_module in get_processors_modules(state_manager.get_item('processors')) if processor_module.pre_process('preview') ]
+
+	yield from render_preview_frames(processor_modules, target_vision_frame, lambda processor_module, vision_frame: process_preview_stage(processor_module,
+	{
+		'reference_faces': reference_faces,
+		'source_face': source_face,
+		'source_audio_frame': source_audio_frame,
+		'source_vision_frame': fit_source_frame(source_vision_frame, vision_frame),
+		'target_vision_frame': vision_frame
+	}))
+
+
+def process_preview_stage(processor_module : ModuleType, inputs : Dict[str, Any]) -> VisionFrame:
+	logger.disable()
+	PREVIEW_CONTEXT.is_previewing = True
+	try:
+		return processor_module.process_frame(inputs)
+	finally:
+		PREVIEW_CONTEXT.is_previewing = False
+		logger.enable()
+
+
+def fit_source_frame(source_vision_frame : VisionFrame, vision_frame : VisionFrame) -> VisionFrame:
+	if source_vision_frame.shape[:2] == vision_frame.shape[:2]:
+		return source_vision_frame
+	return cv2.resize(source_vision_frame, (vision_frame.shape[1], vision_frame.shape[0]), interpolation = cv2.INTER_AREA)
+
+
+def render_preview_frames(processor_modules : List[ModuleType], vision_frame : VisionFrame, process_frame : Callable[[ModuleType, VisionFrame], VisionFrame]) -> Iterator[VisionFrame]:
+	preview_proxy_size = state_manager.get_item('preview_proxy_size')
+
+	if preview_proxy_size and max(vision_frame.shape[:2]) > preview_proxy_size:
+		yield render_preview_frame(processor_modules, resize_proxy_frame(vision_frame, preview_proxy_size), process_frame)
+	yield render_preview_frame(processor_modules, vision_frame, process_frame)
+
+
+def render_preview_frame(processor_modules : List[ModuleType], vision_frame : VisionFrame, process_frame : Callable[[ModuleType, VisionFrame], VisionFrame]) -> VisionFrame:
+	stage_key = create_frame_hash(vision_frame)
+
+	for processor_module in processor_modules:
+		stage_key = create_stage_key(stage_key, processor_module)
+		stage_frame = get_stage_frame(stage_key)
+
+		if stage_frame is None:
+			stage_frame = process_frame(processor_module, vision_frame)
+			set_stage_frame(stage_key, stage_frame)
+		vision_frame = stage_frame
+	return vision_frame
+
+
+def create_stage_key(stage_key : str, processor_module : ModuleType) -> str:
+	processor_name = processor_module.__name__.split('.')[-1]
+	stage_prefixes = [ processor_name + '_' ]
+	stage_keys = [ stage_key, processor_name ]
+
+	if processor_name not in PREVIEW_FRAME_PROCESSORS:
+		stage_prefixes.extend(PREVIEW_FACE_PREFIXES)
+	for key, value in sorted(state_manager.get_state().items()):
+		if key.startswith(tuple(stage_prefixes)):
+			stage_keys.append(key + '=' + str(value))
+	return hashlib.sha1('.'.join(stage_keys).encode()).hexdigest()
+
+
+def get_stage_frame(stage_key : str) -> Optional[VisionFrame]:
+	with PREVIEW_CACHE_LOCK:
+		if stage_key in PREVIEW_CACHE:
+			PREVIEW_CACHE.move_to_end(stage_key)
+			return PREVIEW_CACHE.get(stage_key)
+	return None
+
+
+def set_stage_frame(stage_key : str, vision_frame : VisionFrame) -> None:
+	with PREVIEW_CACHE_LOCK:
+		PREVIEW_CACHE[stage_key] = vision_frame
+
+		while len(PREVIEW_CACHE) > PREVIEW_CACHE_LIMIT:
+			PREVIEW_CACHE.popitem(last = False)
+
+
+def is_preview_context() -> bool:
+	return getattr(PREVIEW_CONTEXT, 'is_previewing', False)
+
+
+def forward_preview(inference_session : InferenceSession, output_names : Optional[List[str]], input_feed : Dict[str, numpy.ndarray]) -> List[numpy.ndarray]:
+	forward_key = create_forward_key(output_names, input_feed)
+
+	with PREVIEW_CACHE_LOCK:
+		preview_forwards = PREVIEW_FORWARDS.setdefault(inference_session, OrderedDict())
+		if forward_key in preview_forwards:
+			preview_forwards.move_to_end(forward_key)
+			return preview_forwards.get(forward_key)
+	outputs = inference_session.run(output_names, input_feed)
+
+	with PREVIEW_CACHE_LOCK:
+		preview_forwards[forward_key] = outputs
+
+		while len(preview_forwards) > PREVIEW_FORWARD_LIMIT:
+			preview_forwards.popitem(last = False)
+	return outputs
+
+
+def create_forward_key(output_names : Optional[List[str]], input_feed : Dict[str, numpy.ndarray]) -> str:
+	forward_hash = hashlib.sha1(str(output_names).encode())
+
+	for input_name, input_value in sorted(input_feed.items()):
+		forward_hash.update(input_name.encode())
+		forward_hash.update(str(input_value.shape).encode())
+		forward_hash.update(numpy.ascontiguousarray(input_value).tobytes())
+	return forward_hash.hexdigest()
+
+
+def resize_proxy_frame(vision_frame : VisionFrame, preview_proxy_size : int) -> VisionFrame:
+	frame_height, frame_width = vision_frame.shape[:2]
+	proxy_scale = preview_proxy_size / max(frame_height, frame_width)
+	return cv2.resize(vision_frame, (round(frame_width * proxy_scale), round(frame_height * proxy_scale)), interpolation = cv2.INTER_AREA)
+
+
+def clear_preview_cache() -> None:
+	with PREVIEW_CACHE_LOCK:
+		PREVIEW_CACHE.clear()
+		PREVIEW_FORWARDS.clear()
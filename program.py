@@ -1,13 +1,20 @@
+import sys
 import tempfile
 from argparse import ArgumentParser, HelpFormatter
+from typing import Callable, List, Optional, Sequence
 
 import facefusion.choices
 from facefusion import config, metadata, state_manager, wording
-from facefusion.common_helper import create_float_metavar, create_int_metavar, get_last
-from facefusion.execution import get_available_execution_providers
+from facefusion.common_helper import create_float_metavar, create_int_metavar, create_int_range, get_first, get_last
 from facefusion.filesystem import list_directory
 from facefusion.jobs import job_store
-from facefusion.processors.core import get_processors_modules
+
+stream_queue_depth_range : Sequence[int] = create_int_range(1, 128, 1)
+video_segment_count_range : Sequence[int] = create_int_range(1, 32, 1)
+job_worker_count_range : Sequence[int] = create_int_range(1, 32, 1)
+job_lease_duration_range : Sequence[int] = create_int_range(10, 3600, 10)
+execution_batch_size_range : Sequence[int] = create_int_range(1, 32, 1)
+execution_batch_deadline_range : Sequence[int] = create_int_range(0, 1000, 5)
 
 
 def create_help_formatter_small(prog : str) -> HelpFormatter:
@@ -39,7 +46,8 @@ def create_jobs_path_program() -> ArgumentParser:
 	program = ArgumentParser(add_help = False)
 	group_paths = program.add_argument_group('paths')
 	group_paths.add_argument('--jobs-path', help = wording.get('help.jobs_path'), default = config.get_str_value('paths.jobs_path', '.jobs'))
-	job_store.register_job_keys([ 'jobs_path' ])
+	group_paths.add_argument('--job-backend', help = wording.get('help.job_backend'), default = config.get_str_value('paths.job_backend', 'json'), choices = [ 'json', 'sqlite' ])
+	job_store.register_job_keys([ 'jobs_path', 'job_backend' ])
 	return program
 
 
@@ -100,7 +108,8 @@ def create_face_detector_program() -> ArgumentParser:
 	group_face_detector.add_argument('--face-detector-size', help = wording.get('help.face_detector_size'), default = config.get_str_value('face_detector.face_detector_size', get_last(face_detector_size_choices)), choices = face_detector_size_choices)
 	group_face_detector.add_argument('--face-detector-angles', help = wording.get('help.face_detector_angles'), type = int, default = config.get_int_list('face_detector.face_detector_angles', '0'), choices = facefusion.choices.face_detector_angles, nargs = '+', metavar = 'FACE_DETECTOR_ANGLES')
 	group_face_detector.add_argument('--face-detector-score', help = wording.get('help.face_detector_score'), type = float, default = config.get_float_value('face_detector.face_detector_score', '0.5'), choices = facefusion.choices.face_detector_score_range, metavar = create_float_metavar(facefusion.choices.face_detector_score_range))
-	job_store.register_step_keys([ 'face_detector_model', 'face_detector_angles', 'face_detector_size', 'face_detector_score' ])
+	group_face_detector.add_argument('--face-tracker-interval', help = wording.get('help.face_tracker_interval'), type = int, default = config.get_int_value('face_detector.face_tracker_interval', '0'))
+	job_store.register_step_keys([ 'face_detector_model', 'face_detector_angles', 'face_detector_size', 'face_detector_score', 'face_tracker_interval' ])
 	return program
 
 
@@ -147,9 +156,13 @@ def create_frame_extraction_program() -> ArgumentParser:
 	group_frame_extraction = program.add_argument_group('frame extraction')
 	group_frame_extraction.add_argument('--trim-frame-start', help = wording.get('help.trim_frame_start'), type = int, default = facefusion.config.get_int_value('frame_extraction.trim_frame_start'))
 	group_frame_extraction.add_argument('--trim-frame-end',	help = wording.get('help.trim_frame_end'), type = int, default = facefusion.config.get_int_value('frame_extraction.trim_frame_end'))
-	group_frame_extraction.add_argument('--temp-frame-format', help = wording.get('help.temp_frame_format'), default = config.get_str_value('frame_extraction.temp_frame_format', 'png'), choices = facefusion.choices.temp_frame_formats)
+	group_frame_extraction.add_argument('--temp-frame-format', help = wording.get('help.temp_frame_format'), default = config.get_str_value('frame_extraction.temp_frame_format', 'png'), choices = facefusion.choices.temp_frame_formats + [ 'raw' ])
 	group_frame_extraction.add_argument('--keep-temp', help = wording.get('help.keep_temp'), action = 'store_true',	default = config.get_bool_value('frame_extraction.keep_temp'))
-	job_store.register_step_keys([ 'trim_frame_start', 'trim_frame_end', 'temp_frame_format', 'keep_temp' ])
+	group_frame_extraction.add_argument('--stream-video', help = wording.get('help.stream_video'), action = 'store_true', default = config.get_bool_value('frame_extraction.stream_video'))
+	group_frame_extraction.add_argument('--stream-queue-depth', help = wording.get('help.stream_queue_depth'), type = int, default = config.get_int_value('frame_extraction.stream_queue_depth', '16'), choices = stream_queue_depth_range, metavar = create_int_metavar(stream_queue_depth_range))
+	group_frame_extraction.add_argument('--inline-content-analysis', help = wording.get('help.inline_content_analysis'), action = 'store_true', default = config.get_bool_value('frame_extraction.inline_content_analysis'))
+	group_frame_extraction.add_argument('--video-segment-count', help = wording.get('help.video_segment_count'), type = int, default = config.get_int_value('frame_extraction.video_segment_count', '1'), choices = video_segment_count_range, metavar = create_int_metavar(video_segment_count_range))
+	job_store.register_step_keys([ 'trim_frame_start', 'trim_frame_end', 'temp_frame_format', 'keep_temp', 'stream_video', 'stream_queue_depth', 'inline_content_analysis', 'video_segment_count' ])
 	return program
 
 
@@ -158,6 +171,7 @@ def create_output_creation_program() -> ArgumentParser:
 	group_output_creation = program.add_argument_group('output creation')
 	group_output_creation.add_argument('--output-image-quality', help = wording.get('help.output_image_quality'), type = int, default = config.get_int_value('output_creation.output_image_quality', '80'), choices = facefusion.choices.output_image_quality_range, metavar = create_int_metavar(facefusion.choices.output_image_quality_range))
 	group_output_creation.add_argument('--output-image-resolution', help = wording.get('help.output_image_resolution'), default = config.get_str_value('output_creation.output_image_resolution'))
+	group_output_creation.add_argument('--stream-image', help = wording.get('help.stream_image'), action = 'store_true', default = config.get_bool_value('output_creation.stream_image'))
 	group_output_creation.add_argument('--output-audio-encoder', help = wording.get('help.output_audio_encoder'), default = config.get_str_value('output_creation.output_audio_encoder', 'aac'), choices = facefusion.choices.output_audio_encoders)
 	group_output_creation.add_argument('--output-video-encoder', help = wording.get('help.output_video_encoder'), default = config.get_str_value('output_creation.output_video_encoder', 'libx264'), choices = facefusion.choices.output_video_encoders)
 	group_output_creation.add_argument('--output-video-preset', help = wording.get('help.output_video_preset'), default = config.get_str_value('output_creation.output_video_preset', 'veryfast'), choices = facefusion.choices.output_video_presets)
@@ -165,16 +179,19 @@ def create_output_creation_program() -> ArgumentParser:
 	group_output_creation.add_argument('--output-video-resolution', help = wording.get('help.output_video_resolution'), default = config.get_str_value('output_creation.output_video_resolution'))
 	group_output_creation.add_argument('--output-video-fps', help = wording.get('help.output_video_fps'), type = float, default = config.get_str_value('output_creation.output_video_fps'))
 	group_output_creation.add_argument('--skip-audio', help = wording.get('help.skip_audio'), action = 'store_true', default = config.get_bool_value('output_creation.skip_audio'))
-	job_store.register_step_keys([ 'output_image_quality', 'output_image_resolution', 'output_audio_encoder', 'output_video_encoder', 'output_video_preset', 'output_video_quality', 'output_video_resolution', 'output_video_fps', 'skip_audio' ])
+	job_store.register_step_keys([ 'output_image_quality', 'output_image_resolution', 'stream_image', 'output_audio_encoder', 'output_video_encoder', 'output_video_preset', 'output_video_quality', 'output_video_resolution', 'output_video_fps', 'skip_audio' ])
 	return program
 
 
 def create_processors_program() -> ArgumentParser:
+	from facefusion.processors.core import get_processors_modules
+
 	program = ArgumentParser(add_help = False)
 	available_processors = [ file.get('name') for file in list_directory('facefusion/processors/modules') ]
 	group_processors = program.add_argument_group('processors')
 	group_processors.add_argument('--processors', help = wording.get('help.processors').format(choices = ', '.join(available_processors)), default = config.get_str_list('processors.processors', 'face_swapper'), nargs = '+')
-	job_store.register_step_keys([ 'processors' ])
+	group_processors.add_argument('--fuse-processors', help = wording.get('help.fuse_processors'), action = 'store_true', default = config.get_bool_value('processors.fuse_processors'))
+	job_store.register_step_keys([ 'processors', 'fuse_processors' ])
 	for processor_module in get_processors_modules(available_processors):
 		processor_module.register_args(program)
 	return program
@@ -187,10 +204,33 @@ def create_uis_program() -> ArgumentParser:
 	group_uis.add_argument('--open-browser', help = wording.get('help.open_browser'), action = 'store_true', default = config.get_bool_value('uis.open_browser'))
 	group_uis.add_argument('--ui-layouts', help = wording.get('help.ui_layouts').format(choices = ', '.join(available_ui_layouts)), default = config.get_str_list('uis.ui_layouts', 'default'), nargs = '+')
 	group_uis.add_argument('--ui-workflow', help = wording.get('help.ui_workflow'), default = config.get_str_value('uis.ui_workflow', 'instant_runner'), choices = facefusion.choices.ui_workflows)
+	group_uis.add_argument('--preview-proxy-size', help = wording.get('help.preview_proxy_size'), type = int, default = config.get_int_value('uis.preview_proxy_size', '512'))
+	return program
+
+
+def create_serve_program() -> ArgumentParser:
+	program = ArgumentParser(add_help = False)
+	group_serve = program.add_argument_group('serve')
+	group_serve.add_argument('--serve-port', help = wording.get('help.serve_port'), type = int, default = config.get_int_value('serve.serve_port', '7870'))
+	return program
+
+
+def create_benchmark_program() -> ArgumentParser:
+	program = ArgumentParser(add_help = False)
+	group_benchmark = program.add_argument_group('benchmark')
+	group_benchmark.add_argument('--benchmark-resolutions', help = wording.get('help.benchmark_resolutions'), default = config.get_str_list('benchmark.benchmark_resolutions', '640x360 1280x720'), nargs = '+')
+	group_benchmark.add_argument('--benchmark-frame-total', help = wording.get('help.benchmark_frame_total'), type = int, default = config.get_int_value('benchmark.benchmark_frame_total', '100'))
+	group_benchmark.add_argument('--benchmark-cycle-count', help = wording.get('help.benchmark_cycle_count'), type = int, default = config.get_int_value('benchmark.benchmark_cycle_count', '3'))
+	group_benchmark.add_argument('--benchmark-report-path', help = wording.get('help.benchmark_report_path'), default = config.get_str_value('benchmark.benchmark_report_path', 'benchmark.json'))
+	group_benchmark.add_argument('--benchmark-baseline-path', help = wording.get('help.benchmark_baseline_path'), default = config.get_str_value('benchmark.benchmark_baseline_path'))
+	group_benchmark.add_argument('--benchmark-model-precisions', help = wording.get('help.benchmark_model_precisions'), default = config.get_str_list('benchmark.benchmark_model_precisions', 'fp32'), choices = [ 'fp32', 'optimized', 'int8' ], nargs = '+')
+	group_benchmark.add_argument('--benchmark-threshold', help = wording.get('help.benchmark_threshold'), type = int, default = config.get_int_value('benchmark.benchmark_threshold', '10'))
 	return program
 
 
 def create_execution_program() -> ArgumentParser:
+	from facefusion.execution import get_available_execution_providers
+
 	program = ArgumentParser(add_help = False)
 	available_execution_providers = get_available_execution_providers()
 	group_execution = program.add_argument_group('execution')
@@ -198,7 +238,10 @@ def create_execution_program() -> ArgumentParser:
 	group_execution.add_argument('--execution-providers', help = wording.get('help.execution_providers').format(choices = ', '.join(available_execution_providers)), default = config.get_str_list('execution.execution_providers', 'cpu'), choices = available_execution_providers, nargs = '+', metavar = 'EXECUTION_PROVIDERS')
 	group_execution.add_argument('--execution-thread-count', help = wording.get('help.execution_thread_count'), type = int, default = config.get_int_value('execution.execution_thread_count', '4'), choices = facefusion.choices.execution_thread_count_range, metavar = create_int_metavar(facefusion.choices.execution_thread_count_range))
 	group_execution.add_argument('--execution-queue-count', help = wording.get('help.execution_queue_count'), type = int, default = config.get_int_value('execution.execution_queue_count', '1'), choices = facefusion.choices.execution_queue_count_range, metavar = create_int_metavar(facefusion.choices.execution_queue_count_range))
-	job_store.register_job_keys([ 'execution_device_id', 'execution_providers', 'execution_thread_count', 'execution_queue_count' ])
+	group_execution.add_argument('--model-precision', help = wording.get('help.model_precision'), default = config.get_str_value('execution.model_precision', 'fp32'), choices = [ 'fp32', 'optimized', 'int8' ])
+	group_execution.add_argument('--execution-batch-size', help = wording.get('help.execution_batch_size'), type = int, default = config.get_int_value('execution.execution_batch_size', '1'), choices = execution_batch_size_range, metavar = create_int_metavar(execution_batch_size_range))
+	group_execution.add_argument('--execution-batch-deadline', help = wording.get('help.execution_batch_deadline'), type = int, default = config.get_int_value('execution.execution_batch_deadline', '20'), choices = execution_batch_deadline_range, metavar = create_int_metavar(execution_batch_deadline_range))
+	job_store.register_job_keys([ 'execution_device_id', 'execution_providers', 'execution_thread_count', 'execution_queue_count', 'model_precision', 'execution_batch_size', 'execution_batch_deadline' ])
 	return program
 
 
@@ -207,7 +250,8 @@ def create_download_providers_program() -> ArgumentParser:
 	download_providers = list(facefusion.choices.download_provider_set.keys())
 	group_download = program.add_argument_group('download')
 	group_download.add_argument('--download-providers', help = wording.get('help.download_providers').format(choices = ', '.join(download_providers)), default = config.get_str_list('download.download_providers', ' '.join(facefusion.choices.download_providers)), choices = download_providers, nargs = '+', metavar = 'DOWNLOAD_PROVIDERS')
-	job_store.register_job_keys([ 'download_providers' ])
+	group_download.add_argument('--verify-models', help = wording.get('help.verify_models'), action = 'store_true', default = config.get_bool_value('download.verify_models'))
+	job_store.register_job_keys([ 'download_providers', 'verify_models' ])
 	return program
 
 
@@ -215,7 +259,8 @@ def create_download_scope_program() -> ArgumentParser:
 	program = ArgumentParser(add_help = False)
 	group_download = program.add_argument_group('download')
 	group_download.add_argument('--download-scope', help = wording.get('help.download_scope'), default = config.get_str_value('download.download_scope', 'lite'), choices = facefusion.choices.download_scopes)
-	job_store.register_job_keys([ 'download_scope' ])
+	group_download.add_argument('--download-concurrency', help = wording.get('help.download_concurrency'), type = int, default = config.get_int_value('download.download_concurrency', '4'))
+	job_store.register_job_keys([ 'download_scope', 'download_concurrency' ])
 	return program
 
 
@@ -224,7 +269,20 @@ def create_memory_program() -> ArgumentParser:
 	group_memory = program.add_argument_group('memory')
 	group_memory.add_argument('--video-memory-strategy', help = wording.get('help.video_memory_strategy'), default = config.get_str_value('memory.video_memory_strategy', 'strict'), choices = facefusion.choices.video_memory_strategies)
 	group_memory.add_argument('--system-memory-limit', help = wording.get('help.system_memory_limit'), type = int, default = config.get_int_value('memory.system_memory_limit', '0'), choices = facefusion.choices.system_memory_limit_range, metavar = create_int_metavar(facefusion.choices.system_memory_limit_range))
-	job_store.register_job_keys([ 'video_memory_strategy', 'system_memory_limit' ])
+	group_memory.add_argument('--face-cache-memory-limit', help = wording.get('help.face_cache_memory_limit'), type = int, default = config.get_int_value('memory.face_cache_memory_limit', '256'))
+	group_memory.add_argument('--source-face-cache-limit', help = wording.get('help.source_face_cache_limit'), type = int, default = config.get_int_value('memory.source_face_cache_limit', '64'))
+	group_memory.add_argument('--target-cache-limit', help = wording.get('help.target_cache_limit'), type = int, default = config.get_int_value('memory.target_cache_limit', '4096'))
+	group_memory.add_argument('--inference-memory-budget', help = wording.get('help.inference_memory_budget'), type = int, default = config.get_int_value('memory.inference_memory_budget', '4096'))
+	job_store.register_job_keys([ 'video_memory_strategy', 'system_memory_limit', 'face_cache_memory_limit', 'source_face_cache_limit', 'target_cache_limit', 'inference_memory_budget' ])
+	return program
+
+
+def create_tracing_program() -> ArgumentParser:
+	program = ArgumentParser(add_help = False)
+	group_tracing = program.add_argument_group('tracing')
+	group_tracing.add_argument('--trace-path', help = wording.get('help.trace_path'), default = config.get_str_value('tracing.trace_path'))
+	group_tracing.add_argument('--metrics-path', help = wording.get('help.metrics_path'), default = config.get_str_value('tracing.metrics_path'))
+	job_store.register_job_keys([ 'trace_path', 'metrics_path' ])
 	return program
 
 
@@ -237,6 +295,31 @@ def create_misc_program() -> ArgumentParser:
 	return program
 
 
+def create_job_worker_program() -> ArgumentParser:
+	program = ArgumentParser(add_help = False)
+	group_jobs = program.add_argument_group('jobs')
+	group_jobs.add_argument('--job-worker-count', help = wording.get('help.job_worker_count'), type = int, default = config.get_int_value('jobs.job_worker_count', '1'), choices = job_worker_count_range, metavar = create_int_metavar(job_worker_count_range))
+	job_store.register_job_keys([ 'job_worker_count' ])
+	return program
+
+
+def create_job_lease_program() -> ArgumentParser:
+	program = ArgumentParser(add_help = False)
+	group_jobs = program.add_argument_group('jobs')
+	group_jobs.add_argument('--worker', help = wording.get('help.worker'), action = 'store_true', default = config.get_bool_value('jobs.worker'))
+	group_jobs.add_argument('--job-lease-duration', help = wording.get('help.job_lease_duration'), type = int, default = config.get_int_value('jobs.job_lease_duration', '60'), choices = job_lease_duration_range, metavar = create_int_metavar(job_lease_duration_range))
+	job_store.register_job_keys([ 'worker', 'job_lease_duration' ])
+	return program
+
+
+def create_job_checkpoint_program() -> ArgumentParser:
+	program = ArgumentParser(add_help = False)
+	group_jobs = program.add_argument_group('jobs')
+	group_jobs.add_argument('--checkpoint-interval', help = wording.get('help.checkpoint_interval'), type = int, default = config.get_int_value('jobs.checkpoint_interval', '10'))
+	job_store.register_job_keys([ 'checkpoint_interval' ])
+	return program
+
+
 def create_job_id_program() -> ArgumentParser:
 	program = ArgumentParser(add_help = False)
 	program.add_argument('job_id', help = wording.get('help.job_id'))
@@ -261,7 +344,7 @@ def collect_step_program() -> ArgumentParser:
 
 
 def collect_job_program() -> ArgumentParser:
-	return ArgumentParser(parents= [ create_execution_program(), create_download_providers_program(), create_memory_program(), create_misc_program() ], add_help = False)
+	return ArgumentParser(parents= [ create_execution_program(), create_download_providers_program(), create_memory_program(), create_job_checkpoint_program(), create_tracing_program(), create_misc_program() ], add_help = False)
 
 
 def create_program() -> ArgumentParser:
@@ -270,29 +353,41 @@ def create_program() -> ArgumentParser:
 	program.add_argument('-v', '--version', version = metadata.get('name') + ' ' + metadata.get('version'), action = 'version')
 	sub_program = program.add_subparsers(dest = 'command')
 	# general
-	sub_program.add_parser('run', help = wording.get('help.run'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), collect_step_program(), create_uis_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('headless-run', help = wording.get('help.headless_run'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), collect_step_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('batch-run', help = wording.get('help.batch_run'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), create_source_pattern_program(), create_target_pattern_program(), create_output_pattern_program(), collect_step_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('force-download', help = wording.get('help.force_download'), parents = [ create_download_providers_program(), create_download_scope_program(), create_misc_program() ], formatter_class = create_help_formatter_large)
+	sub_program.add_parser('run', help = wording.get('help.run'), parents = collect_command_parents('run', lambda: [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), collect_step_program(), create_uis_program(), collect_job_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('headless-run', help = wording.get('help.headless_run'), parents = collect_command_parents('headless-run', lambda: [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), collect_step_program(), collect_job_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('batch-run', help = wording.get('help.batch_run'), parents = collect_command_parents('batch-run', lambda: [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), create_source_pattern_program(), create_target_pattern_program(), create_output_pattern_program(), collect_step_program(), collect_job_program(), create_job_worker_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('benchmark', help = wording.get('help.benchmark'), parents = collect_command_parents('benchmark', lambda: [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), create_source_paths_program(), collect_step_program(), collect_job_program(), create_benchmark_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('serve', help = wording.get('help.serve'), parents = collect_command_parents('serve', lambda: [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_step_program(), collect_job_program(), create_serve_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('force-download', help = wording.get('help.force_download'), parents = collect_command_parents('force-download', lambda: [ create_download_providers_program(), create_download_scope_program(), create_misc_program() ]), formatter_class = create_help_formatter_large)
 	# job manager
-	sub_program.add_parser('job-list', help = wording.get('help.job_list'), parents = [ create_job_status_program(), create_jobs_path_program(), create_misc_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('job-create', help = wording.get('help.job_create'), parents = [ create_job_id_program(), create_jobs_path_program(), create_misc_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('job-submit', help = wording.get('help.job_submit'), parents = [ create_job_id_program(), create_jobs_path_program(), create_misc_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('job-submit-all', help = wording.get('help.job_submit_all'), parents = [ create_jobs_path_program(), create_misc_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('job-delete', help = wording.get('help.job_delete'), parents = [ create_job_id_program(), create_jobs_path_program(), create_misc_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('job-delete-all', help = wording.get('help.job_delete_all'), parents = [ create_jobs_path_program(), create_misc_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('job-add-step', help = wording.get('help.job_add_step'), parents = [ create_job_id_program(), create_config_path_program(), create_jobs_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), collect_step_program(), create_misc_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('job-remix-step', help = wording.get('help.job_remix_step'), parents = [ create_job_id_program(), create_step_index_program(), create_config_path_program(), create_jobs_path_program(), create_source_paths_program(), create_output_path_program(), collect_step_program(), create_misc_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('job-insert-step', help = wording.get('help.job_insert_step'), parents = [ create_job_id_program(), create_step_index_program(), create_config_path_program(), create_jobs_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), collect_step_program(), create_misc_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('job-remove-step', help = wording.get('help.job_remove_step'), parents = [ create_job_id_program(), create_step_index_program(), create_jobs_path_program(), create_misc_program() ], formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-list', help = wording.get('help.job_list'), parents = collect_command_parents('job-list', lambda: [ create_job_status_program(), create_jobs_path_program(), create_misc_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-create', help = wording.get('help.job_create'), parents = collect_command_parents('job-create', lambda: [ create_job_id_program(), create_jobs_path_program(), create_misc_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-submit', help = wording.get('help.job_submit'), parents = collect_command_parents('job-submit', lambda: [ create_job_id_program(), create_jobs_path_program(), create_misc_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-submit-all', help = wording.get('help.job_submit_all'), parents = collect_command_parents('job-submit-all', lambda: [ create_jobs_path_program(), create_misc_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-delete', help = wording.get('help.job_delete'), parents = collect_command_parents('job-delete', lambda: [ create_job_id_program(), create_jobs_path_program(), create_misc_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-delete-all', help = wording.get('help.job_delete_all'), parents = collect_command_parents('job-delete-all', lambda: [ create_jobs_path_program(), create_misc_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-add-step', help = wording.get('help.job_add_step'), parents = collect_command_parents('job-add-step', lambda: [ create_job_id_program(), create_config_path_program(), create_jobs_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), collect_step_program(), create_misc_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-remix-step', help = wording.get('help.job_remix_step'), parents = collect_command_parents('job-remix-step', lambda: [ create_job_id_program(), create_step_index_program(), create_config_path_program(), create_jobs_path_program(), create_source_paths_program(), create_output_path_program(), collect_step_program(), create_misc_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-insert-step', help = wording.get('help.job_insert_step'), parents = collect_command_parents('job-insert-step', lambda: [ create_job_id_program(), create_step_index_program(), create_config_path_program(), create_jobs_path_program(), create_source_paths_program(), create_target_path_program(), create_output_path_program(), collect_step_program(), create_misc_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-remove-step', help = wording.get('help.job_remove_step'), parents = collect_command_parents('job-remove-step', lambda: [ create_job_id_program(), create_step_index_program(), create_jobs_path_program(), create_misc_program() ]), formatter_class = create_help_formatter_large)
 	# job runner
-	sub_program.add_parser('job-run', help = wording.get('help.job_run'), parents = [ create_job_id_program(), create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('job-run-all', help = wording.get('help.job_run_all'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('job-retry', help = wording.get('help.job_retry'), parents = [ create_job_id_program(), create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
-	sub_program.add_parser('job-retry-all', help = wording.get('help.job_retry_all'), parents = [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program() ], formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-run', help = wording.get('help.job_run'), parents = collect_command_parents('job-run', lambda: [ create_job_id_program(), create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program(), create_job_worker_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-run-all', help = wording.get('help.job_run_all'), parents = collect_command_parents('job-run-all', lambda: [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program(), create_job_worker_program(), create_job_lease_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-retry', help = wording.get('help.job_retry'), parents = collect_command_parents('job-retry', lambda: [ create_job_id_program(), create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program() ]), formatter_class = create_help_formatter_large)
+	sub_program.add_parser('job-retry-all', help = wording.get('help.job_retry_all'), parents = collect_command_parents('job-retry-all', lambda: [ create_config_path_program(), create_temp_path_program(), create_jobs_path_program(), collect_job_program() ]), formatter_class = create_help_formatter_large)
 	return ArgumentParser(parents = [ program ], formatter_class = create_help_formatter_small, add_help = True)
 
 
+def collect_command_parents(command : str, create_parents : Callable[[], List[ArgumentParser]]) -> List[ArgumentParser]:
+	if command == detect_command():
+		return create_parents()
+	return []
+
+
+def detect_command() -> Optional[str]:
+	return get_first([ arg for arg in sys.argv[1:] if not arg.startswith('-') ])
+
+
 def apply_config_path(program : ArgumentParser) -> None:
 	known_args, _ = program.parse_known_args()
 	state_manager.init_item('config_path', known_args.config_path)
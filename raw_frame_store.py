@@ -0,0 +1,72 @@
+import os
+from typing import List, Optional
+
+import numpy
+
+from facefusion import state_manager
+from facefusion.ffmpeg import run_ffmpeg
+from facefusion.ffmpeg_stream import create_audio_output_args, create_encoder_args
+from facefusion.filesystem import is_file
+from facefusion.temp_helper import get_temp_directory_path, get_temp_file_path
+from facefusion.typing import Fps, VisionFrame
+from facefusion.vision import unpack_resolution
+
+RAW_FRAMES_NAME = 'raw_frames.bin'
+
+
+def get_raw_frames_path(target_path : str) -> str:
+	return os.path.join(get_temp_directory_path(target_path), RAW_FRAMES_NAME)
+
+
+def extract_raw_frames(target_path : str, temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int) -> bool:
+	temp_video_width, temp_video_height = unpack_resolution(temp_video_resolution)
+	commands = [ '-i', target_path, '-vf', 'trim=start_frame=' + str(trim_frame_start) + ':end_frame=' + str(trim_frame_end) + ',scale=' + str(temp_video_width) + ':' + str(temp_video_height) + ',fps=' + str(temp_video_fps) ]
+	commands.extend([ '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-vsync', '0', '-y', get_raw_frames_path(target_path) ])
+	process = run_ffmpeg(commands)
+	process.communicate()
+	return process.returncode == 0 and count_raw_frames(target_path, temp_video_resolution) > 0
+
+
+def count_raw_frames(target_path : str, temp_video_resolution : str) -> int:
+	raw_frames_path = get_raw_frames_path(target_path)
+
+	if is_file(raw_frames_path):
+		return os.path.getsize(raw_frames_path) // get_raw_frame_stride(temp_video_resolution)
+	return 0
+
+
+def get_raw_frame_stride(temp_video_resolution : str) -> int:
+	temp_video_width, temp_video_height = unpack_resolution(temp_video_resolution)
+	return temp_video_width * temp_video_height * 3
+
+
+def open_raw_frames(target_path : str, temp_video_resolution : str) -> Optional[numpy.memmap]:
+	temp_video_width, temp_video_height = unpack_resolution(temp_video_resolution)
+	frame_total = count_raw_frames(target_path, temp_video_resolution)
+
+	if frame_total:
+		return numpy.memmap(get_raw_frames_path(target_path), dtype = numpy.uint8, mode = 'r+', shape = (frame_total, temp_video_height, temp_video_width, 3))
+	return None
+
+
+def read_raw_frame(raw_frames : numpy.memmap, frame_number : int) -> VisionFrame:
+	return raw_frames[frame_number]
+
+
+def write_raw_frame(raw_frames : numpy.memmap, frame_number : int, vision_frame : VisionFrame) -> bool:
+	if vision_frame.shape == raw_frames.shape[1:]:
+		raw_frames[frame_number] = vision_frame
+		return True
+	return False
+
+
+def merge_raw_frames(target_path : str, temp_video_resolution : str, temp_video_fps : Fps, output_video_resolution : str, output_video_fps : Fps, audio_input_args : List[str]) -> bool:
+	output_video_width, output_video_height = unpack_resolution(output_video_resolution)
+	commands = [ '-f', 'rawvideo', '-pix_fmt', 'bgr24', '-s', temp_video_resolution, '-r', str(temp_video_fps), '-i', get_raw_frames_path(target_path) ]
+	commands.extend(audio_input_args)
+	commands.extend(create_encoder_args(state_manager.get_item('output_video_encoder'), state_manager.get_item('output_video_preset'), state_manager.get_item('output_video_quality')))
+	commands.extend(create_audio_output_args(audio_input_args))
+	commands.extend([ '-vf', 'scale=' + str(output_video_width) + ':' + str(output_video_height) + ',framerate=fps=' + str(output_video_fps), '-pix_fmt', 'yuv420p', '-colorspace', 'bt709', '-y', get_temp_file_path(target_path) ])
+	process = run_ffmpeg(commands)
+	process.communicate()
+	return process.returncode == 0
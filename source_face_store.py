@@ -0,0 +1,167 @@
+import hashlib
+import os
+import threading
+import zipfile
+from typing import Any, Dict, List, Optional
+
+import numpy
+
+from facefusion import state_manager
+from facefusion.face_analyser import get_many_faces
+from facefusion.face_store import prime_static_faces
+from facefusion.filesystem import is_image
+from facefusion.typing import Face
+from facefusion.vision import read_static_image
+
+SOURCE_FACE_STORE : Dict[str, List[Face]] = {}
+SOURCE_HASH_STORE : Dict[str, str] = {}
+SOURCE_FACE_STORE_LOCK : threading.Lock = threading.Lock()
+
+
+def get_source_faces(source_paths : List[str]) -> List[Face]:
+	source_faces : List[Face] = []
+
+	for source_path in source_paths:
+		if is_image(source_path):
+			source_faces.extend(get_source_path_faces(source_path))
+	return source_faces
+
+
+def get_source_path_faces(source_path : str) -> List[Face]:
+	cache_key = create_cache_key(source_path)
+
+	with SOURCE_FACE_STORE_LOCK:
+		source_faces = SOURCE_FACE_STORE.get(cache_key)
+
+		if source_faces is None:
+			source_faces = read_source_faces(cache_key)
+			if source_faces:
+				prime_static_faces(read_static_image(source_path), source_faces)
+		if source_faces is None:
+			source_faces = get_many_faces([ read_static_image(source_path) ])
+			write_source_faces(cache_key, source_faces)
+		SOURCE_FACE_STORE[cache_key] = source_faces
+	return source_faces
+
+
+def create_cache_key(source_path : str) -> str:
+	face_analyser_keys =\
+	[
+		state_manager.get_item('face_detector_model'),
+		state_manager.get_item('face_detector_size'),
+		'-'.join(map(str, state_manager.get_item('face_detector_angles'))),
+		state_manager.get_item('face_detector_score'),
+		state_manager.get_item('face_landmarker_model'),
+		state_manager.get_item('face_landmarker_score')
+	]
+	return hash_source_file(source_path) + '-' + hashlib.sha1('.'.join(map(str, face_analyser_keys)).encode()).hexdigest()[:16]
+
+
+def hash_source_file(source_path : str) -> str:
+	source_stat = os.stat(source_path)
+	source_stat_key = source_path + ':' + str(source_stat.st_size) + ':' + str(source_stat.st_mtime_ns)
+
+	if source_stat_key not in SOURCE_HASH_STORE:
+		source_hash = hashlib.sha256()
+		with open(source_path, 'rb') as source_file:
+			for chunk in iter(lambda: source_file.read(1024 * 1024), b''):
+				source_hash.update(chunk)
+		SOURCE_HASH_STORE[source_stat_key] = source_hash.hexdigest()
+	return SOURCE_HASH_STORE.get(source_stat_key)
+
+
+def get_source_face_store_path() -> str:
+	return os.path.join(state_manager.get_item('jobs_path'), 'sources')
+
+
+def pack_source_faces(source_faces : List[Face]) -> Dict[str, numpy.ndarray]:
+	source_face_arrays : Dict[str, numpy.ndarray] = {}
+
+	for face_index, source_face in enumerate(source_faces):
+		for field_name, field_value in source_face._asdict().items():
+			field_key = str(face_index) + '.' + field_name
+
+			if isinstance(field_value, dict):
+				for key, value in field_value.items():
+					source_face_arrays[field_key + '.' + key] = numpy.asarray(value)
+			elif isinstance(field_value, range):
+				source_face_arrays[field_key] = numpy.array([ field_value.start, field_value.stop ])
+			elif field_value is not None:
+				source_face_arrays[field_key] = numpy.asarray(field_value)
+	return source_face_arrays
+
+
+def unpack_source_faces(source_face_arrays : Dict[str, numpy.ndarray]) -> List[Face]:
+	source_face_fields : Dict[int, Dict[str, Any]] = {}
+
+	for array_key, array_value in source_face_arrays.items():
+		face_index, field_name, *keys = array_key.split('.', 2)
+		face_fields = source_face_fields.setdefault(int(face_index), dict.fromkeys(Face._fields))
+		field_value = array_value.item() if array_value.ndim == 0 else array_value
+
+		if keys:
+			face_fields[field_name] = face_fields.get(field_name) or {}
+			face_fields.get(field_name)[keys[0]] = field_value
+		elif field_name == 'age':
+			face_fields[field_name] = range(*array_value.tolist())
+		else:
+			face_fields[field_name] = field_value
+	return [ Face(**source_face_fields.get(face_index)) for face_index in sorted(source_face_fields) ]
+
+
+def read_source_faces(cache_key : str) -> Optional[List[Face]]:
+	source_faces_path = os.path.join(get_source_face_store_path(), cache_key + '.npz')
+
+	if state_manager.get_item('source_face_cache_limit') > 0 and os.path.isfile(source_faces_path):
+		try:
+			with numpy.load(source_faces_path, allow_pickle = False) as source_face_arrays:
+				source_faces = unpack_source_faces(dict(source_face_arrays))
+			os.utime(source_faces_path)
+			return source_faces
+		except (OSError, ValueError, TypeError, KeyError, zipfile.BadZipFile):
+			return None
+	return None
+
+
+def write_source_faces(cache_key : str, source_faces : List[Face]) -> bool:
+	source_face_store_path = get_source_face_store_path()
+	source_faces_path = os.path.join(source_face_store_path, cache_key + '.npz')
+
+	if state_manager.get_item('source_face_cache_limit') > 0:
+		os.makedirs(source_face_store_path, mode = 0o700, exist_ok = True)
+		os.chmod(source_face_store_path, 0o700)
+		source_faces_temp_path = source_faces_path + '.' + str(os.getpid())
+		with open(source_faces_temp_path, 'wb') as source_faces_file:
+			numpy.savez(source_faces_file, **pack_source_faces(source_faces))
+		os.replace(source_faces_temp_path, source_faces_path)
+		evict_source_faces()
+		return True
+	return False
+
+
+def evict_source_faces() -> None:
+	source_face_store_path = get_source_face_store_path()
+	source_face_cache_limit = state_manager.get_item('source_face_cache_limit') * 1024 * 1024
+	source_faces_paths = [ os.path.join(source_face_store_path, file_name) for file_name in os.listdir(source_face_store_path) if file_name.endswith('.npz') ]
+	source_faces_stats = []
+
+	for source_faces_path in source_faces_paths:
+		try:
+			source_faces_stats.append((source_faces_path, os.stat(source_faces_path)))
+		except FileNotFoundError:
+			continue
+	source_faces_stats.sort(key = lambda source_faces_stat: source_faces_stat[1].st_mtime)
+	source_faces_size = sum(source_faces_stat.st_size for _, source_faces_stat in source_faces_stats)
+
+	while source_faces_stats and source_faces_size > source_face_cache_limit:
+		source_faces_path, source_faces_stat = source_faces_stats.pop(0)
+		source_faces_size -= source_faces_stat.st_size
+		try:
+			os.remove(source_faces_path)
+		except FileNotFoundError:
+			continue
+
+
+def clear_source_faces() -> None:
+	with SOURCE_FACE_STORE_LOCK:
+		SOURCE_FACE_STORE.clear()
@@ -0,0 +1,191 @@
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import urllib.error
+import urllib.request
+from argparse import ArgumentParser, HelpFormatter
+from time import perf_counter, sleep
+from typing import Dict, List, Optional
+
+from facefusion import logger, wording
+from facefusion.jobs import job_manager
+
+STARTUP_COMMANDS : List[str] =\
+[
+	'job-create',
+	'job-add-step',
+	'job-remix-step',
+	'job-insert-step',
+	'job-remove-step',
+	'job-list',
+	'job-submit',
+	'job-run',
+	'job-retry',
+	'job-delete',
+	'job-submit-all',
+	'job-run-all',
+	'job-retry-all',
+	'job-delete-all',
+	'headless-run',
+	'batch-run',
+	'force-download',
+	'benchmark',
+	'serve',
+	'run'
+]
+STARTUP_SERVER_COMMANDS : List[str] =\
+[
+	'serve',
+	'run'
+]
+
+
+def cli() -> None:
+	program = ArgumentParser(formatter_class = lambda prog: HelpFormatter(prog, max_help_position = 50))
+	program.add_argument('-s', '--source-paths', help = 'source paths for the step commands', required = True, nargs = '+')
+	program.add_argument('-t', '--target-path', help = 'target path for the step commands', required = True)
+	program.add_argument('--commands', help = 'commands to benchmark', default = STARTUP_COMMANDS, choices = STARTUP_COMMANDS, nargs = '+', metavar = 'COMMANDS')
+	program.add_argument('--cycle-count', help = 'cold starts per command', type = int, default = 5)
+	program.add_argument('--startup-limit', help = 'maximum startup seconds for job manager commands', type = float, default = 0.5)
+	program.add_argument('--startup-timeout', help = 'maximum seconds until serve and run answer requests', type = float, default = 120)
+	args = program.parse_args()
+	logger.init('info')
+	startup_times = benchmark_startup(args.commands, args.cycle_count, args.source_paths, args.target_path, args.startup_timeout)
+	failed_commands = []
+
+	for command, startup_time in startup_times.items():
+		if startup_time is None:
+			logger.error(wording.get('startup_command_failed').format(command = command), __name__)
+			failed_commands.append(command)
+			continue
+		logger.info(wording.get('startup_benchmark_result').format(command = command, startup_time = '{:.3f}'.format(startup_time)), __name__)
+		if is_startup_limited(command) and startup_time > args.startup_limit:
+			logger.error(wording.get('startup_limit_exceeded').format(command = command, startup_limit = args.startup_limit), __name__)
+			failed_commands.append(command)
+	sys.exit(1 if failed_commands else 0)
+
+
+def benchmark_startup(commands : List[str], cycle_count : int, source_paths : List[str], target_path : str, startup_timeout : float) -> Dict[str, Optional[float]]:
+	command_times : Dict[str, List[float]] = { command: [] for command in commands }
+
+	for cycle_index in range(cycle_count):
+		benchmark_path = tempfile.mkdtemp(prefix = 'facefusion-startup-')
+		job_id = 'startup-' + str(cycle_index)
+
+		try:
+			for command in commands:
+				if prepare_startup_command(command, job_id, benchmark_path, source_paths, target_path):
+					startup_time = measure_startup_command(command, create_startup_arguments(command, job_id, get_startup_jobs_path(command, benchmark_path), benchmark_path, source_paths, target_path), startup_timeout)
+					if startup_time is not None:
+						command_times.get(command).append(startup_time)
+		finally:
+			shutil.rmtree(benchmark_path, ignore_errors = True)
+	return { command: min(command_times.get(command)) if command_times.get(command) else None for command in commands }
+
+
+def prepare_startup_command(command : str, job_id : str, benchmark_path : str, source_paths : List[str], target_path : str) -> bool:
+	jobs_path = get_startup_jobs_path(command, benchmark_path)
+	setup_commands = []
+
+	if command.startswith('job-') and command != 'job-create':
+		setup_commands.append(create_startup_arguments('job-create', job_id, jobs_path, benchmark_path, source_paths, target_path))
+		setup_commands.append(create_startup_arguments('job-add-step', job_id, jobs_path, benchmark_path, source_paths, target_path))
+	if command.startswith('job-run') or command.startswith('job-retry'):
+		setup_commands.append(create_startup_arguments('job-submit', job_id, jobs_path, benchmark_path, source_paths, target_path))
+	for setup_command in setup_commands:
+		if not run_facefusion(setup_command):
+			return False
+	if command.startswith('job-retry'):
+		return job_manager.init_jobs(jobs_path) and job_manager.set_steps_status(job_id, 'failed') and job_manager.move_job_file(job_id, 'failed')
+	return True
+
+
+def measure_startup_command(command : str, arguments : List[str], startup_timeout : float) -> Optional[float]:
+	start_time = perf_counter()
+
+	if command in STARTUP_SERVER_COMMANDS:
+		if wait_startup_server(arguments, startup_timeout):
+			return perf_counter() - start_time
+		return None
+	if run_facefusion(arguments):
+		return perf_counter() - start_time
+	return None
+
+
+def run_facefusion(arguments : List[str]) -> bool:
+	return subprocess.run([ sys.executable, 'facefusion.py' ] + arguments, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL).returncode == 0
+
+
+def wait_startup_server(arguments : List[str], startup_timeout : float) -> bool:
+	server_port = get_free_port()
+	server_url = 'http://127.0.0.1:' + str(server_port) + ('/health' if arguments[0] == 'serve' else '/')
+	server_environment = dict(os.environ, GRADIO_SERVER_PORT = str(server_port))
+	server_deadline = perf_counter() + startup_timeout
+	process = subprocess.Popen([ sys.executable, 'facefusion.py' ] + arguments + ([ '--serve-port', str(server_port) ] if arguments[0] == 'serve' else []), env = server_environment, stdout = subprocess.DEVNULL, stderr = subprocess.DEVNULL)
+
+	try:
+		while process.poll() is None and perf_counter() < server_deadline:
+			try:
+				with urllib.request.urlopen(server_url, timeout = 1) as response:
+					return response.status == 200
+			except (urllib.error.URLError, OSError):
+				sleep(0.05)
+		return False
+	finally:
+		process.terminate()
+		process.wait()
+
+
+def get_free_port() -> int:
+	with socket.socket() as server_socket:
+		server_socket.bind(('127.0.0.1', 0))
+		return server_socket.getsockname()[1]
+
+
+def get_startup_jobs_path(command : str, benchmark_path : str) -> str:
+	return os.path.join(benchmark_path, command, 'jobs')
+
+
+def create_startup_arguments(command : str, job_id : str, jobs_path : str, benchmark_path : str, source_paths : List[str], target_path : str) -> List[str]:
+	output_path = os.path.join(benchmark_path, job_id + '-output' + os.path.splitext(target_path)[1])
+	jobs_arguments = [ '--jobs-path', jobs_path ]
+	temp_arguments = [ '--temp-path', benchmark_path ]
+
+	if command == 'force-download':
+		return [ command ]
+	if command == 'benchmark':
+		return [ command, '-s' ] + source_paths + [ '--benchmark-resolutions', '640x360', '--benchmark-frame-total', '1', '--benchmark-cycle-count', '1', '--benchmark-report-path', os.path.join(benchmark_path, 'benchmark.json') ] + jobs_arguments + temp_arguments
+	if command == 'serve':
+		return [ command ] + jobs_arguments + temp_arguments
+	if command == 'job-list':
+		return [ command, 'drafted' ] + jobs_arguments
+	if command in [ 'job-create', 'job-submit', 'job-delete' ]:
+		return [ command, job_id ] + jobs_arguments
+	if command in [ 'job-submit-all', 'job-delete-all' ]:
+		return [ command ] + jobs_arguments
+	if command == 'job-add-step':
+		return [ command, job_id, '-s' ] + source_paths + [ '-t', target_path, '-o', output_path ] + jobs_arguments
+	if command == 'job-insert-step':
+		return [ command, job_id, '0', '-s' ] + source_paths + [ '-t', target_path, '-o', output_path ] + jobs_arguments
+	if command == 'job-remix-step':
+		return [ command, job_id, '0', '-s' ] + source_paths + [ '-o', output_path ] + jobs_arguments
+	if command == 'job-remove-step':
+		return [ command, job_id, '0' ] + jobs_arguments
+	if command in [ 'job-run', 'job-retry' ]:
+		return [ command, job_id ] + jobs_arguments + temp_arguments
+	if command in [ 'job-run-all', 'job-retry-all' ]:
+		return [ command ] + jobs_arguments + temp_arguments
+	if command == 'batch-run':
+		return [ command, '-s', source_paths[0], '-t', target_path, '-o', os.path.join(benchmark_path, 'batch-{index}' + os.path.splitext(target_path)[1]) ] + jobs_arguments + temp_arguments
+	return [ command, '-s' ] + source_paths + [ '-t', target_path, '-o', output_path ] + jobs_arguments + temp_arguments
+
+
+def is_startup_limited(command : str) -> bool:
+	return command.startswith('job-') and not command.startswith('job-run') and not command.startswith('job-retry')
+
+
+if __name__ == '__main__':
+	cli()
@@ -0,0 +1,174 @@
+import hashlib
+import json
+import os
+import shutil
+from time import monotonic
+from typing import Any, Dict, List, Optional
+
+from facefusion import state_manager
+from facefusion.filesystem import is_file
+from facefusion.temp_helper import get_temp_directory_path
+from facefusion.typing import Args
+
+STEP_CHECKPOINT : Dict[str, Any] =\
+{
+	'checkpoint_path': None,
+	'step_key': None,
+	'stages': [],
+	'frame_total': 0,
+	'frame_ranges': {},
+	'write_time': 0.0
+}
+
+
+def init_step_checkpoint(job_id : str, step_index : int, step_args : Args) -> None:
+	clear_step_checkpoint()
+
+	if state_manager.get_item('checkpoint_interval') > 0:
+		STEP_CHECKPOINT['checkpoint_path'] = os.path.join(state_manager.get_item('jobs_path'), 'checkpoints', job_id + '-' + str(step_index) + '.json')
+		STEP_CHECKPOINT['step_key'] = create_step_key(step_args)
+		step_checkpoint = read_step_checkpoint(STEP_CHECKPOINT.get('checkpoint_path'))
+
+		if step_checkpoint and step_checkpoint.get('step_key') == STEP_CHECKPOINT.get('step_key'):
+			STEP_CHECKPOINT['stages'] = step_checkpoint.get('stages')
+			STEP_CHECKPOINT['frame_total'] = step_checkpoint.get('frame_total')
+			STEP_CHECKPOINT['frame_ranges'] = step_checkpoint.get('frame_ranges')
+		STEP_CHECKPOINT['write_time'] = monotonic()
+
+
+def create_step_key(step_args : Args) -> str:
+	input_stats = []
+
+	for input_path in (step_args.get('source_paths') or []) + [ step_args.get('target_path') ]:
+		if input_path and is_file(input_path):
+			input_stat = os.stat(input_path)
+			input_stats.append([ input_path, input_stat.st_size, input_stat.st_mtime_ns ])
+	step_content = json.dumps([ step_args, input_stats ], sort_keys = True, default = str)
+	return hashlib.sha1(step_content.encode()).hexdigest()
+
+
+def is_checkpoint_enabled() -> bool:
+	return STEP_CHECKPOINT.get('checkpoint_path') is not None
+
+
+def is_stage_completed(stage : str) -> bool:
+	return stage in STEP_CHECKPOINT.get('stages')
+
+
+def complete_stage(stage : str) -> None:
+	if is_checkpoint_enabled() and not is_stage_completed(stage):
+		STEP_CHECKPOINT.get('stages').append(stage)
+		write_step_checkpoint()
+
+
+def reset_step_checkpoint() -> None:
+	STEP_CHECKPOINT['stages'] = []
+	STEP_CHECKPOINT['frame_total'] = 0
+	STEP_CHECKPOINT['frame_ranges'] = {}
+
+
+def is_frames_resumable(target_path : str) -> bool:
+	return is_stage_completed('extract_frames') and len(get_pristine_frame_paths(target_path)) == STEP_CHECKPOINT.get('frame_total')
+
+
+def get_pristine_frames_path(target_path : str) -> str:
+	return os.path.join(get_temp_directory_path(target_path), 'pristine')
+
+
+def get_pristine_frame_paths(target_path : str) -> List[str]:
+	pristine_frames_path = get_pristine_frames_path(target_path)
+
+	if os.path.isdir(pristine_frames_path):
+		return [ os.path.join(pristine_frames_path, frame_name) for frame_name in sorted(os.listdir(pristine_frames_path)) ]
+	return []
+
+
+def store_pristine_frames(target_path : str, temp_frame_paths : List[str]) -> List[str]:
+	pristine_frames_path = get_pristine_frames_path(target_path)
+	os.makedirs(pristine_frames_path, exist_ok = True)
+
+	for temp_frame_path in temp_frame_paths:
+		os.replace(temp_frame_path, os.path.join(pristine_frames_path, os.path.basename(temp_frame_path)))
+	return get_pristine_frame_paths(target_path)
+
+
+def restore_pristine_frames(pristine_frame_paths : List[str], temp_frame_paths : List[str]) -> List[str]:
+	for pristine_frame_path, temp_frame_path in zip(pristine_frame_paths, temp_frame_paths):
+		shutil.copyfile(pristine_frame_path, temp_frame_path)
+	return temp_frame_paths
+
+
+def get_stage_frame_paths(target_path : str, pristine_frame_paths : List[str], stage_remaining : int) -> List[str]:
+	stage_frames_path = get_temp_directory_path(target_path)
+
+	if stage_remaining % 2:
+		stage_frames_path = os.path.join(stage_frames_path, 'stage')
+		os.makedirs(stage_frames_path, exist_ok = True)
+	return [ os.path.join(stage_frames_path, os.path.basename(pristine_frame_path)) for pristine_frame_path in pristine_frame_paths ]
+
+
+def set_frame_total(frame_total : int) -> None:
+	STEP_CHECKPOINT['frame_total'] = frame_total
+
+
+def is_frame_processed(stage : str, frame_number : int) -> bool:
+	return any(frame_start <= frame_number < frame_end for frame_start, frame_end in STEP_CHECKPOINT.get('frame_ranges').get(stage, []))
+
+
+def mark_frame_processed(stage : str, frame_number : int) -> None:
+	if is_checkpoint_enabled():
+		frame_ranges = STEP_CHECKPOINT.get('frame_ranges').setdefault(stage, [])
+
+		if frame_ranges and frame_ranges[-1][1] == frame_number:
+			frame_ranges[-1][1] = frame_number + 1
+		else:
+			frame_ranges.append([ frame_number, frame_number + 1 ])
+		if monotonic() - STEP_CHECKPOINT.get('write_time') >= state_manager.get_item('checkpoint_interval'):
+			write_step_checkpoint()
+
+
+def read_step_checkpoint(checkpoint_path : str) -> Optional[Dict[str, Any]]:
+	if is_file(checkpoint_path):
+		try:
+			with open(checkpoint_path) as checkpoint_file:
+				return json.load(checkpoint_file)
+		except ValueError:
+			return None
+	return None
+
+
+def write_step_checkpoint() -> bool:
+	checkpoint_path = STEP_CHECKPOINT.get('checkpoint_path')
+
+	if checkpoint_path:
+		checkpoint_temp_path = checkpoint_path + '.' + str(os.getpid())
+		step_checkpoint =\
+		{
+			'step_key': STEP_CHECKPOINT.get('step_key'),
+			'stages': STEP_CHECKPOINT.get('stages'),
+			'frame_total': STEP_CHECKPOINT.get('frame_total'),
+			'frame_ranges': STEP_CHECKPOINT.get('frame_ranges')
+		}
+		os.makedirs(os.path.dirname(checkpoint_path), exist_ok = True)
+		with open(checkpoint_temp_path, 'w') as checkpoint_file:
+			json.dump(step_checkpoint, checkpoint_file)
+		os.replace(checkpoint_temp_path, checkpoint_path)
+		STEP_CHECKPOINT['write_time'] = monotonic()
+		return True
+	return False
+
+
+def remove_step_checkpoint() -> None:
+	checkpoint_path = STEP_CHECKPOINT.get('checkpoint_path')
+
+	if checkpoint_path and is_file(checkpoint_path):
+		os.remove(checkpoint_path)
+	clear_step_checkpoint()
+
+
+def clear_step_checkpoint() -> None:
+	STEP_CHECKPOINT['checkpoint_path'] = None
+	STEP_CHECKPOINT['step_key'] = None
+	STEP_CHECKPOINT['write_time'] = 0.0
+	reset_step_checkpoint()
+
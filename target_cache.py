@@ -0,0 +1,238 @@
+import hashlib
+import os
+import shutil
+import zipfile
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+import numpy
+
+from facefusion import state_manager
+from facefusion.filesystem import is_directory, is_file, is_video
+from facefusion.job_backend import get_job_manager
+from facefusion.temp_helper import get_temp_directory_path
+from facefusion.typing import Args, Face
+
+TARGET_CACHE : Dict[str, Any] =\
+{
+	'job_id': None,
+	'step_index': -1,
+	'target_key': None,
+	'faces': OrderedDict(),
+	'faces_size': 0,
+	'is_dirty': False
+}
+
+
+def init_target_cache(job_id : str, step_index : int, step_args : Args) -> None:
+	TARGET_CACHE['job_id'] = job_id
+	TARGET_CACHE['step_index'] = step_index
+	TARGET_CACHE['target_key'] = None
+	TARGET_CACHE['faces'] = OrderedDict()
+	TARGET_CACHE['faces_size'] = 0
+	TARGET_CACHE['is_dirty'] = False
+
+	if state_manager.get_item('target_cache_limit') > 0:
+		TARGET_CACHE['target_key'] = create_target_key(step_args)
+		if TARGET_CACHE.get('target_key'):
+			for cache_key, faces in read_target_faces().items():
+				add_target_faces(cache_key, faces)
+
+
+def create_target_key(step_args : Args) -> Optional[str]:
+	target_path = step_args.get('target_path')
+
+	if target_path and is_video(target_path):
+		target_stat = os.stat(target_path)
+		target_keys =\
+		[
+			os.path.realpath(target_path),
+			target_stat.st_size,
+			target_stat.st_mtime_ns,
+			step_args.get('output_video_resolution'),
+			step_args.get('output_video_fps'),
+			step_args.get('trim_frame_start'),
+			step_args.get('trim_frame_end'),
+			step_args.get('temp_frame_format')
+		]
+		return hashlib.sha1('.'.join(map(str, target_keys)).encode()).hexdigest()
+	return None
+
+
+def get_target_cache_path() -> str:
+	return os.path.join(state_manager.get_item('jobs_path'), 'targets')
+
+
+def get_target_frames_path() -> str:
+	return os.path.join(get_target_cache_path(), TARGET_CACHE.get('target_key'), 'frames')
+
+
+def get_target_faces_path() -> str:
+	return os.path.join(get_target_cache_path(), TARGET_CACHE.get('target_key'), 'faces.npz')
+
+
+def is_target_shared() -> bool:
+	job_id = TARGET_CACHE.get('job_id')
+	target_key = TARGET_CACHE.get('target_key')
+
+	if job_id and target_key:
+		for step_index, step in enumerate(get_job_manager().get_steps(job_id)):
+			if step_index != TARGET_CACHE.get('step_index') and step.get('status') not in [ 'completed', 'failed' ] and create_target_key(step.get('args')) == target_key:
+				return True
+	return False
+
+
+def restore_target_frames(target_path : str) -> bool:
+	if TARGET_CACHE.get('target_key') and is_directory(get_target_frames_path()):
+		target_frames_path = get_target_frames_path()
+		temp_directory_path = get_temp_directory_path(target_path)
+
+		for frame_name in os.listdir(target_frames_path):
+			shutil.copyfile(os.path.join(target_frames_path, frame_name), os.path.join(temp_directory_path, frame_name))
+		os.utime(os.path.dirname(target_frames_path))
+		return True
+	return False
+
+
+def store_target_frames(target_frame_paths : List[str]) -> bool:
+	target_cache_limit = state_manager.get_item('target_cache_limit') * 1024 * 1024
+
+	if is_target_shared() and not is_directory(get_target_frames_path()) and sum(map(os.path.getsize, target_frame_paths)) <= target_cache_limit:
+		target_frames_path = get_target_frames_path()
+		target_frames_temp_path = target_frames_path + '.' + str(os.getpid())
+		os.makedirs(target_frames_temp_path, exist_ok = True)
+
+		for target_frame_path in target_frame_paths:
+			shutil.copyfile(target_frame_path, os.path.join(target_frames_temp_path, os.path.basename(target_frame_path)))
+		try:
+			os.replace(target_frames_temp_path, target_frames_path)
+		except OSError:
+			shutil.rmtree(target_frames_temp_path, ignore_errors = True)
+		evict_target_caches()
+		return True
+	return False
+
+
+def get_target_faces(cache_key : str) -> Optional[List[Face]]:
+	if cache_key in TARGET_CACHE.get('faces'):
+		TARGET_CACHE.get('faces').move_to_end(cache_key)
+	return TARGET_CACHE.get('faces').get(cache_key)
+
+
+def set_target_faces(cache_key : str, faces : List[Face]) -> None:
+	if TARGET_CACHE.get('target_key') and cache_key not in TARGET_CACHE.get('faces'):
+		TARGET_CACHE['is_dirty'] = True
+		add_target_faces(cache_key, faces)
+
+
+def add_target_faces(cache_key : str, faces : List[Face]) -> None:
+	from facefusion.face_store import calc_face_size
+
+	target_faces_limit = state_manager.get_item('face_cache_memory_limit') * 1024 * 1024
+	TARGET_CACHE.get('faces')[cache_key] = faces
+	TARGET_CACHE['faces_size'] += len(cache_key) + sum(calc_face_size(face) for face in faces)
+
+	if TARGET_CACHE.get('faces_size') > target_faces_limit:
+		if TARGET_CACHE.get('is_dirty') and is_target_shared():
+			write_target_faces()
+		TARGET_CACHE['is_dirty'] = False
+		while TARGET_CACHE.get('faces') and TARGET_CACHE.get('faces_size') > target_faces_limit / 2:
+			evict_target_faces()
+
+
+def evict_target_faces() -> None:
+	from facefusion.face_store import calc_face_size
+
+	cache_key, faces = TARGET_CACHE.get('faces').popitem(last = False)
+	TARGET_CACHE['faces_size'] -= len(cache_key) + sum(calc_face_size(face) for face in faces)
+
+
+def read_target_faces() -> Dict[str, List[Face]]:
+	target_faces_path = get_target_faces_path()
+
+	if is_file(target_faces_path):
+		try:
+			with numpy.load(target_faces_path, allow_pickle = False) as target_face_arrays:
+				return unpack_target_faces(dict(target_face_arrays))
+		except (OSError, ValueError, TypeError, KeyError, IndexError, zipfile.BadZipFile):
+			return {}
+	return {}
+
+
+def write_target_faces() -> bool:
+	target_faces_path = get_target_faces_path()
+	target_faces = read_target_faces()
+	target_faces.update(TARGET_CACHE.get('faces'))
+	target_faces_temp_path = target_faces_path + '.' + str(os.getpid())
+
+	os.makedirs(os.path.dirname(target_faces_path), exist_ok = True)
+	with open(target_faces_temp_path, 'wb') as target_faces_file:
+		numpy.savez(target_faces_file, **pack_target_faces(target_faces))
+	os.replace(target_faces_temp_path, target_faces_path)
+	return True
+
+
+def pack_target_faces(target_faces : Dict[str, List[Face]]) -> Dict[str, numpy.ndarray]:
+	from facefusion.source_face_store import pack_source_faces
+
+	target_face_arrays = { 'cache_keys': numpy.array(list(target_faces), dtype = str) }
+
+	for key_index, faces in enumerate(target_faces.values()):
+		for array_key, array_value in pack_source_faces(faces).items():
+			target_face_arrays[str(key_index) + '/' + array_key] = array_value
+	return target_face_arrays
+
+
+def unpack_target_faces(target_face_arrays : Dict[str, numpy.ndarray]) -> Dict[str, List[Face]]:
+	from facefusion.source_face_store import unpack_source_faces
+
+	cache_keys = target_face_arrays.get('cache_keys').tolist()
+	face_arrays : Dict[str, Dict[str, numpy.ndarray]] = { cache_key: {} for cache_key in cache_keys }
+
+	for array_key, array_value in target_face_arrays.items():
+		if array_key != 'cache_keys':
+			key_index, face_array_key = array_key.split('/', 1)
+			face_arrays.get(cache_keys[int(key_index)])[face_array_key] = array_value
+	return { cache_key: unpack_source_faces(face_arrays.get(cache_key)) for cache_key in cache_keys }
+
+
+def release_target_cache() -> None:
+	if TARGET_CACHE.get('target_key'):
+		if is_target_shared():
+			if TARGET_CACHE.get('is_dirty'):
+				write_target_faces()
+		else:
+			shutil.rmtree(os.path.join(get_target_cache_path(), TARGET_CACHE.get('target_key')), ignore_errors = True)
+	TARGET_CACHE['target_key'] = None
+	TARGET_CACHE['faces'] = OrderedDict()
+	TARGET_CACHE['faces_size'] = 0
+	TARGET_CACHE['is_dirty'] = False
+
+
+def evict_target_caches() -> None:
+	target_cache_path = get_target_cache_path()
+	target_cache_limit = state_manager.get_item('target_cache_limit') * 1024 * 1024
+	target_cache_stats = []
+
+	for target_key in os.listdir(target_cache_path):
+		if target_key != TARGET_CACHE.get('target_key'):
+			target_cache_stats.append((target_key, os.path.getmtime(os.path.join(target_cache_path, target_key)), calc_directory_size(os.path.join(target_cache_path, target_key))))
+	target_cache_stats.sort(key = lambda target_cache_stat: target_cache_stat[1])
+	target_cache_size = calc_directory_size(target_cache_path)
+
+	while target_cache_stats and target_cache_size > target_cache_limit:
+		target_key, _, target_size = target_cache_stats.pop(0)
+		target_cache_size -= target_size
+		shutil.rmtree(os.path.join(target_cache_path, target_key), ignore_errors = True)
+
+
+def calc_directory_size(directory_path : str) -> int:
+	directory_size = 0
+
+	for root_path, _, file_names in os.walk(directory_path):
+		for file_name in file_names:
+			try:
+				directory_size += os.path.getsize(os.path.join(root_path, file_name))
+			except FileNotFoundError:
+				continue
+	return directory_size
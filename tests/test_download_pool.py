@@ -0,0 +1,150 @@
+import os
+import tempfile
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional
+
+import pytest
+
+from facefusion import state_manager
+from facefusion.download_pool import download_hashes_and_sources
+from facefusion.typing import DownloadSet
+
+DOWNLOAD_FILES : Dict[str, bytes] =\
+{
+	'/model-1.onnx': os.urandom(4096),
+	'/model-2.onnx': os.urandom(8192),
+	'/model-3.onnx': os.urandom(2048)
+}
+DOWNLOAD_REQUESTS : List[Dict[str, Optional[str]]] = []
+DOWNLOAD_SERVER : Dict[str, str] =\
+{
+	'range_mode': 'partial'
+}
+
+
+class DownloadRequestHandler(BaseHTTPRequestHandler):
+	def do_GET(self) -> None:
+		range_header = self.headers.get('Range')
+		DOWNLOAD_REQUESTS.append(
+		{
+			'path': self.path,
+			'range': range_header
+		})
+
+		if self.path.endswith('.hash'):
+			return self.send_content(200, format(zlib.crc32(DOWNLOAD_FILES.get(self.path[:-5] + '.onnx')), '08x').encode())
+		content = DOWNLOAD_FILES.get(self.path)
+
+		if range_header and DOWNLOAD_SERVER.get('range_mode') == 'unsatisfiable':
+			return self.send_content(416, b'')
+		if range_header and DOWNLOAD_SERVER.get('range_mode') == 'partial':
+			return self.send_content(206, content[int(range_header[6:-1]):])
+		return self.send_content(200, content)
+
+	def send_content(self, status : int, content : bytes) -> None:
+		self.send_response(status)
+		self.send_header('Content-Length', str(len(content)))
+		self.end_headers()
+		self.wfile.write(content)
+
+	def log_message(self, *args : str) -> None:
+		pass
+
+
+@pytest.fixture(scope = 'module')
+def download_url() -> Iterator[str]:
+	download_server = ThreadingHTTPServer(('127.0.0.1', 0), DownloadRequestHandler)
+	threading.Thread(target = download_server.serve_forever, daemon = True).start()
+	yield 'http://127.0.0.1:' + str(download_server.server_address[1])
+	download_server.shutdown()
+	download_server.server_close()
+
+
+@pytest.fixture(scope = 'function')
+def download_path() -> str:
+	state_manager.init_item('download_concurrency', 4)
+	state_manager.init_item('log_level', 'error')
+	DOWNLOAD_SERVER['range_mode'] = 'partial'
+	DOWNLOAD_REQUESTS.clear()
+	return tempfile.mkdtemp()
+
+
+def create_download_sets(download_url : str, download_path : str, model_names : List[str]) -> List[List[DownloadSet]]:
+	download_hash_set : DownloadSet = {}
+	download_source_set : DownloadSet = {}
+
+	for model_name in model_names:
+		download_hash_set[model_name] =\
+		{
+			'url': download_url + '/' + model_name + '.hash',
+			'path': os.path.join(download_path, model_name + '.hash')
+		}
+		download_source_set[model_name] =\
+		{
+			'url': download_url + '/' + model_name + '.onnx',
+			'path': os.path.join(download_path, model_name + '.onnx')
+		}
+	return [ [ download_hash_set ], [ download_source_set ] ]
+
+
+def write_partial_file(file_path : str, content : bytes) -> None:
+	with open(file_path, 'wb') as output_file:
+		output_file.write(content)
+
+
+def read_file(file_path : str) -> bytes:
+	with open(file_path, 'rb') as input_file:
+		return input_file.read()
+
+
+def get_source_requests() -> List[Dict[str, Optional[str]]]:
+	return [ download_request for download_request in DOWNLOAD_REQUESTS if download_request.get('path').endswith('.onnx') ]
+
+
+def test_download_concurrent(download_url : str, download_path : str) -> None:
+	download_hash_sets, download_source_sets = create_download_sets(download_url, download_path, [ 'model-1', 'model-2', 'model-3' ])
+
+	assert download_hashes_and_sources(download_hash_sets, download_source_sets) is True
+	for model_path, model_content in DOWNLOAD_FILES.items():
+		assert read_file(os.path.join(download_path, model_path[1:])) == model_content
+	assert len(get_source_requests()) == 3
+
+
+def test_download_resume_partial(download_url : str, download_path : str) -> None:
+	download_hash_sets, download_source_sets = create_download_sets(download_url, download_path, [ 'model-2' ])
+	write_partial_file(os.path.join(download_path, 'model-2.onnx'), DOWNLOAD_FILES.get('/model-2.onnx')[:1000])
+
+	assert download_hashes_and_sources(download_hash_sets, download_source_sets) is True
+	assert read_file(os.path.join(download_path, 'model-2.onnx')) == DOWNLOAD_FILES.get('/model-2.onnx')
+	assert get_source_requests() == [ { 'path': '/model-2.onnx', 'range': 'bytes=1000-' } ]
+
+
+def test_download_resume_ignored(download_url : str, download_path : str) -> None:
+	download_hash_sets, download_source_sets = create_download_sets(download_url, download_path, [ 'model-2' ])
+	write_partial_file(os.path.join(download_path, 'model-2.onnx'), DOWNLOAD_FILES.get('/model-2.onnx')[:1000])
+	DOWNLOAD_SERVER['range_mode'] = 'ignored'
+
+	assert download_hashes_and_sources(download_hash_sets, download_source_sets) is True
+	assert read_file(os.path.join(download_path, 'model-2.onnx')) == DOWNLOAD_FILES.get('/model-2.onnx')
+	assert len(get_source_requests()) == 1
+
+
+def test_download_resume_unsatisfiable(download_url : str, download_path : str) -> None:
+	download_hash_sets, download_source_sets = create_download_sets(download_url, download_path, [ 'model-2' ])
+	write_partial_file(os.path.join(download_path, 'model-2.onnx'), DOWNLOAD_FILES.get('/model-2.onnx')[:1000])
+	DOWNLOAD_SERVER['range_mode'] = 'unsatisfiable'
+
+	assert download_hashes_and_sources(download_hash_sets, download_source_sets) is True
+	assert read_file(os.path.join(download_path, 'model-2.onnx')) == DOWNLOAD_FILES.get('/model-2.onnx')
+	assert get_source_requests() == [ { 'path': '/model-2.onnx', 'range': 'bytes=1000-' }, { 'path': '/model-2.onnx', 'range': None } ]
+
+
+def test_download_resume_corrupted(download_url : str, download_path : str) -> None:
+	download_hash_sets, download_source_sets = create_download_sets(download_url, download_path, [ 'model-2' ])
+	write_partial_file(os.path.join(download_path, 'model-2.onnx'), bytes(1000))
+
+	assert download_hashes_and_sources(download_hash_sets, download_source_sets) is True
+	assert read_file(os.path.join(download_path, 'model-2.onnx')) == DOWNLOAD_FILES.get('/model-2.onnx')
+	assert get_source_requests() == [ { 'path': '/model-2.onnx', 'range': 'bytes=1000-' }, { 'path': '/model-2.onnx', 'range': None } ]
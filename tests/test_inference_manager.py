@@ -0,0 +1,55 @@
+import os
+import tempfile
+
+import pytest
+
+from facefusion import inference_manager, state_manager
+from facefusion.inference_registry import clear_inference_registry, get_inference_registry_statistics
+from facefusion.typing import DownloadSet
+
+
+@pytest.fixture(scope = 'function')
+def model_sources(monkeypatch : pytest.MonkeyPatch) -> DownloadSet:
+	model_path = os.path.join(tempfile.mkdtemp(), 'model.onnx')
+
+	with open(model_path, 'wb') as model_file:
+		model_file.write(b'model')
+	monkeypatch.setattr(inference_manager, 'InferenceSession', lambda model_path, providers: object())
+	state_manager.init_item('execution_device_id', '0')
+	state_manager.init_item('execution_providers', [ 'cpu' ])
+	state_manager.init_item('model_precision', 'fp32')
+	state_manager.init_item('video_memory_strategy', 'strict')
+	state_manager.init_item('inference_memory_budget', 1024)
+	clear_inference_registry()
+	return\
+	{
+		'model':
+		{
+			'url': 'https://example.com/model.onnx',
+			'path': model_path
+		}
+	}
+
+
+def test_get_inference_pool(model_sources : DownloadSet) -> None:
+	inference_pool = inference_manager.get_inference_pool('test.model', model_sources)
+	registry_statistics = get_inference_registry_statistics()
+
+	assert inference_manager.get_inference_pool('test.model', model_sources) is inference_pool
+	assert get_inference_registry_statistics().get('hits') == registry_statistics.get('hits')
+
+
+def test_clear_inference_pool(model_sources : DownloadSet) -> None:
+	inference_session = inference_manager.get_inference_pool('test.model', model_sources).get('model')
+	registry_statistics = get_inference_registry_statistics()
+	inference_manager.clear_inference_pool('test.model')
+
+	assert inference_manager.get_inference_pool('test.model', model_sources).get('model') is inference_session
+	assert get_inference_registry_statistics().get('loads') == registry_statistics.get('loads')
+
+
+def test_get_inference_pool_after_eviction(model_sources : DownloadSet) -> None:
+	inference_session = inference_manager.get_inference_pool('test.model', model_sources).get('model')
+	clear_inference_registry()
+
+	assert inference_manager.get_inference_pool('test.model', model_sources).get('model') is not inference_session
@@ -0,0 +1,107 @@
+import multiprocessing
+import subprocess
+import sys
+
+import pytest
+
+from facefusion import job_database
+from facefusion.download import conditional_download
+from facefusion.jobs import job_manager
+from facefusion.typing import Args
+from .helper import get_test_example_file, get_test_examples_directory, get_test_jobs_directory, get_test_output_file, is_test_output_file, prepare_test_output_directory
+
+
+@pytest.fixture(scope = 'module', autouse = True)
+def before_all() -> None:
+	conditional_download(get_test_examples_directory(),
+	[
+		'https://github.com/facefusion/facefusion-assets/releases/download/examples-3.0.0/source.jpg',
+		'https://github.com/facefusion/facefusion-assets/releases/download/examples-3.0.0/target-240p.mp4'
+	])
+	subprocess.run([ 'ffmpeg', '-i', get_test_example_file('target-240p.mp4'), '-vframes', '1', get_test_example_file('target-240p.jpg') ])
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	job_database.clear_jobs(get_test_jobs_directory())
+	job_manager.clear_jobs(get_test_jobs_directory())
+	prepare_test_output_directory()
+
+
+def create_step_args(output_name : str) -> Args:
+	return\
+	{
+		'processors': [ 'face_debugger' ],
+		'source_paths': [ get_test_example_file('source.jpg') ],
+		'target_path': get_test_example_file('target-240p.jpg'),
+		'output_path': get_test_output_file(output_name)
+	}
+
+
+def test_migrate_jobs() -> None:
+	job_manager.init_jobs(get_test_jobs_directory())
+	job_manager.create_job('test-migrate-drafted')
+	job_manager.add_step('test-migrate-drafted', create_step_args('test-migrate-drafted.jpg'))
+	job_manager.create_job('test-migrate-queued')
+	job_manager.add_step('test-migrate-queued', create_step_args('test-migrate-queued-1.jpg'))
+	job_manager.add_step('test-migrate-queued', create_step_args('test-migrate-queued-2.jpg'))
+	job_manager.submit_job('test-migrate-queued')
+	job_manager.set_step_status('test-migrate-queued', 0, 'completed')
+
+	assert job_database.init_jobs(get_test_jobs_directory()) is True
+	assert job_database.find_job_ids('drafted') == [ 'test-migrate-drafted' ]
+	assert job_database.find_job_ids('queued') == [ 'test-migrate-queued' ]
+	assert job_database.get_steps('test-migrate-queued') == job_manager.get_steps('test-migrate-queued')
+	assert [ step.get('status') for step in job_database.get_steps('test-migrate-queued') ] == [ 'completed', 'queued' ]
+
+	job_database.close_connection()
+	job_database.init_jobs(get_test_jobs_directory())
+
+	assert job_database.count_step_total('test-migrate-queued') == 2
+
+
+def test_job_commands() -> None:
+	jobs_arguments = [ '--jobs-path', get_test_jobs_directory(), '--job-backend', 'sqlite' ]
+	step_arguments = [ '--processors', 'face_debugger', '-s', get_test_example_file('source.jpg'), '-t', get_test_example_file('target-240p.jpg'), '-o', get_test_output_file('test-job-commands.jpg') ]
+
+	assert subprocess.run([ sys.executable, 'facefusion.py', 'job-create', 'test-job-commands' ] + jobs_arguments).returncode == 0
+	assert subprocess.run([ sys.executable, 'facefusion.py', 'job-add-step', 'test-job-commands' ] + step_arguments + jobs_arguments).returncode == 0
+	assert subprocess.run([ sys.executable, 'facefusion.py', 'job-list', 'drafted' ] + jobs_arguments).returncode == 0
+	assert subprocess.run([ sys.executable, 'facefusion.py', 'job-submit', 'test-job-commands' ] + jobs_arguments).returncode == 0
+	assert subprocess.run([ sys.executable, 'facefusion.py', 'job-list', 'queued' ] + jobs_arguments).returncode == 0
+	assert subprocess.run([ sys.executable, 'facefusion.py', 'job-run', 'test-job-commands' ] + jobs_arguments).returncode == 0
+	assert is_test_output_file('test-job-commands.jpg') is True
+
+	job_database.init_jobs(get_test_jobs_directory())
+
+	assert job_database.find_job_status('test-job-commands') == 'completed'
+	assert subprocess.run([ sys.executable, 'facefusion.py', 'job-delete', 'test-job-commands' ] + jobs_arguments).returncode == 0
+	assert job_database.find_job_status('test-job-commands') is None
+
+
+def add_concurrent_step(step_number : int) -> bool:
+	job_database.JOB_DATABASE['connection'] = None
+	return job_database.add_step('test-concurrent-steps', create_step_args('test-concurrent-steps-' + str(step_number) + '.jpg'))
+
+
+def complete_concurrent_step(step_index : int) -> bool:
+	job_database.JOB_DATABASE['connection'] = None
+	return job_database.set_step_status('test-concurrent-steps', step_index, 'completed')
+
+
+def test_concurrent_step_updates() -> None:
+	job_database.init_jobs(get_test_jobs_directory())
+	job_database.create_job('test-concurrent-steps')
+
+	with multiprocessing.get_context('fork').Pool(8) as worker_pool:
+		assert all(worker_pool.map(add_concurrent_step, range(32)))
+
+	output_paths = [ step.get('args').get('output_path') for step in job_database.get_steps('test-concurrent-steps') ]
+
+	assert len(output_paths) == 32
+	assert sorted(output_paths) == sorted(get_test_output_file('test-concurrent-steps-' + str(step_number) + '.jpg') for step_number in range(32))
+
+	with multiprocessing.get_context('fork').Pool(8) as worker_pool:
+		assert all(worker_pool.map(complete_concurrent_step, range(32)))
+
+	assert [ step.get('status') for step in job_database.get_steps('test-concurrent-steps') ] == [ 'completed' ] * 32
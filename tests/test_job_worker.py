@@ -0,0 +1,81 @@
+import json
+import multiprocessing
+import threading
+from time import time
+from typing import List
+
+import pytest
+
+from facefusion import process_manager, state_manager
+from facefusion.job_worker import JOB_WORKER, beat_heartbeat, claim_job_lease, get_lease_path, is_job_leased
+from facefusion.jobs.job_manager import add_step, clear_jobs, create_job, get_steps, init_jobs, set_step_status, submit_job
+from .helper import get_test_example_file, get_test_jobs_directory, get_test_output_file
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	state_manager.init_item('jobs_path', get_test_jobs_directory())
+	state_manager.init_item('job_lease_duration', 4)
+	clear_jobs(get_test_jobs_directory())
+	init_jobs(get_test_jobs_directory())
+	create_job('job-test-lease')
+
+	for step_index in range(2):
+		add_step('job-test-lease',
+		{
+			'source_paths': [ get_test_example_file('source.jpg') ],
+			'target_path': get_test_example_file('target-240p.jpg'),
+			'output_path': get_test_output_file('test-job-worker-' + str(step_index) + '.jpg')
+		})
+	submit_job('job-test-lease')
+
+
+def claim_worker_lease(worker_id : str) -> bool:
+	JOB_WORKER['worker_id'] = worker_id
+	return claim_job_lease('job-test-lease')
+
+
+def run_claim_workers(worker_count : int) -> List[bool]:
+	with multiprocessing.get_context('fork').Pool(worker_count) as worker_pool:
+		return worker_pool.map(claim_worker_lease, [ 'worker-' + str(worker_index) for worker_index in range(worker_count) ])
+
+
+def write_job_lease(worker_id : str, expires_at : float) -> None:
+	with open(get_lease_path('job-test-lease'), 'w') as lease_file:
+		json.dump(
+		{
+			'job_id': 'job-test-lease',
+			'worker_id': worker_id,
+			'expires_at': expires_at
+		}, lease_file)
+
+
+def test_claim_job_lease() -> None:
+	assert run_claim_workers(8).count(True) == 1
+
+
+def test_claim_unexpired_job_lease() -> None:
+	write_job_lease('worker-alive', time() + 10)
+
+	assert run_claim_workers(8).count(True) == 0
+
+
+def test_reclaim_expired_job_lease() -> None:
+	set_step_status('job-test-lease', 0, 'completed')
+	set_step_status('job-test-lease', 1, 'started')
+	write_job_lease('worker-lost', time() - 1)
+
+	assert run_claim_workers(8).count(True) == 1
+	assert [ step.get('status') for step in get_steps('job-test-lease') ] == [ 'completed', 'queued' ]
+
+
+def test_stop_job_on_lost_job_lease() -> None:
+	assert claim_worker_lease('worker-0') is True
+
+	write_job_lease('worker-1', time() + 10)
+	beat_heartbeat(get_lease_path('job-test-lease'), threading.Event())
+
+	assert is_job_leased() is False
+	assert process_manager.is_stopping() is True
+
+	process_manager.end()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+from typing import List
+
+import pytest
+
+from facefusion import inference_manager, model_variant, state_manager
+from facefusion.model_variant import get_model_variant_path
+
+
+@pytest.fixture(scope = 'function')
+def model_path() -> str:
+	model_path = os.path.join(tempfile.mkdtemp(), 'model.onnx')
+
+	with open(model_path, 'wb') as model_file:
+		model_file.write(b'model')
+	return model_path
+
+
+@pytest.fixture(scope = 'function')
+def session_paths(monkeypatch : pytest.MonkeyPatch) -> List[str]:
+	session_paths = []
+	monkeypatch.setattr(inference_manager, 'InferenceSession', lambda model_path, providers: session_paths.append(model_path))
+	return session_paths
+
+
+def test_create_inference_session_with_variant(model_path : str, session_paths : List[str]) -> None:
+	state_manager.init_item('model_precision', 'int8')
+	variant_path = get_model_variant_path(model_path, 'int8')
+	os.makedirs(os.path.dirname(variant_path), exist_ok = True)
+
+	with open(variant_path, 'wb') as variant_file:
+		variant_file.write(b'variant')
+	inference_manager.create_inference_session(model_path, '0', [ 'cpu' ])
+
+	assert session_paths == [ variant_path ]
+
+
+def test_create_inference_session_without_variant(model_path : str, session_paths : List[str]) -> None:
+	state_manager.init_item('model_precision', 'fp32')
+	inference_manager.create_inference_session(model_path, '0', [ 'cpu' ])
+	state_manager.init_item('model_precision', 'int8')
+	inference_manager.create_inference_session(model_path, '0', [ 'cuda' ])
+	inference_manager.create_inference_session(model_path, '0', [ 'cuda', 'cpu' ])
+
+	assert session_paths == [ model_path, model_path, model_path ]
+
+
+def test_create_inference_session_with_failed_variant(model_path : str, session_paths : List[str], monkeypatch : pytest.MonkeyPatch) -> None:
+	def quantize_model(model_path : str, variant_path : str) -> None:
+		raise RuntimeError
+
+	monkeypatch.setattr(model_variant, 'quantize_model', quantize_model)
+	state_manager.init_item('model_precision', 'int8')
+	inference_manager.create_inference_session(model_path, '0', [ 'cpu' ])
+
+	assert session_paths == [ model_path ]
+	assert not os.path.exists(get_model_variant_path(model_path, 'int8'))
+
+
+def test_get_model_variant_path(model_path : str) -> None:
+	get_model_variant_path(model_path, 'int8')
+
+	assert not os.path.exists(os.path.join(os.path.dirname(model_path), 'variants'))
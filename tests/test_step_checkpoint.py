@@ -0,0 +1,120 @@
+import os
+import shutil
+import tempfile
+from types import ModuleType
+from typing import List
+
+import cv2
+import numpy
+import pytest
+
+from facefusion import process_manager, state_manager
+from facefusion.frame_pipeline import process_frames
+from facefusion.step_checkpoint import clear_step_checkpoint, complete_stage, init_step_checkpoint, is_frame_processed, is_frames_resumable, is_stage_completed, set_frame_total, store_pristine_frames, write_step_checkpoint
+from facefusion.temp_helper import create_temp_directory, get_temp_directory_path
+from facefusion.typing import Args, VisionFrame
+from .helper import get_test_jobs_directory
+
+
+@pytest.fixture(scope = 'function', autouse = True)
+def before_each() -> None:
+	state_manager.init_item('jobs_path', get_test_jobs_directory())
+	state_manager.init_item('temp_path', tempfile.mkdtemp())
+	state_manager.init_item('checkpoint_interval', 1)
+	state_manager.init_item('execution_thread_count', 1)
+	state_manager.init_item('face_tracker_interval', 1)
+	state_manager.init_item('log_level', 'error')
+	shutil.rmtree(os.path.join(get_test_jobs_directory(), 'checkpoints'), ignore_errors = True)
+	clear_step_checkpoint()
+
+
+@pytest.fixture(scope = 'function')
+def step_args() -> Args:
+	target_path = os.path.join(tempfile.mkdtemp(), 'target.mp4')
+
+	with open(target_path, 'wb') as target_file:
+		target_file.write(b'target')
+	return\
+	{
+		'processors': [ 'face_swapper' ],
+		'target_path': target_path,
+		'output_path': os.path.join(tempfile.mkdtemp(), 'output.mp4')
+	}
+
+
+def extract_test_frames(target_path : str, frame_total : int) -> None:
+	create_temp_directory(target_path)
+	temp_frame_paths = []
+
+	for frame_number in range(frame_total):
+		temp_frame_path = os.path.join(get_temp_directory_path(target_path), str(frame_number).zfill(8) + '.png')
+		cv2.imwrite(temp_frame_path, numpy.zeros((8, 8, 3), dtype = numpy.uint8))
+		temp_frame_paths.append(temp_frame_path)
+	store_pristine_frames(target_path, temp_frame_paths)
+	set_frame_total(frame_total)
+	complete_stage('extract_frames')
+
+
+def create_test_processor(frame_numbers : List[int], stop_frame_number : int) -> ModuleType:
+	processor_module = ModuleType('facefusion.processors.modules.test_processor')
+
+	def process_frame(inputs : Args) -> VisionFrame:
+		frame_numbers.append(int(inputs.get('target_vision_frame')[0][0][0]))
+		if len(frame_numbers) == stop_frame_number:
+			process_manager.stop()
+		return inputs.get('target_vision_frame')
+
+	processor_module.process_frame = process_frame
+	return processor_module
+
+
+def run_test_processor(processor_module : ModuleType, frame_total : int) -> bool:
+	process_manager.start()
+	try:
+		return process_frames([ processor_module ], {}, 'process_frames', frame_total, lambda frame_number: numpy.full((8, 8, 3), frame_number, dtype = numpy.uint8), lambda frame_number, vision_frame: True)
+	finally:
+		process_manager.end()
+
+
+def test_resume_step_checkpoint(step_args : Args) -> None:
+	interrupted_frame_numbers : List[int] = []
+	resumed_frame_numbers : List[int] = []
+
+	init_step_checkpoint('test-step-checkpoint', 0, step_args)
+	extract_test_frames(step_args.get('target_path'), 16)
+
+	assert run_test_processor(create_test_processor(interrupted_frame_numbers, 4), 16) is False
+
+	write_step_checkpoint()
+	clear_step_checkpoint()
+	init_step_checkpoint('test-step-checkpoint', 0, step_args)
+
+	assert is_frames_resumable(step_args.get('target_path')) is True
+	assert all(is_frame_processed('process_frames', frame_number) for frame_number in interrupted_frame_numbers)
+	assert run_test_processor(create_test_processor(resumed_frame_numbers, 0), 16) is True
+	assert set(interrupted_frame_numbers).isdisjoint(resumed_frame_numbers)
+	assert sorted(interrupted_frame_numbers + resumed_frame_numbers) == list(range(16))
+
+
+def test_ignore_step_checkpoint_on_changed_input(step_args : Args) -> None:
+	init_step_checkpoint('test-step-checkpoint', 0, step_args)
+	extract_test_frames(step_args.get('target_path'), 4)
+	clear_step_checkpoint()
+
+	with open(step_args.get('target_path'), 'ab') as target_file:
+		target_file.write(b'changed')
+	init_step_checkpoint('test-step-checkpoint', 0, step_args)
+
+	assert is_stage_completed('extract_frames') is False
+	assert is_frames_resumable(step_args.get('target_path')) is False
+
+
+def test_ignore_step_checkpoint_on_changed_args(step_args : Args) -> None:
+	init_step_checkpoint('test-step-checkpoint', 0, step_args)
+	extract_test_frames(step_args.get('target_path'), 4)
+	clear_step_checkpoint()
+	step_args['processors'] = [ 'face_enhancer' ]
+	init_step_checkpoint('test-step-checkpoint', 0, step_args)
+
+	assert is_stage_completed('extract_frames') is False
+	assert is_frames_resumable(step_args.get('target_path')) is False
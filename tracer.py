@@ -0,0 +1,133 @@
+import json
+import os
+import threading
+from time import perf_counter
+from typing import Any, Dict, List, Optional
+
+from facefusion import state_manager
+
+TRACER : Dict[str, Any] =\
+{
+	'enabled': False,
+	'origin': 0.0,
+	'spans': [],
+	'metrics': {},
+	'stage_span': None
+}
+TRACER_LOCK : threading.Lock = threading.Lock()
+TRACE_SPAN_LIMIT = 100000
+
+
+def init_tracer(enabled : bool) -> None:
+	TRACER['enabled'] = enabled
+	clear_tracer()
+
+
+def is_tracer_enabled() -> bool:
+	return TRACER.get('enabled')
+
+
+def open_span(span_name : str, span_category : str = 'stage', frame_total : int = 0) -> Optional[Dict[str, Any]]:
+	if TRACER.get('enabled'):
+		return\
+		{
+			'name': span_name,
+			'category': span_category,
+			'start': perf_counter(),
+			'end': None,
+			'frame_total': frame_total,
+			'thread_id': threading.get_ident()
+		}
+	return None
+
+
+def close_span(span : Optional[Dict[str, Any]]) -> None:
+	if span:
+		span['end'] = perf_counter()
+		metric_key = (span.get('category'), span.get('name'))
+
+		with TRACER_LOCK:
+			metric = TRACER.get('metrics').setdefault(metric_key, [ 0, 0.0, 0 ])
+			metric[0] += 1
+			metric[1] += span.get('end') - span.get('start')
+			metric[2] += span.get('frame_total')
+			if span.get('category') == 'stage' or len(TRACER.get('spans')) < TRACE_SPAN_LIMIT:
+				TRACER.get('spans').append(span)
+
+
+def trace_stage(stage_name : Optional[str], frame_total : int = 0) -> None:
+	if TRACER.get('enabled'):
+		close_span(TRACER.get('stage_span'))
+		TRACER['stage_span'] = open_span(stage_name, 'stage', frame_total) if stage_name else None
+
+
+def get_spans(span_category : str) -> List[Dict[str, Any]]:
+	return [ span for span in TRACER.get('spans') if span.get('category') == span_category ]
+
+
+def conditional_export_trace() -> None:
+	if TRACER.get('enabled'):
+		if state_manager.get_item('trace_path'):
+			export_chrome_trace(state_manager.get_item('trace_path'))
+		if state_manager.get_item('metrics_path'):
+			export_prometheus_metrics(state_manager.get_item('metrics_path'))
+
+
+def export_chrome_trace(trace_path : str) -> bool:
+	trace_events = []
+
+	with TRACER_LOCK:
+		spans = list(TRACER.get('spans'))
+	for span in spans:
+		trace_events.append(
+		{
+			'name': span.get('name'),
+			'cat': span.get('category'),
+			'ph': 'X',
+			'ts': round((span.get('start') - TRACER.get('origin')) * 1000000),
+			'dur': round((span.get('end') - span.get('start')) * 1000000),
+			'pid': os.getpid(),
+			'tid': span.get('thread_id'),
+			'args':
+			{
+				'frame_total': span.get('frame_total')
+			}
+		})
+	return write_trace_file(trace_path, json.dumps({ 'traceEvents': trace_events, 'displayTimeUnit': 'ms' }))
+
+
+def export_prometheus_metrics(metrics_path : str) -> bool:
+	metric_families =\
+	[
+		('facefusion_span_count_total', 'Number of completed spans.', '{:d}'),
+		('facefusion_span_seconds_total', 'Seconds spent inside spans.', '{:.6f}'),
+		('facefusion_span_frames_total', 'Frames handled by spans.', '{:d}')
+	]
+	metric_lines = []
+
+	with TRACER_LOCK:
+		metrics = dict(TRACER.get('metrics'))
+	for metric_index, (metric_name, metric_help, metric_format) in enumerate(metric_families):
+		metric_lines.append('# HELP ' + metric_name + ' ' + metric_help)
+		metric_lines.append('# TYPE ' + metric_name + ' counter')
+		for (span_category, span_name), metric in sorted(metrics.items()):
+			metric_lines.append(metric_name + '{category="' + span_category + '",name="' + span_name + '"} ' + metric_format.format(metric[metric_index]))
+	return write_trace_file(metrics_path, '\n'.join(metric_lines) + '\n')
+
+
+def write_trace_file(file_path : str, file_content : str) -> bool:
+	file_temp_path = file_path + '.' + str(os.getpid())
+
+	os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok = True)
+	with open(file_temp_path, 'w') as trace_file:
+		trace_file.write(file_content)
+	os.replace(file_temp_path, file_path)
+	return True
+
+
+def clear_tracer() -> None:
+	with TRACER_LOCK:
+		TRACER['origin'] = perf_counter()
+		TRACER['spans'] = []
+		TRACER['metrics'] = {}
+		TRACER['stage_span'] = None
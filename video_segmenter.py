@@ -0,0 +1,113 @@
+import multiprocessing
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import List, Optional, Tuple
+
+from tqdm import tqdm
+
+from facefusion import logger, state_manager, wording
+from facefusion.face_store import append_reference_face, get_reference_faces
+from facefusion.ffmpeg import run_ffmpeg
+from facefusion.ffmpeg_stream import create_audio_output_args, open_encoder, open_segment_decoder
+from facefusion.frame_pipeline import create_frame_inputs, stream_frames
+from facefusion.processors.core import get_processors_modules
+from facefusion.temp_helper import get_temp_directory_path, get_temp_file_path
+from facefusion.typing import Args, FaceSet, Fps
+from facefusion.vision import detect_video_fps
+
+
+def process_video_segments(target_path : str, temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, trim_frame_end : int, audio_input_args : List[str]) -> bool:
+	video_segments = create_video_segments(target_path, trim_frame_start, trim_frame_end, state_manager.get_item('video_segment_count'))
+	segment_paths = [ get_segment_path(target_path, segment_index) for segment_index in range(len(video_segments)) ]
+	is_processed = True
+
+	with create_segment_pool(len(video_segments)) as segment_pool:
+		segment_futures = [ segment_pool.submit(process_video_segment, target_path, segment_path, temp_video_resolution, temp_video_fps, trim_frame_start, segment_frame_start, segment_frame_end) for segment_path, (segment_frame_start, segment_frame_end) in zip(segment_paths, video_segments) ]
+
+		with tqdm(total = len(segment_futures), desc = wording.get('processing'), unit = 'segment', ascii = ' =', disable = state_manager.get_item('log_level') in [ 'warn', 'error' ]) as progress:
+			for segment_future in as_completed(segment_futures):
+				if segment_future.cancelled() or segment_future.exception() or not segment_future.result():
+					for pending_future in segment_futures:
+						pending_future.cancel()
+					is_processed = False
+				progress.update()
+	return is_processed and concat_video_segments(target_path, segment_paths, audio_input_args)
+
+
+def create_segment_pool(segment_count : int) -> ProcessPoolExecutor:
+	return ProcessPoolExecutor(max_workers = segment_count, mp_context = multiprocessing.get_context('spawn'), initializer = init_segment_worker, initargs = (dict(state_manager.get_state()), get_reference_faces()))
+
+
+def init_segment_worker(state : Args, reference_faces : Optional[FaceSet]) -> None:
+	for key, value in state.items():
+		state_manager.init_item(key, value)
+	state_manager.init_item('inline_content_analysis', False)
+	logger.init(state_manager.get_item('log_level'))
+
+	if reference_faces:
+		for reference_name, faces in reference_faces.items():
+			for face in faces:
+				append_reference_face(reference_name, face)
+
+
+def process_video_segment(target_path : str, segment_path : str, temp_video_resolution : str, temp_video_fps : Fps, trim_frame_start : int, segment_frame_start : int, segment_frame_end : int) -> bool:
+	processor_modules = get_processors_modules(state_manager.get_item('processors'))
+	target_video_fps = detect_video_fps(target_path)
+	decoder = open_segment_decoder(target_path, temp_video_resolution, temp_video_fps, target_video_fps, segment_frame_start, segment_frame_end)
+	encoder = open_encoder(segment_path, temp_video_resolution, temp_video_fps, state_manager.get_item('output_video_resolution'), state_manager.get_item('output_video_fps'), [])
+	frame_number = round((segment_frame_start - trim_frame_start) * temp_video_fps / target_video_fps)
+
+	with tqdm(disable = True) as progress:
+		return stream_frames(processor_modules, create_frame_inputs(state_manager.get_item('source_paths'), temp_video_fps), decoder, encoder, temp_video_resolution, frame_number, progress)
+
+
+def create_video_segments(target_path : str, trim_frame_start : int, trim_frame_end : int, segment_count : int) -> List[Tuple[int, int]]:
+	keyframe_numbers = [ keyframe_number for keyframe_number in detect_keyframe_numbers(target_path) if trim_frame_start < keyframe_number < trim_frame_end ]
+	segment_frame_starts = [ trim_frame_start ]
+
+	for segment_index in range(1, segment_count):
+		split_frame_number = trim_frame_start + (trim_frame_end - trim_frame_start) * segment_index // segment_count
+		split_keyframe_numbers = [ keyframe_number for keyframe_number in keyframe_numbers if keyframe_number > segment_frame_starts[-1] ]
+
+		if split_keyframe_numbers:
+			segment_frame_starts.append(min(split_keyframe_numbers, key = lambda keyframe_number: abs(keyframe_number - split_frame_number)))
+	return list(zip(segment_frame_starts, segment_frame_starts[1:] + [ trim_frame_end ]))
+
+
+def detect_keyframe_numbers(target_path : str) -> List[int]:
+	commands = [ shutil.which('ffprobe'), '-loglevel', 'error', '-select_streams', 'v:0', '-show_entries', 'packet=pts_time,flags', '-of', 'csv=p=0', target_path ]
+	output = subprocess.run(commands, stdout = subprocess.PIPE).stdout.decode()
+	packets = [ line.split(',') for line in output.splitlines() ]
+	packet_times = [ float(packet[0]) for packet in packets if len(packet) > 1 and packet[0] not in [ '', 'N/A' ] ]
+	video_fps = detect_video_fps(target_path)
+	keyframe_numbers = []
+
+	if packet_times:
+		start_time = min(packet_times)
+		for packet in packets:
+			if len(packet) > 1 and packet[0] not in [ '', 'N/A' ] and 'K' in packet[1]:
+				keyframe_numbers.append(round((float(packet[0]) - start_time) * video_fps))
+	return sorted(keyframe_numbers)
+
+
+def concat_video_segments(target_path : str, segment_paths : List[str], audio_input_args : List[str]) -> bool:
+	concat_path = os.path.join(get_temp_directory_path(target_path), 'segments.txt')
+
+	with open(concat_path, 'w') as concat_file:
+		for segment_path in segment_paths:
+			concat_file.write('file \'' + segment_path.replace('\'', '\'\\\'\'') + '\'\n')
+	commands = [ '-f', 'concat', '-safe', '0', '-i', concat_path ]
+	commands.extend(audio_input_args)
+	commands.extend([ '-c:v', 'copy' ])
+	commands.extend(create_audio_output_args(audio_input_args))
+	commands.extend([ '-y', get_temp_file_path(target_path) ])
+	process = run_ffmpeg(commands)
+	process.communicate()
+	return process.returncode == 0
+
+
+def get_segment_path(target_path : str, segment_index : int) -> str:
+	_, temp_file_extension = os.path.splitext(get_temp_file_path(target_path))
+	return os.path.join(get_temp_directory_path(target_path), 'segment-' + str(segment_index).zfill(4) + temp_file_extension)